@@ -0,0 +1,833 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# license: AGPL-3.0
+#
+# Medições de desempenho das rotinas de 'cli_tools'.
+#
+# Uso: python3 benchmark_cli_tools.py [nome_do_benchmark ...]
+# Sem argumentos, todos os benchmarks registrados em 'benchmarks' são executados.
+#
+
+
+import os
+import sys
+import csv
+import heapq
+import time
+import pickle
+import tempfile
+import threading
+import tracemalloc
+
+from random import randrange, sample
+from collections import OrderedDict, Counter
+
+from cli_tools import *
+import set_algebra
+import calculation_handler
+
+
+
+def best_time(func, repeat=3):
+	"""Executa 'func' algumas vezes e retorna o menor tempo, em segundos"""
+
+	output = None
+	while repeat:
+		start = time.perf_counter()
+		func()
+		elapsed = time.perf_counter() - start
+		if output is None or elapsed < output:
+			output = elapsed
+		repeat -= 1
+	return output
+
+
+
+def report(label, seconds, num_of_items):
+	print("{}{:>10.3f} s{:>12.1f} ns/item".format(label.ljust(48), seconds, seconds / num_of_items * 1e9))
+
+
+
+def make_csv_file(num_of_lines, delimiter='\t'):
+	"""Cria um arquivo CSV temporário com 'num_of_lines' linhas e retorna (pasta, nome do arquivo)"""
+
+	fd, path = tempfile.mkstemp(suffix='.csv', dir=tmp_folder)
+	with os.fdopen(fd, 'w', encoding='utf8') as f:
+		w = csv.writer(f, delimiter=delimiter, lineterminator='\n')
+		w.writerow(['nome', 'idade', 'altura', 'cidade', 'escolaridade'])
+		for n in range(num_of_lines):
+			w.writerow(['Pessoa {}'.format(n), str(n % 90), '1,{:02d}'.format(n % 100), 'Brasília', 'Superior'])
+	return os.path.dirname(path), os.path.basename(path)
+
+
+
+def legacy_load_full_csv(filename, file_folder=os.curdir, delimiter='\t', lineterminator='\n'):
+	#Implementação anterior: abre o arquivo duas vezes e copia cada linha do DictReader
+	full_csv_info = []
+	fields = load_csv_head(filename, file_folder=file_folder, delimiter=delimiter, lineterminator=lineterminator)
+	with open(os.path.join(file_folder, filename), encoding="utf8") as f:
+		rd = csv.DictReader(f, delimiter=delimiter, lineterminator=lineterminator)
+		for row in rd:
+			ordered_row = OrderedDict()
+			for col in fields:
+				ordered_row[col] = row[col]
+			full_csv_info.append(ordered_row)
+	return full_csv_info
+
+
+
+def bench_load_csv(num_of_lines=200000):
+	file_folder, filename = make_csv_file(num_of_lines)
+	print("load_full_csv, {} linhas".format(num_of_lines))
+	try:
+		report("  anterior (DictReader + OrderedDict)", best_time(lambda: legacy_load_full_csv(filename, file_folder=file_folder)), num_of_lines)
+		for row_format in csv_row_formats:
+			report("  row_format='{}'".format(row_format), best_time(lambda: load_full_csv(filename, file_folder=file_folder, row_format=row_format)), num_of_lines)
+	finally:
+		os.remove(os.path.join(file_folder, filename))
+
+
+
+def allocated_bytes(func):
+	"""Retorna o resultado de 'func' e a quantidade de bytes que ele mantém alocados"""
+
+	tracemalloc.start()
+	output = func()
+	size = tracemalloc.get_traced_memory()[0]
+	tracemalloc.stop()
+	return output, size
+
+
+
+def peak_bytes(func):
+	"""Retorna o resultado de 'func' e o pico de memória alocada durante a execução"""
+
+	tracemalloc.start()
+	output = func()
+	size = tracemalloc.get_traced_memory()[1]
+	tracemalloc.stop()
+	return output, size
+
+
+
+def bench_columnar_table(num_of_lines=200000):
+	file_folder, filename = make_csv_file(num_of_lines)
+	selected_cols = ['idade', 'altura', 'cidade']
+	num_of_cells = num_of_lines * len(selected_cols)
+	print("load_csv_cols, {} linhas, colunas {}".format(num_of_lines, selected_cols))
+	try:
+		for label, columnar in (("  lista de listas", False), ("  columnar=True", True)):
+			seconds = best_time(lambda: load_csv_cols(filename, selected_cols=selected_cols, file_folder=file_folder, columnar=columnar), repeat=1)
+			table, size = allocated_bytes(lambda: load_csv_cols(filename, selected_cols=selected_cols, file_folder=file_folder, columnar=columnar))
+			report(label, seconds, num_of_cells)
+			print("{}{:>10.1f} bytes/célula".format(''.ljust(48), size / num_of_cells))
+	finally:
+		os.remove(os.path.join(file_folder, filename))
+
+
+
+def legacy_load_csv_cols(filename, selected_cols, file_folder=os.curdir):
+	#Implementação anterior: 'try_implict_convert' aplicado célula por célula
+	output = []
+	for line in load_csv(filename, file_folder=file_folder, row_format='row'):
+		output.append([try_implict_convert(line[col]) for col in selected_cols])
+	return output
+
+
+
+def bench_column_inference(num_of_lines=1000000):
+	file_folder, filename = make_csv_file(num_of_lines)
+	selected_cols = ['idade', 'altura', 'cidade']
+	num_of_cells = num_of_lines * len(selected_cols)
+	print("Conversão de células em load_csv_cols, {} linhas, colunas {}".format(num_of_lines, selected_cols))
+	try:
+		reading = best_time(lambda: load_csv_cols(filename, selected_cols=selected_cols, file_folder=file_folder, implict_convert=False), repeat=1)
+		legacy = best_time(lambda: legacy_load_csv_cols(filename, selected_cols, file_folder=file_folder), repeat=1)
+		inferred = best_time(lambda: load_csv_cols(filename, selected_cols=selected_cols, file_folder=file_folder), repeat=1)
+		report("  leitura sem conversão", reading, num_of_cells)
+		report("  conversão por célula (try_implict_convert)", legacy - reading, num_of_cells)
+		report("  conversão por coluna (convert_rows)", inferred - reading, num_of_cells)
+	finally:
+		os.remove(os.path.join(file_folder, filename))
+
+
+
+def bench_parallel_load(num_of_lines=1000000):
+	file_folder, filename = make_csv_file(num_of_lines)
+	workers = os.cpu_count() or 1
+	print("load_full_csv em série e em paralelo, {} linhas, {} processos".format(num_of_lines, workers))
+	try:
+		for row_format in ('dict', 'tuple'):
+			report("  em série, row_format='{}'".format(row_format), best_time(lambda: load_full_csv(filename, file_folder=file_folder, row_format=row_format), repeat=1), num_of_lines)
+			report("  load_full_csv_parallel, row_format='{}'".format(row_format), best_time(lambda: load_full_csv_parallel(filename, file_folder=file_folder, row_format=row_format, workers=workers), repeat=1), num_of_lines)
+	finally:
+		os.remove(os.path.join(file_folder, filename))
+
+
+
+def bench_csv_cache(num_of_lines=500000):
+	file_folder, filename = make_csv_file(num_of_lines)
+	cache_folder = tempfile.mkdtemp(dir=tmp_folder)
+	print("load_full_csv com cache binário, {} linhas".format(num_of_lines))
+	try:
+		for row_format in ('dict', 'tuple'):
+			report("  sem cache, row_format='{}'".format(row_format), best_time(lambda: load_full_csv(filename, file_folder=file_folder, row_format=row_format), repeat=1), num_of_lines)
+			report("  cache=True, primeira leitura", best_time(lambda: load_full_csv(filename, file_folder=file_folder, row_format=row_format, cache=True, cache_folder=cache_folder), repeat=1), num_of_lines)
+			report("  cache=True, leituras seguintes", best_time(lambda: load_full_csv(filename, file_folder=file_folder, row_format=row_format, cache=True, cache_folder=cache_folder)), num_of_lines)
+			report("  read_csv_cache (tabela em colunas)", best_time(lambda: read_csv_cache(filename, file_folder=file_folder, cache_folder=cache_folder, delimiter='\t', lineterminator='\n', encoding=None)), num_of_lines)
+	finally:
+		os.remove(os.path.join(file_folder, filename))
+		evict_csv_cache(cache_folder=cache_folder, max_size=0)
+		os.rmdir(cache_folder)
+
+
+
+def bench_seek_for_lines(num_of_lines=1000000):
+	file_folder, filename = make_csv_file(num_of_lines)
+	print("seek_for_lines, {} linhas, 1 linha encontrada".format(num_of_lines))
+	try:
+		found, size = peak_bytes(lambda: seek_for_lines(filename, 'nome', 'Pessoa 10', file_folder=file_folder, show_data=False))
+		report("  lista completa ({:.1f} MB de pico)".format(size / 2**20), best_time(lambda: seek_for_lines(filename, 'nome', 'Pessoa 10', file_folder=file_folder, show_data=False), repeat=1), num_of_lines)
+		found, size = peak_bytes(lambda: list(seek_for_lines(filename, 'nome', 'Pessoa 10', file_folder=file_folder, stream=True)))
+		report("  stream=True ({:.1f} MB de pico)".format(size / 2**20), best_time(lambda: list(seek_for_lines(filename, 'nome', 'Pessoa 10', file_folder=file_folder, stream=True)), repeat=1), num_of_lines)
+	finally:
+		os.remove(os.path.join(file_folder, filename))
+
+
+
+def bench_transform_csv(num_of_lines=500000):
+	file_folder, filename = make_csv_file(num_of_lines)
+	print("Reescrita de arquivo (cópia de coluna), {} linhas".format(num_of_lines))
+
+	def legacy_copy_col():
+		conteudo = load_full_csv(filename, file_folder=file_folder)
+		for line in conteudo:
+			line['apelido'] = line['nome']
+		save_csv(conteudo, filename, file_folder=file_folder)
+
+	def copy_value(line):
+		line['apelido'] = line['nome']
+		return line
+
+	try:
+		#A primeira execução cria a coluna 'apelido', as seguintes apenas a reescrevem
+		seconds = best_time(legacy_copy_col, repeat=1)
+		output, size = peak_bytes(legacy_copy_col)
+		report("  load_full_csv + save_csv ({:.1f} MB de pico)".format(size / 2**20), seconds, num_of_lines)
+		seconds = best_time(lambda: transform_csv(filename, copy_value, file_folder=file_folder), repeat=1)
+		output, size = peak_bytes(lambda: transform_csv(filename, copy_value, file_folder=file_folder))
+		report("  transform_csv ({:.1f} MB de pico)".format(size / 2**20), seconds, num_of_lines)
+	finally:
+		os.remove(os.path.join(file_folder, filename))
+
+
+
+def legacy_acquire_lockfile(lockf):
+	#Implementação anterior: verificação do arquivo de trava a cada 0,1 s
+	while True:
+		if os.path.isfile(tmp_folder + os.sep + lockf):
+			time.sleep(0.1)
+		else:
+			open(tmp_folder + os.sep + lockf, 'w').close()
+			break
+
+
+
+def bench_file_lock(num_of_cycles=2000, hold_time=0.02, num_of_waits=10):
+	print("Travas de arquivo, {} ciclos sem disputa e {} esperas por uma trava mantida por {:.0f} ms".format(num_of_cycles, num_of_waits, hold_time * 1000))
+
+	def legacy_cycles():
+		for n in range(num_of_cycles):
+			legacy_acquire_lockfile('~lock_bench')
+			os.remove(tmp_folder + os.sep + '~lock_bench')
+
+	def file_lock_cycles():
+		for n in range(num_of_cycles):
+			with FileLock('~lock_bench'):
+				pass
+
+	def wait_overhead(acquire, release):
+		#Outra thread detém a trava por 'hold_time'; mede o atraso além desse tempo até a trava ser obtida
+		overhead = 0
+		for n in range(num_of_waits):
+			holder = acquire()
+			releaser = threading.Timer(hold_time, release, args=(holder,))
+			start = time.perf_counter()
+			releaser.start()
+			release(acquire())
+			overhead += time.perf_counter() - start - hold_time
+			releaser.join()
+		return overhead / num_of_waits
+
+	report("  sem disputa, anterior (isfile + sleep)", best_time(legacy_cycles), num_of_cycles)
+	report("  sem disputa, FileLock", best_time(file_lock_cycles), num_of_cycles)
+
+	legacy_overhead = wait_overhead(lambda: legacy_acquire_lockfile('~lock_bench'), lambda holder: os.remove(tmp_folder + os.sep + '~lock_bench'))
+	file_lock_overhead = wait_overhead(lambda: FileLock('~lock_bench').acquire(), lambda holder: holder.release())
+	print("  atraso médio após a liberação: anterior {:.1f} ms, FileLock {:.2f} ms".format(legacy_overhead * 1000, file_lock_overhead * 1000))
+
+
+
+def legacy_bisect_search(search_value, input_list):
+	#Implementação anterior: recursiva, copiando as metades da lista a cada nível
+	if input_list == []:
+		return False
+	middle_idx = len(input_list) // 2
+	middle_element = input_list[middle_idx]
+	if len(input_list) == 1:
+		return search_value == middle_element
+	if search_value == middle_element: return True
+	elif search_value < middle_element: return legacy_bisect_search(search_value, input_list[:middle_idx])
+	else: return legacy_bisect_search(search_value, input_list[middle_idx + 1:])
+
+
+
+def bench_bisect(sizes=(10**3, 10**4, 10**5, 10**6, 10**7), num_of_queries=1000):
+	print("Pesquisa binária, {} consultas por tamanho de lista".format(num_of_queries))
+	for size in sizes:
+		sorted_list = list(range(0, size * 2, 2))
+		queries = [randrange(size * 2) for n in range(num_of_queries)]
+		legacy_queries = queries[:max(10, num_of_queries * 1000 // size)]
+		print("  {} elementos".format(size))
+		report("    anterior (recursiva, com fatias)", best_time(lambda: [legacy_bisect_search(value, sorted_list) for value in legacy_queries], repeat=1), len(legacy_queries))
+		report("    bisect_search", best_time(lambda: [bisect_search(value, sorted_list) for value in queries]), num_of_queries)
+		report("    bisect_search_idx", best_time(lambda: [bisect_search_idx(value, sorted_list, (0, size)) for value in queries]), num_of_queries)
+		report("    bisect_many", best_time(lambda: bisect_many(queries, sorted_list)), num_of_queries)
+
+
+
+class LegacyOrderedLinkedList(list):
+	#Implementação anterior de 'PK_OrderedLinkedList': 'sort()' completo a cada inserção fora de ordem
+	def append(self, element):
+		if not isinstance(bisect_search_idx(element, self, (0, len(self))), bool):
+			return
+		out_of_order = bool(self) and element < self[-1]
+		super(LegacyOrderedLinkedList, self).append(element)
+		if out_of_order:
+			self.sort()
+
+
+
+def insert_all(container, values, method='append'):
+	insert = getattr(container, method)
+	for value in values:
+		insert(value)
+	return container
+
+
+
+def bench_sorted_list(num_of_inserts=1000000, legacy_sizes=(10000, 20000), list_sizes=(20000, 100000)):
+	print("Inserções aleatórias em listas ordenadas")
+	for size in legacy_sizes:
+		values = sample(range(size * 10), size)
+		report("  anterior, {} inserções".format(size), best_time(lambda: insert_all(LegacyOrderedLinkedList(), values), repeat=1), size)
+	#'PK_OrderedLinkedList' desloca os elementos da lista a cada inserção: medida em tamanhos menores
+	for size in list_sizes:
+		values = sample(range(size * 10), size)
+		report("  PK_OrderedLinkedList.append, {} inserções".format(size), best_time(lambda: insert_all(PK_OrderedLinkedList(), values), repeat=1), size)
+
+	values = sample(range(num_of_inserts * 10), num_of_inserts)
+	report("  PK_OrderedLinkedList.update, {} elementos".format(num_of_inserts), best_time(lambda: PK_OrderedLinkedList().update(values), repeat=1), num_of_inserts)
+	report("  SortedList.add, {} inserções".format(num_of_inserts), best_time(lambda: insert_all(SortedList(), values, method='add'), repeat=1), num_of_inserts)
+	report("  SortedList.update, {} elementos".format(num_of_inserts), best_time(lambda: SortedList().update(values), repeat=1), num_of_inserts)
+
+	sorted_list = SortedList(values)
+	queries = values[:100000]
+	report("  SortedList, 'in' ({} consultas)".format(len(queries)), best_time(lambda: [value in sorted_list for value in queries]), len(queries))
+	report("  SortedList.irange (1000 faixas)", best_time(lambda: [sum(1 for value in sorted_list.irange(value, value + 100)) for value in queries[:1000]]), 1000)
+
+
+
+def bench_unique_list(num_of_items=100000, num_of_removals=10000):
+	items = ['item {}'.format(n) for n in range(num_of_items)]
+	removals = sample(items, num_of_removals)
+	print("PK_LinkedList, {} elementos, {} remoções".format(num_of_items, num_of_removals))
+
+	def legacy_sub():
+		#Implementação anterior de '__sub__': 'list.remove' para cada elemento
+		target = list(items)
+		for element in removals:
+			target.remove(element)
+
+	report("  append", best_time(lambda: insert_all(PK_LinkedList(), items), repeat=1), num_of_items)
+	pk_list = PK_LinkedList(items)
+	report("  'in'", best_time(lambda: [item in pk_list for item in items]), num_of_items)
+	report("  anterior, subtração com list.remove", best_time(legacy_sub, repeat=1), num_of_removals)
+	report("  subtração por conjunto", best_time(lambda: PK_LinkedList(items) - removals, repeat=1), num_of_removals)
+	legacy_size = len(pickle.dumps((list(pk_list), dict(pk_list.__dict__)), protocol=pickle.HIGHEST_PROTOCOL))
+	print("  pickle: {} bytes (com o conjunto '_members' seriam {})".format(len(pickle.dumps(pk_list, protocol=pickle.HIGHEST_PROTOCOL)), legacy_size))
+
+
+
+class LegacyQueue(Queue):
+	#Implementação anterior: lista, com 'list.pop(0)' deslocando todos os elementos restantes
+	def __init__(self, list_of_elements):
+		self.queue = list_of_elements
+		self.maxsize = 0
+
+	def dequeue(self):
+		if self.size() != 0:
+			return self.queue.pop(0)
+
+
+
+def drain(fila):
+	while fila.size():
+		fila.dequeue()
+
+
+
+def bench_queue(num_of_items=1000000, legacy_sizes=(50000, 100000)):
+	print("Esvaziamento de filas")
+	for size in legacy_sizes:
+		report("  anterior (list.pop(0)), {} elementos".format(size), best_time(lambda: drain(LegacyQueue(list(range(size)))), repeat=1), size)
+	report("  Queue, {} elementos".format(num_of_items), best_time(lambda: drain(Queue(range(num_of_items))), repeat=1), num_of_items)
+
+	def producer_consumer(fila):
+		worker = threading.Thread(target=lambda: [fila.get() for n in range(num_of_items)])
+		worker.start()
+		for n in range(num_of_items):
+			fila.put(n)
+		worker.join()
+
+	report("  BlockingQueue(maxsize=1000), 2 threads", best_time(lambda: producer_consumer(BlockingQueue(maxsize=1000)), repeat=1), num_of_items)
+
+
+
+def bench_heap(num_of_items=1000000, num_of_lines=500000, k=10):
+	values = [randrange(num_of_items) for n in range(num_of_items)]
+	print("Heap, {} elementos; top_k sobre {} linhas de load_csv".format(num_of_items, num_of_lines))
+
+	def legacy_heap():
+		#Implementação anterior: 'push' (heappush) por elemento, sem índice
+		heap = []
+		push = lambda element: heapq.heappush(heap, element)
+		for value in values:
+			push(value)
+
+	report("  anterior, sem índice (push por elemento)", best_time(legacy_heap, repeat=1), num_of_items)
+	report("  Heap, push por elemento", best_time(lambda: insert_all(Heap(), values, method='push'), repeat=1), num_of_items)
+	report("  Heap, construção com heapify", best_time(lambda: Heap(values), repeat=1), num_of_items)
+
+	heap = Heap(values)
+	handles = [heap.push(value) for value in values[:100000]]
+	report("  Heap.update (100000 handles)", best_time(lambda: [heap.update(handle, -1) for handle in handles], repeat=1), len(handles))
+
+	file_folder, filename = make_csv_file(num_of_lines)
+	key = lambda line: int(line['idade'])
+	try:
+		output, size = peak_bytes(lambda: sorted(load_full_csv(filename, file_folder=file_folder), key=key, reverse=True)[:k])
+		report("  sorted(load_full_csv)[:k] ({:.1f} MB de pico)".format(size / 2**20), best_time(lambda: sorted(load_full_csv(filename, file_folder=file_folder), key=key, reverse=True)[:k], repeat=1), num_of_lines)
+		output, size = peak_bytes(lambda: top_k(load_csv(filename, file_folder=file_folder), k, key=key))
+		report("  top_k(load_csv) ({:.1f} MB de pico)".format(size / 2**20), best_time(lambda: top_k(load_csv(filename, file_folder=file_folder), k, key=key), repeat=1), num_of_lines)
+	finally:
+		os.remove(os.path.join(file_folder, filename))
+
+
+
+class LegacyStack():
+	#Implementação anterior: cursor '_stack_size' atualizado a cada 'push'
+	def __init__(self):
+		self.stack = []
+		self._stack_size = -1
+
+	def push(self, item):
+		self.stack.append(item)
+		self._stack_size = self.size() - 1
+
+	def pull(self):
+		if self.size() != 0:
+			return self.stack.pop()
+
+	def size(self):
+		return len(self.stack)
+
+
+
+def bench_stack(num_of_values=1000000):
+	num_of_operations = num_of_values * 4
+	print("Pilha, {} operações de push/pull".format(num_of_operations))
+	values = list(range(num_of_values))
+
+	def push_pull(pilha):
+		push = pilha.push
+		pull = pilha.pull
+		for value in values:
+			push(value)
+			push(value)
+			pull()
+		for value in values:
+			pull()
+
+	def push_pop_many(pilha, block_size=100):
+		for idx in range(0, num_of_values, block_size):
+			pilha.push_many(values[idx:idx + block_size])
+		while pilha.size():
+			pilha.pop_many(block_size)
+
+	report("  anterior", best_time(lambda: push_pull(LegacyStack()), repeat=1), num_of_operations)
+	report("  Stack", best_time(lambda: push_pull(Stack()), repeat=1), num_of_operations)
+	report("  Stack(typecode='q')", best_time(lambda: push_pull(Stack(typecode='q')), repeat=1), num_of_operations)
+	report("  push_many + pop_many (blocos de 100)", best_time(lambda: push_pop_many(Stack()), repeat=1), num_of_values * 2)
+
+	output, size = peak_bytes(lambda: Stack(float(value) for value in values))
+	output, typed_size = peak_bytes(lambda: Stack((float(value) for value in values), typecode='d'))
+	print("  memória para {} floats: lista {:.1f} MB, array 'd' {:.1f} MB".format(num_of_values, size / 2**20, typed_size / 2**20))
+
+
+
+def legacy_colision_add(first, second):
+	#Implementação anterior de 'ColisionDict.__add__': cópia do maior dicionário a cada soma
+	if len(first) > len(second):
+		iterated_dict = second.items()
+		copied_dict = first.copy()
+	else:
+		iterated_dict = first.items()
+		copied_dict = second.copy()
+	for key, value in iterated_dict:
+		if copied_dict.get(key):
+			if type(copied_dict[key]) == list:
+				copied_dict[key].append(value)
+			else:
+				copied_dict[key] = [copied_dict[key], value]
+		else:
+			copied_dict[key] = value
+	return copied_dict
+
+
+
+def bench_colision_dict(num_of_dicts=200, num_of_keys=2000):
+	print("Junção de {} índices ColisionDict com {} chaves cada".format(num_of_dicts, num_of_keys))
+	indexes = []
+	for n in range(num_of_dicts):
+		index = ColisionDict()
+		for key in range(n * num_of_keys // 2, n * num_of_keys // 2 + num_of_keys):
+			index.append(key, n)
+		indexes.append(index)
+	num_of_entries = num_of_dicts * num_of_keys
+
+	def legacy_fold():
+		output = OrderedDict()
+		for index in indexes:
+			output = legacy_colision_add(output, index)
+		return output
+
+	def merge_fold():
+		output = ColisionDict()
+		for index in indexes:
+			output += index
+		return output
+
+	report("  anterior (soma com cópia)", best_time(legacy_fold, repeat=1), num_of_entries)
+	report("  ColisionDict += (merge_from)", best_time(merge_fold, repeat=1), num_of_entries)
+	view = ChainedColisionDict(*indexes)
+	report("  ChainedColisionDict, 1000 consultas", best_time(lambda: [view[key] for key in range(1000)]), 1000)
+
+
+
+def legacy_diff_lists(first_list, second_list):
+	#Implementação anterior de 'diff_lists': ordenação de uma cópia e busca binária com fatias para cada elemento
+	second_list_sorted = second_list.copy()
+	second_list_sorted.sort()
+	return [item for item in first_list if not legacy_bisect_search(item, second_list_sorted)]
+
+
+
+def bench_set_algebra(sizes=(10**4, 10**5, 10**6), legacy_sizes=(10**4,)):
+	print("Diferença, interseção e união de listas (metade dos elementos em comum)")
+	for size in sizes:
+		first = sample(range(size * 2), size)
+		second = sample(range(size * 2), size)
+		print("  {} elementos".format(size))
+		if size in legacy_sizes:
+			report("    diff_lists anterior", best_time(lambda: legacy_diff_lists(first, second), repeat=1), size)
+		report("    diff_lists", best_time(lambda: diff_lists(first, second)), size)
+		report("    diff_lists, multiset", best_time(lambda: diff_lists(first, second, multiset=True)), size)
+		report("    intersect_lists", best_time(lambda: intersect_lists(first, second)), size)
+		report("    merge_lists", best_time(lambda: merge_lists(first, second)), size)
+		first.sort()
+		second.sort()
+		report("    diff_lists, presorted", best_time(lambda: diff_lists(first, second, presorted=True)), size)
+
+
+
+def bench_diff_files(num_of_lines=2000000, run_size=200000):
+	print("Comparação de dois arquivos com {} linhas (metade em comum)".format(num_of_lines))
+	tmp_folder = tempfile.mkdtemp()
+	filenames = []
+	for offset in (0, num_of_lines // 2):
+		filename = os.path.join(tmp_folder, 'members_{}.txt'.format(offset))
+		with open(filename, 'w') as file:
+			for n in sample(range(offset, offset + num_of_lines), num_of_lines):
+				file.write('member{:09d}\n'.format(n))
+		filenames.append(filename)
+
+	def in_memory():
+		first, second = [list(set_algebra.read_lines(filename)) for filename in filenames]
+		return compare_lists(first, second)
+
+	report("  compare_lists em memória", best_time(in_memory, repeat=1), num_of_lines * 2)
+	print("    pico de memória: {:.1f} MB".format(peak_bytes(in_memory)[1] / 2**20))
+	report("  diff_files (run_size={})".format(run_size), best_time(lambda: set_algebra.diff_files(*filenames, output_folder=tmp_folder, run_size=run_size, tmp_folder=tmp_folder), repeat=1), num_of_lines * 2)
+	print("    pico de memória: {:.1f} MB".format(peak_bytes(lambda: set_algebra.diff_files(*filenames, output_folder=tmp_folder, run_size=run_size, tmp_folder=tmp_folder))[1] / 2**20))
+
+	for filename in os.listdir(tmp_folder):
+		os.remove(os.path.join(tmp_folder, filename))
+	os.rmdir(tmp_folder)
+
+
+
+def legacy_diff_dicts(first_dict, second_dict):
+	#Implementação anterior de 'diff_dicts': pares "chave: valor" (só strings) comparados com 'legacy_diff_lists'
+	l1 = [": ".join(pair) for pair in first_dict.items()]
+	l2 = [": ".join(pair) for pair in second_dict.items()]
+	return {u'mudou': legacy_diff_lists(l2, l1)}
+
+
+
+def bench_deep_diff(sizes=(10**4, 10**5, 3 * 10**5), legacy_sizes=(10**4,), num_of_changes=100):
+	print("Comparação de respostas aninhadas, {} alterações".format(num_of_changes))
+	for size in sizes:
+		first = OrderedDict()
+		for n in range(size):
+			first['q{}'.format(n)] = OrderedDict([('resposta', 'opção {}'.format(n % 7)), ('outros', ['a', n]), ('nota', n / 3)])
+		second = pickle.loads(pickle.dumps(first))
+		for n in sample(range(size), num_of_changes):
+			second['q{}'.format(n)]['outros'][1] = -1
+		print("  {} chaves".format(size))
+		if size in legacy_sizes:
+			flat_first = OrderedDict((key, str(value)) for key, value in first.items())
+			flat_second = OrderedDict((key, str(value)) for key, value in second.items())
+			report("    diff_dicts anterior (valores como texto)", best_time(lambda: legacy_diff_dicts(flat_first, flat_second), repeat=1), size)
+		report("    deep_diff_dicts", best_time(lambda: deep_diff_dicts(first, second), repeat=1), size)
+
+
+
+def legacy_str_junction(table1, table2, fields1, fields2, junction_col, delimiter='\t'):
+	#Implementação anterior de 'table_junction' para linhas em texto: um 'split' por coluna e a linha indexada sobrescrita/alterada
+	index1 = {col: n for n, col in enumerate(fields1)}
+	index2 = {col: n for n, col in enumerate(fields2)}
+	tmpdict = {}
+	for line in table1:
+		converted_line = {}
+		for col in fields1:
+			converted_line[col] = line.split(delimiter)[index1[col]]
+		tmpdict[converted_line[junction_col]] = converted_line
+	output = []
+	for line in table2:
+		converted_line = {}
+		for col in fields2:
+			converted_line[col] = line.split(delimiter)[index2[col]]
+		if converted_line[junction_col] in tmpdict:
+			joined_line = tmpdict[converted_line[junction_col]]
+			for col in fields2:
+				if col != junction_col:
+					joined_line[col] = converted_line[col]
+			output.append(joined_line)
+	return output
+
+
+
+def bench_hash_join(num_of_lines=200000, num_of_cols=8):
+	print("Junção de duas tabelas de {} linhas, {} colunas cada".format(num_of_lines, num_of_cols))
+	fields1 = ['id'] + ['a{}'.format(n) for n in range(num_of_cols - 1)]
+	fields2 = ['id'] + ['b{}'.format(n) for n in range(num_of_cols - 1)]
+	table1 = ['\t'.join([str(n)] + ['x{}'.format(n)] * (num_of_cols - 1)) for n in sample(range(num_of_lines * 2), num_of_lines)]
+	table2 = ['\t'.join([str(n)] + ['y{}'.format(n)] * (num_of_cols - 1)) for n in sample(range(num_of_lines * 2), num_of_lines)]
+
+	def hash_join_str(how):
+		rows1 = [dict(zip(fields1, line.split('\t'))) for line in table1]
+		rows2 = (dict(zip(fields2, line.split('\t'))) for line in table2)
+		return list(hash_join(rows1, rows2, 'id', how=how))
+
+	report("  anterior (linhas em texto, inner)", best_time(lambda: legacy_str_junction(table1, table2, fields1, fields2, 'id'), repeat=1), num_of_lines * 2)
+	report("  hash_join (linhas em texto, inner)", best_time(lambda: hash_join_str('inner'), repeat=1), num_of_lines * 2)
+	report("  hash_join (linhas em texto, full)", best_time(lambda: hash_join_str('full'), repeat=1), num_of_lines * 2)
+
+	file_folder, filename = make_csv_file(num_of_lines)
+	lookup = [{'nome': 'Pessoa {}'.format(n), 'grupo': n % 3} for n in range(0, num_of_lines, 10)]
+	report("  hash_join com load_csv (índice pequeno, arquivo em fluxo)", best_time(lambda: sum(1 for row in hash_join(lookup, load_csv(filename, file_folder=file_folder), 'nome')), repeat=1), num_of_lines)
+	os.remove(os.path.join(file_folder, filename))
+
+
+
+def legacy_table_merge(list_of_dicts1, list_of_dicts2, joint_key):
+	#Implementação anterior de 'table_merge', com 'key_2_skip' em lista e a tabela de esqueletos descartada.
+	#A versão original falhava em 'merge_lists' (cópia de dict_keys e ordenação de dicionários); aqui as listas são concatenadas
+	output = []
+	tmpdict = {}
+	list_of_dicts1_cols = list(list_of_dicts1[0].keys())
+	list_of_dicts2_cols = list(list_of_dicts2[0].keys())
+	for row in list_of_dicts1:
+		tmpdict[row[joint_key]] = row
+	new_row_skell = OrderedDict()
+	for col_name in list_of_dicts1_cols + [col for col in list_of_dicts2_cols if col not in list_of_dicts1_cols]:
+		new_row_skell[col_name] = ""
+	key_2_skip = []
+	for other_row in list_of_dicts2:
+		if other_row[joint_key] in tmpdict:
+			key_2_skip.append(other_row[joint_key])
+			joined_row = tmpdict[other_row[joint_key]]
+			for colz in list_of_dicts2_cols:
+				if colz != joint_key:
+					joined_row[colz] = other_row[colz]
+			output.append(joined_row)
+	linhas_n_comuns = len(list_of_dicts1) + len(list_of_dicts1) - len(key_2_skip)
+	tabela_linhas_n_comuns = []
+	while linhas_n_comuns != 0:
+		tabela_linhas_n_comuns.append(copy(new_row_skell))
+		linhas_n_comuns -= 1
+	tabela_linhas_n_comuns = []
+	for linha in list_of_dicts1:
+		linha_inteira = copy(new_row_skell)
+		if not linha[joint_key] in key_2_skip:
+			for colz in list_of_dicts1_cols:
+				linha_inteira[colz] = linha[colz]
+			tabela_linhas_n_comuns.append(linha_inteira)
+	for linha in list_of_dicts2:
+		linha_inteira = copy(new_row_skell)
+		if not linha[joint_key] in key_2_skip:
+			for colz in list_of_dicts2_cols:
+				linha_inteira[colz] = linha[colz]
+			tabela_linhas_n_comuns.append(linha_inteira)
+	return tabela_linhas_n_comuns + output
+
+
+
+def bench_table_merge(sizes=(10**4, 10**5, 10**6), legacy_sizes=(10**4,)):
+	print("Junção completa (full outer join) de duas tabelas, metade das chaves em comum")
+	for size in sizes:
+		keys1 = sorted(sample(range(size * 3 // 2), size))
+		keys2 = sorted(sample(range(size * 3 // 2), size))
+		table1 = [{'id': '{:08d}'.format(key), 'nome': 'Pessoa {}'.format(key), 'cidade': 'Brasília'} for key in keys1]
+		table2 = [{'id': '{:08d}'.format(key), 'idade': str(key % 90), 'escolaridade': 'Superior'} for key in keys2]
+		print("  {} linhas".format(size))
+		if size in legacy_sizes:
+			report("    anterior", best_time(lambda: legacy_table_merge([dict(row) for row in table1], table2, 'id'), repeat=1), size * 2)
+		report("    table_merge (hash_join)", best_time(lambda: table_merge(table1, table2, 'id'), repeat=1), size * 2)
+		report("    table_merge (merge_join, presorted)", best_time(lambda: table_merge(table1, table2, 'id', presorted=True), repeat=1), size * 2)
+		report("    table_merge (merge_join, stream)", best_time(lambda: sum(1 for row in table_merge(iter(table1), iter(table2), 'id', presorted=True, stream=True)), repeat=1), size * 2)
+		del table1, table2
+
+
+
+def bench_group_by(num_of_lines=500000):
+	print("Agrupamento de {} linhas por 'idade' (contagem, frequência, soma, média, máximo, distintos)".format(num_of_lines))
+	file_folder, filename = make_csv_file(num_of_lines)
+	table = load_full_csv(filename, file_folder=file_folder)
+	aggregations = ['count', 'freq', ('sum', 'idade'), ('mean', 'altura'), ('max', 'altura'), ('distinct', 'nome')]
+
+	report("  map_values (contagem de todas as colunas, lista)", best_time(lambda: calculation_handler.map_values(table, count=True), repeat=1), num_of_lines)
+	report("  group_by (lista)", best_time(lambda: calculation_handler.group_by(table, 'idade', aggregations), repeat=1), num_of_lines)
+	report("  group_by (load_csv, em fluxo)", best_time(lambda: calculation_handler.group_by(load_csv(filename, file_folder=file_folder), 'idade', aggregations), repeat=1), num_of_lines)
+	report("  group_by ['idade', 'cidade'], só contagem", best_time(lambda: calculation_handler.group_by(table, ['idade', 'cidade']), repeat=1), num_of_lines)
+	os.remove(os.path.join(file_folder, filename))
+
+
+
+def legacy_map_values(table, count=False):
+	#Implementação anterior de 'map_values' para linhas em dicionário: uma passagem completa por coluna, convertendo cada célula
+	output = OrderedDict()
+	for col in table[0].keys():
+		convert = column_converters[infer_column_type([line[col] for line in table[:column_inference_sample_size]])]
+		if count:
+			output[col] = Counter()
+			for line in table:
+				output[col].update([convert(line[col])])
+		else:
+			output[col] = {}
+			for line in table:
+				if not output[col].get(line[col]):
+					output[col][convert(line[col])] = True
+			output[col] = tuple(output[col].keys())
+	return output
+
+
+
+def bench_map_values(num_of_lines=50000, num_of_cols=40):
+	print("Tabulação de {} linhas com {} colunas".format(num_of_lines, num_of_cols))
+	fields = ['col{}'.format(n) for n in range(num_of_cols)]
+	table = []
+	for n in range(num_of_lines):
+		table.append(OrderedDict((col, str(randrange(idx * 5 + 2)) if idx % 2 else '{},{}'.format(randrange(50), randrange(10))) for idx, col in enumerate(fields)))
+
+	for count in (False, True):
+		label = "contagem" if count else "valores distintos"
+		report("  anterior, {}".format(label), best_time(lambda: legacy_map_values(table, count=count), repeat=1), num_of_lines * num_of_cols)
+		report("  map_values, {}, sem cache".format(label), best_time(lambda: calculation_handler.map_values(table, count=count, cache=False), repeat=1), num_of_lines * num_of_cols)
+		report("  map_values, {}".format(label), best_time(lambda: calculation_handler.map_values(table, count=count), repeat=1), num_of_lines * num_of_cols)
+
+
+
+def bench_relative_freq(num_of_lines=1000000):
+	print("Frequência relativa de todas as colunas de um arquivo com {} linhas ({} CPUs)".format(num_of_lines, os.cpu_count()))
+	file_folder, filename = make_csv_file(num_of_lines)
+
+	report("  load_full_csv + calculate_relative_freq", best_time(lambda: calculation_handler.calculate_relative_freq(load_full_csv(filename, file_folder=file_folder)), repeat=1), num_of_lines)
+	report("  calculate_file_relative_freq, workers=1", best_time(lambda: calculation_handler.calculate_file_relative_freq(filename, file_folder=file_folder, workers=1), repeat=1), num_of_lines)
+	report("  calculate_file_relative_freq, workers={}".format(os.cpu_count()), best_time(lambda: calculation_handler.calculate_file_relative_freq(filename, file_folder=file_folder), repeat=1), num_of_lines)
+	os.remove(os.path.join(file_folder, filename))
+
+
+
+def bench_frequency_table(num_of_lines=200000, num_of_appends=20):
+	print("Frequência relativa após cada linha acrescentada a um arquivo com {} linhas".format(num_of_lines))
+	file_folder, filename = make_csv_file(num_of_lines)
+	new_row = {'nome': 'Pessoa nova', 'idade': '30', 'altura': '1,70', 'cidade': 'Goiânia', 'escolaridade': 'Médio'}
+
+	def recompute():
+		for n in range(num_of_appends):
+			save_csv([new_row], filename, file_folder=file_folder, file_method='a')
+			calculation_handler.calculate_file_relative_freq(filename, file_folder=file_folder, workers=1)
+
+	report("  save_csv + calculate_file_relative_freq", best_time(recompute, repeat=1), num_of_appends)
+	report("  FrequencyTable, construção (recontagem completa)", best_time(lambda: calculation_handler.FrequencyTable(filename, file_folder=file_folder, workers=1), repeat=1), 1)
+	table = calculation_handler.FrequencyTable(filename, file_folder=file_folder, workers=1)
+
+	def incremental():
+		for n in range(num_of_appends):
+			save_csv([new_row], filename, file_folder=file_folder, file_method='a')
+			table.relative_freq()
+
+	report("  save_csv + FrequencyTable.relative_freq", best_time(incremental, repeat=1), num_of_appends)
+	table = calculation_handler.FrequencyTable(filename, file_folder=file_folder, cols=['idade', 'altura', 'cidade', 'escolaridade'], workers=1)
+	report("  idem, sem a coluna de valores únicos", best_time(incremental, repeat=1), num_of_appends)
+	os.remove(os.path.join(file_folder, filename))
+	os.remove(frequency_sidecar_path(filename, file_folder=file_folder))
+
+
+
+benchmarks = OrderedDict([
+	('load_csv', bench_load_csv),
+	('columnar_table', bench_columnar_table),
+	('column_inference', bench_column_inference),
+	('parallel_load', bench_parallel_load),
+	('csv_cache', bench_csv_cache),
+	('seek_for_lines', bench_seek_for_lines),
+	('transform_csv', bench_transform_csv),
+	('file_lock', bench_file_lock),
+	('bisect', bench_bisect),
+	('sorted_list', bench_sorted_list),
+	('unique_list', bench_unique_list),
+	('queue', bench_queue),
+	('heap', bench_heap),
+	('stack', bench_stack),
+	('colision_dict', bench_colision_dict),
+	('set_algebra', bench_set_algebra),
+	('diff_files', bench_diff_files),
+	('deep_diff', bench_deep_diff),
+	('hash_join', bench_hash_join),
+	('table_merge', bench_table_merge),
+	('group_by', bench_group_by),
+	('map_values', bench_map_values),
+	('relative_freq', bench_relative_freq),
+	('frequency_table', bench_frequency_table),
+])
+
+
+
+if __name__ == '__main__':
+	selected = sys.argv[1:] or list(benchmarks.keys())
+	for name in selected:
+		benchmarks[name]()
+		print('')
@@ -5,8 +5,18 @@
 
 
 
+import os
+import io
+import csv
+import itertools
+
 from collections import Counter, OrderedDict
-from cli_tools import create_col_labels, split_and_strip, print_list, sim_ou_nao, create_line_index, pick_options, try_implict_convert
+from operator import itemgetter
+from concurrent.futures import ProcessPoolExecutor
+from cli_tools import create_col_labels, split_and_strip, print_list, input_yes_or_no, create_line_index, pick_options, try_implict_convert
+from cli_tools import infer_column_type, column_converters, column_inference_sample_size, peek_rows
+from cli_tools import detect_file_encoding, find_csv_chunk_boundaries, parallel_min_file_size
+from cli_tools import read_frequency_sidecar, write_frequency_sidecar
 
 
 
@@ -36,7 +46,7 @@ def sum(lista, key=lambda x: x):
 
 
 
-def map_values(iterator, delimiter=False, select=False, count=False):
+def map_values(iterator, delimiter=False, select=False, count=False, cache=True):
     """Conta a quantidade de respostas das colunas de uma tabela
     
     Arguments:
@@ -45,9 +55,14 @@ def map_values(iterator, delimiter=False, select=False, count=False):
     Keyword Arguments:
         delimiter {bool} -- necessário se as linhas da tabela forem do tipo string (default: {False})
         select {bool} -- permite seleleção de colunas específicas (default: {False})
+        count {bool} -- retorna a contagem de cada valor em vez da lista de valores distintos (default: {False})
+        cache {bool} -- tabula os valores brutos e converte cada valor distinto uma única vez, ao final; se False, converte todas as células (default: {True})
 
     Returns:
-        {dict} -- dicionário com valores tabulados conforme as colunas da tabela
+        {dict} -- dicionário com valores tabulados conforme as colunas da tabela: um Counter por coluna se 'count', senão uma tupla de valores distintos
+
+    Observations:
+        As linhas são percorridas uma única vez, atualizando todas as colunas selecionadas ao mesmo tempo.
     """
 
     assert isinstance(iterator, (list, tuple))
@@ -63,7 +78,7 @@ def map_values(iterator, delimiter=False, select=False, count=False):
         fields = split_and_strip(iterator[0], delimiter)
 
         print_list(fields)
-        op = sim_ou_nao(input_label="Estes valores são os nomes corretos das colunas?")
+        op = input_yes_or_no(input_label="Estes valores são os nomes corretos das colunas?")
         if op == 'n': 
             fields = create_col_labels(iterator, delimiter=delimiter)
             iterator_data = iterator
@@ -73,7 +88,7 @@ def map_values(iterator, delimiter=False, select=False, count=False):
 
     else:
         print_list(iterator[0])
-        op = sim_ou_nao(input_label="Estes valores são os nomes corretos das colunas?")
+        op = input_yes_or_no(input_label="Estes valores são os nomes corretos das colunas?")
         if op == 'n':
             fields = create_col_labels(iterator, delimiter=delimiter)
             iterator_data = iterator
@@ -87,58 +102,84 @@ def map_values(iterator, delimiter=False, select=False, count=False):
     if select:
         selected_cols = pick_options(fields, input_label="Selecione as colunas que devem ser tabuladas", max_selection=len(fields))
 
-    output = OrderedDict()
-
-    if count:
-        for col in selected_cols:
-            output[col] = Counter()
-
-            if isinstance(iterator[0], dict):
-                for line in iterator_data:
-                    value = try_implict_convert(line[col])
-                    output[col].update([value])
+    if isinstance(iterator[0], str):
+        #Cada linha é dividida uma única vez, à medida que é lida
+        sample_rows, iterator_data = peek_rows((line.rstrip('\r\n').split(delimiter) for line in iterator_data), column_inference_sample_size)
+    else:
+        sample_rows = iterator_data[:column_inference_sample_size]
 
-            else:
-                for line in iterator_data:
-                    value = try_implict_convert(line[fileds_index_map[col]])
-                    output[col].update([value])
-    
+    if isinstance(iterator[0], dict):
+        getters = [itemgetter(col) for col in selected_cols]
     else:
-        for col in selected_cols:
-            output[col] = {}
+        getters = [itemgetter(fileds_index_map[col]) for col in selected_cols]
 
-            if isinstance(iterator[0], dict):
-                for line in iterator_data:
-                    if not output[col].get(line[col]):
-                        value = try_implict_convert(line[col])
-                        output[col][value] = True
-                output[col] = tuple(output[col].keys())
+    def col_converter(get):
+        return column_converters[infer_column_type([get(line) for line in sample_rows])]
+
+    converters = [col_converter(get) for get in getters]
+    output = OrderedDict()
 
+    if cache:
+        #Valores brutos repetidos são contados juntos e convertidos uma única vez
+        tallies = [{} for col in selected_cols]
+        columns = [(get, tally, tally.get) for get, tally in zip(getters, tallies)]
+        for line in iterator_data:
+            for get, tally, tally_get in columns:
+                raw = get(line)
+                tally[raw] = tally_get(raw, 0) + 1
+
+        for col, convert, tally in zip(selected_cols, converters, tallies):
+            if count:
+                #Valores brutos diferentes podem ter a mesma conversão (ex.: '1,5' e '1.5')
+                output[col] = Counter()
+                for raw, number in tally.items():
+                    output[col][convert(raw)] += number
             else:
-                for line in iterator_data:
-                    if not output[col].get(line[fileds_index_map[col]]):
-                        value = try_implict_convert(line[fileds_index_map[col]])
-                        output[col][value] = True
-                output[col] = tuple(output[col].keys())
+                output[col] = tuple(OrderedDict.fromkeys(convert(raw) for raw in tally))
+
+    else:
+        tallies = [Counter() if count else OrderedDict() for col in selected_cols]
+        columns = list(zip(getters, converters, tallies))
+        for line in iterator_data:
+            for get, convert, tally in columns:
+                value = convert(get(line))
+                if count:
+                    tally[value] += 1
+                else:
+                    tally[value] = True
+
+        for col, tally in zip(selected_cols, tallies):
+            output[col] = tally if count else tuple(tally.keys())
 
     return output
 
 
-def calculate_relative_freq(iterator, delimiter=False, select=False):
+def calculate_relative_freq(iterator, delimiter=False, select=False, file_folder=os.curdir, workers=None):
     """Calcula a quantidade absoluta e relativa das respostas fornecidas em uma tabela (tabulação)
     
     Arguments:
-        iterator {table} -- lista de dicionários, tuplas, listas ou strings com delmitadores de campo
+        iterator {table|string} -- lista de dicionários, tuplas, listas ou strings com delmitadores de campo, ou o nome de um arquivo CSV
     
     Keyword Arguments:
-        delimiter {bool} -- necessário se as linhas da tabela forem do tipo string (default: {False})
+        delimiter {bool} -- necessário se as linhas da tabela forem do tipo string; para arquivos CSV, o padrão é '\t' (default: {False})
         select {bool} -- permite seleleção de colunas específicas (default: {False})
+        file_folder {string} -- local onde o arquivo CSV se encontra (default: {os.curdir})
+        workers {int} -- quantidade de processos usados na leitura de arquivos CSV, ver 'calculate_file_relative_freq' (default: {None})
     
     Returns:
         {dict} -- dicionário com valores tabulados conforme as colunas da tabela
     """
+
+    if isinstance(iterator, str):
+        return calculate_file_relative_freq(iterator, file_folder=file_folder, delimiter=delimiter or '\t', select=select, workers=workers)
 	
-    absolute_freq = map_values(iterator, delimiter=False, select=False, count=True)
+    absolute_freq = map_values(iterator, delimiter=delimiter, select=select, count=True)
+    return relative_freq(absolute_freq)
+
+
+
+def relative_freq(absolute_freq):
+    """Substitui, em cada Counter de 'absolute_freq', a contagem de cada valor pela tupla (contagem, percentual da coluna)"""
 
     for col in absolute_freq:
         sigma_col = 0
@@ -151,3 +192,469 @@ def calculate_relative_freq(iterator, delimiter=False, select=False):
     return absolute_freq
 
 
+
+def count_csv_byte_range(path, start, end, col_indexes, encoding='utf8', delimiter='\t', lineterminator='\n'):
+    """Conta os valores das colunas selecionadas em uma faixa de bytes de um arquivo CSV. Função executada pelos processos de 'calculate_file_relative_freq'
+    
+    Arguments:
+        path {string} -- caminho até o arquivo CSV
+        start {int} -- posição inicial da faixa
+        end {int} -- posição final da faixa
+        col_indexes {list} -- posição de cada coluna a ser contada
+    
+    Keyword Arguments:
+        encoding {string} -- codificação do arquivo (default: {'utf8'})
+        delimiter {char} -- caractere delimitador de campo (default: {'\t'})
+        lineterminator {char} -- caractere delimitador de linha (default: {'\n'})
+    
+    Returns:
+        {list} -- um Counter de valores brutos (strings) para cada coluna de 'col_indexes'
+
+    Observations:
+        Somente as contagens voltam ao processo principal; as linhas nunca são copiadas entre processos.
+    """
+
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    text = io.StringIO(data.decode(encoding, errors='cp1252_fallback'), newline=None)
+    del data
+    reader = csv.reader(text, delimiter=delimiter, lineterminator=lineterminator)
+    counters = [Counter() for idx in col_indexes]
+    width = max(col_indexes) + 1 if col_indexes else 0
+
+    #As linhas são contadas em lotes, transpostos em colunas para que 'Counter.update' faça a contagem
+    while True:
+        batch = list(itertools.islice(reader, 10000))
+        if not batch:
+            break
+        rows = [row for row in batch if row]
+        if not rows:
+            continue
+        if min(map(len, rows)) < width:
+            #Linhas incompletas: as colunas ausentes contam como vazias
+            rows = [row + [''] * (width - len(row)) if len(row) < width else row for row in rows]
+        columns = list(zip(*rows))
+        for counter, idx in zip(counters, col_indexes):
+            counter.update(columns[idx])
+
+    return counters
+
+
+
+def count_file_values(filename, file_folder=os.curdir, delimiter='\t', lineterminator='\n', select=False, cols=None, encoding=None, workers=None):
+    """Conta os valores brutos (strings) das colunas de um arquivo CSV, dividindo o arquivo entre processos
+    
+    Arguments:
+        filename {string} -- nome do arquivo CSV
+    
+    Keyword Arguments:
+        file_folder {string} -- local onde o arquivo se encontra (default: {os.curdir})
+        delimiter {char} -- caractere delimitador de campo (default: {'\t'})
+        lineterminator {char} -- caractere delimitador de linha (default: {'\n'})
+        select {bool} -- permite seleleção de colunas específicas (default: {False})
+        cols {list} -- colunas a serem contadas, sem perguntas ao usuário; se None, todas (default: {None})
+        encoding {string} -- codificação do arquivo, se None será detectada por 'detect_file_encoding' (default: {None})
+        workers {int} -- quantidade de processos, se None usa 'os.cpu_count()' (default: {None})
+    
+    Returns:
+        {tuple} -- (colunas do arquivo, OrderedDict {coluna: Counter de valores brutos})
+
+    Observations:
+        O arquivo é dividido em faixas de bytes por 'find_csv_chunk_boundaries' e cada processo lê e conta a sua faixa; as contagens parciais são somadas ao final.
+        Arquivos menores que 'parallel_min_file_size', ou com workers=1, são contados no próprio processo.
+    """
+
+    path = os.path.join(file_folder, filename)
+    workers = workers or os.cpu_count() or 1
+
+    if not encoding:
+        encoding = detect_file_encoding(filename, file_folder=file_folder)
+
+    num_of_chunks = workers * 4 if workers > 1 and os.path.getsize(path) >= parallel_min_file_size else 1
+    header_end, chunks = find_csv_chunk_boundaries(filename, num_of_chunks, file_folder=file_folder, delimiter=delimiter)
+
+    with open(path, 'rb') as f:
+        header = f.read(header_end).decode(encoding, errors='cp1252_fallback')
+    fields = next(csv.reader(io.StringIO(header, newline=None), delimiter=delimiter, lineterminator=lineterminator), [])
+
+    selected_cols = cols or fields
+    if select and not cols:
+        selected_cols = pick_options(fields, input_label="Selecione as colunas que devem ser tabuladas", max_selection=len(fields))
+    col_indexes = [fields.index(col) for col in selected_cols]
+
+    arguments = [[path] * len(chunks), [chunk[0] for chunk in chunks], [chunk[1] for chunk in chunks],
+        [col_indexes] * len(chunks), [encoding] * len(chunks), [delimiter] * len(chunks), [lineterminator] * len(chunks)]
+
+    if len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partials = list(executor.map(count_csv_byte_range, *arguments))
+    else:
+        partials = list(map(count_csv_byte_range, *arguments))
+
+    if not partials:
+        partials = [[Counter() for idx in col_indexes]]
+
+    raw_counts = OrderedDict()
+    for idx, col in enumerate(selected_cols):
+        raw_counts[col] = partials[0][idx]
+        for partial in partials[1:]:
+            raw_counts[col].update(partial[idx])
+
+    return fields, raw_counts
+
+
+
+def convert_counts(raw_counts):
+    """Converte os valores brutos (strings) das contagens de cada coluna como em 'map_values', uma única vez por valor distinto
+    
+    Arguments:
+        raw_counts {dict} -- {coluna: Counter de valores brutos}
+    
+    Returns:
+        {OrderedDict} -- {coluna: Counter de valores convertidos}; valores que resultem no mesmo valor convertido são somados
+    """
+
+    absolute_freq = OrderedDict()
+    for col, counts in raw_counts.items():
+        convert = column_converters[infer_column_type(list(itertools.islice(counts, column_inference_sample_size)))]
+        absolute_freq[col] = Counter()
+        for raw, number in counts.items():
+            absolute_freq[col][convert(raw)] += number
+
+    return absolute_freq
+
+
+
+def calculate_file_relative_freq(filename, file_folder=os.curdir, delimiter='\t', lineterminator='\n', select=False, cols=None, encoding=None, workers=None):
+    """Calcula a quantidade absoluta e relativa dos valores das colunas de um arquivo CSV, dividindo o arquivo entre processos
+    
+    Arguments:
+        filename {string} -- nome do arquivo CSV
+    
+    Keyword Arguments:
+        file_folder {string} -- local onde o arquivo se encontra (default: {os.curdir})
+        delimiter {char} -- caractere delimitador de campo (default: {'\t'})
+        lineterminator {char} -- caractere delimitador de linha (default: {'\n'})
+        select {bool} -- permite seleleção de colunas específicas (default: {False})
+        cols {list} -- colunas a serem tabuladas, sem perguntas ao usuário; se None, todas (default: {None})
+        encoding {string} -- codificação do arquivo, se None será detectada por 'detect_file_encoding' (default: {None})
+        workers {int} -- quantidade de processos, se None usa 'os.cpu_count()' (default: {None})
+    
+    Returns:
+        {dict} -- mesmo formato de 'calculate_relative_freq': {coluna: {valor: (contagem, percentual)}}
+
+    Observations:
+        A contagem é feita por 'count_file_values' e a conversão por 'convert_counts'.
+    """
+
+    fields, raw_counts = count_file_values(filename, file_folder=file_folder, delimiter=delimiter, lineterminator=lineterminator,
+        select=select, cols=cols, encoding=encoding, workers=workers)
+    return relative_freq(convert_counts(raw_counts))
+
+
+
+class FrequencyTable():
+    """Tabela de frequências persistente de um arquivo CSV. As contagens por coluna ficam no arquivo auxiliar '<arquivo>.freq' e são
+    atualizadas pelas linhas acrescentadas com 'append_to_text_table_file' e 'save_csv(file_method='a')', sem reler o arquivo.
+
+    Arguments:
+        filename {string} -- nome do arquivo CSV
+
+    Keyword Arguments:
+        file_folder {string} -- local onde o arquivo se encontra (default: {os.curdir})
+        delimiter {char} -- caractere delimitador de campo (default: {'\t'})
+        lineterminator {char} -- caractere delimitador de linha (default: {'\n'})
+        cols {list} -- colunas consultadas; se None, todas (default: {None})
+        encoding {string} -- codificação do arquivo, se None será detectada (default: {None})
+        workers {int} -- quantidade de processos usados na reconstrução (default: {None})
+
+    Methods:
+        refresh -- lê do arquivo auxiliar só as contagens acrescentadas desde a última leitura; reconstrói as contagens se ele estiver ausente ou desatualizado
+        rebuild -- reconta o arquivo inteiro e grava um novo arquivo auxiliar
+        absolute_freq -- {coluna: Counter} com as contagens atuais
+        relative_freq -- {coluna: {valor: (contagem, percentual)}}, como 'calculate_file_relative_freq'
+
+    Observations:
+        O arquivo auxiliar guarda o tamanho e a data de modificação do CSV; se o CSV for alterado por outro meio, as contagens são refeitas por inteiro na próxima consulta.
+        O arquivo auxiliar conta todas as colunas, de modo que tabelas com 'cols' diferentes sobre o mesmo CSV compartilham as mesmas contagens.
+        Os valores convertidos de cada coluna são mantidos em memória e atualizados com as contagens acrescentadas, de modo que as consultas custam O(valores distintos).
+    """
+
+    def __init__(self, filename, file_folder=os.curdir, delimiter='\t', lineterminator='\n', cols=None, encoding=None, workers=None):
+        self.filename = filename
+        self.file_folder = file_folder
+        self.options = {'delimiter': delimiter, 'lineterminator': lineterminator}
+        self.cols = list(cols) if cols else None
+        self.encoding = encoding
+        self.workers = workers
+        self.position = None
+        self.refresh()
+
+    def __repr__(self):
+        return "FrequencyTable({!r}, rows={}, cols={})".format(os.path.join(self.file_folder, self.filename), self.rows, list(self.counts))
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, col):
+        return self.counts[col]
+
+    def reset(self, header):
+        self.fields = header['fields']
+        self.rows = 0
+        for col in self.cols or ():
+            assert col in header['cols'], "A coluna '{}' não existe no arquivo '{}'".format(col, self.filename)
+        self.counts = OrderedDict((col, Counter()) for col in self.cols or header['cols'])
+        self.converted = {}
+        self.converters = {}
+
+    def apply(self, record):
+        self.rows += record['rows']
+        for col, delta in record['counts'].items():
+            counts = self.counts.get(col)
+            if counts is None:
+                continue
+            if col in self.converted:
+                #Valores novos entre os primeiros 'column_inference_sample_size' podem mudar o tipo inferido da coluna
+                if len(counts) < column_inference_sample_size and any(value not in counts for value in delta):
+                    del self.converted[col]
+                else:
+                    convert, converted = self.converters[col], self.converted[col]
+                    for raw, number in delta.items():
+                        converted[convert(raw)] += number
+            counts.update(delta)
+
+    def refresh(self):
+        sidecar = read_frequency_sidecar(self.filename, file_folder=self.file_folder, position=self.position)
+        if sidecar is None:
+            return self.rebuild()
+
+        header = sidecar['header']
+        if header is not None:
+            if header['options'] != self.options or header['cols'] != header['fields']:
+                return self.rebuild()
+            self.reset(header)
+
+        for record in sidecar['records']:
+            self.apply(record)
+        self.position = sidecar['position']
+        return self
+
+    def rebuild(self):
+        #O 'os.stat' é obtido antes da leitura: linhas acrescentadas durante a contagem tornam o arquivo auxiliar desatualizado
+        source_stat = os.stat(os.path.join(self.file_folder, self.filename))
+        fields, raw_counts = count_file_values(self.filename, file_folder=self.file_folder, encoding=self.encoding, workers=self.workers, **self.options)
+
+        header = {'options': dict(self.options), 'fields': fields, 'cols': list(raw_counts)}
+        first_col = next(iter(raw_counts.values()), Counter())
+        record = {'rows': sum(list(first_col.values())), 'counts': raw_counts}
+        position = write_frequency_sidecar(header, record, self.filename, file_folder=self.file_folder, source_stat=source_stat)
+
+        self.reset(header)
+        self.apply(record)
+        self.position = position
+        return self
+
+    def converted_counts(self, col):
+        if col not in self.converted:
+            counts = self.counts[col]
+            self.converters[col] = column_converters[infer_column_type(list(itertools.islice(counts, column_inference_sample_size)))]
+            self.converted[col] = convert_counts({col: counts})[col]
+        return self.converted[col]
+
+    def absolute_freq(self, convert=True):
+        self.refresh()
+        return OrderedDict((col, Counter(self.converted_counts(col) if convert else counts)) for col, counts in self.counts.items())
+
+    def relative_freq(self, convert=True):
+        self.refresh()
+        output = OrderedDict()
+        for col, counts in self.counts.items():
+            if convert:
+                counts = self.converted_counts(col)
+            #Cada linha contada soma 1 em todas as colunas, então o total de cada coluna é a quantidade de linhas
+            output[col] = Counter({value: (number, (number / self.rows)*100) for value, number in counts.items()})
+        return output
+
+
+
+def table_rows(iterator, delimiter=False, fields=None):
+    """Identifica o formato de uma tabela sem perguntas ao usuário
+    
+    Arguments:
+        iterator {table|iterator} -- lista ou iterador de dicionários, tuplas, listas ou strings com delimitadores de campo
+    
+    Keyword Arguments:
+        delimiter {bool} -- necessário se as linhas da tabela forem do tipo string (default: {False})
+        fields {list} -- nomes das colunas de tabelas de listas/tuplas/strings; se None, a primeira linha é o cabeçalho (default: {None})
+    
+    Returns:
+        {tuple} -- (lista de colunas, iterador de linhas, True se as linhas forem dicionários/'CSVRow')
+
+    Observations:
+        Linhas do tipo string são divididas uma única vez, à medida que são lidas.
+    """
+
+    rows = iter(iterator)
+    first_row = next(rows, None)
+
+    if first_row is None:
+        return list(fields or ()), iter(()), False
+
+    if hasattr(first_row, 'keys'):
+        return list(fields or first_row.keys()), itertools.chain([first_row], rows), True
+
+    if isinstance(first_row, str):
+        assert delimiter != False, "Tabelas com linhas do tipo string precisam do argumento 'delimiter'"
+        rows = (line.rstrip('\r\n').split(delimiter) for line in itertools.chain([first_row], rows))
+        first_row = next(rows)
+
+    if fields is None:
+        return [field.strip() if isinstance(field, str) else field for field in first_row], rows, False
+    return list(fields), itertools.chain([first_row], rows), False
+
+
+
+def group_by(iterator, by, aggregations=('count',), delimiter=False, fields=None, convert=True):
+    """Agrupa as linhas de uma tabela pelos valores de uma ou mais colunas e calcula agregações para cada grupo, em uma única passagem pelos dados
+    
+    Arguments:
+        iterator {table|iterator} -- lista ou iterador de dicionários, tuplas, listas ou strings com delimitadores de campo (ex.: 'load_csv')
+        by {string|list} -- coluna de agrupamento, ou lista de colunas
+    
+    Keyword Arguments:
+        aggregations {list} -- 'count', 'freq' e tuplas (agregação, coluna) com 'sum', 'mean', 'min', 'max' ou 'distinct' (default: {('count',)})
+        delimiter {bool} -- necessário se as linhas da tabela forem do tipo string (default: {False})
+        fields {list} -- nomes das colunas de tabelas de listas/tuplas/strings; se None, a primeira linha é o cabeçalho (default: {None})
+        convert {bool} -- converte os valores das colunas agregadas conforme o tipo identificado por 'infer_column_type' (default: {True})
+    
+    Returns:
+        {OrderedDict} -- {grupo: {rótulo: valor}}, com os grupos na ordem em que aparecem; o grupo é o valor da coluna ou, se 'by' for uma lista, a tupla de valores
+
+    Observations:
+        Os rótulos são 'count', 'freq' (percentual das linhas da tabela) e '<agregação>_<coluna>' (ex.: 'mean_idade').
+        Células vazias são ignoradas pelas agregações por coluna, assim como valores não numéricos por 'sum' e 'mean' e, em colunas numéricas, por 'min' e 'max'. 'mean', 'min' e 'max' de grupos sem valores resultam em None.
+        Colunas identificadas como texto são numéricas se a maioria das células da amostra for número; as demais têm 'min' e 'max' calculados sobre o texto.
+        O tipo de cada coluna agregada é identificado pelas primeiras linhas ('column_inference_sample_size'), que são lidas antes e processadas normalmente em seguida.
+    """
+
+    fields, rows, mapping_rows = table_rows(iterator, delimiter=delimiter, fields=fields)
+    if not fields:
+        return OrderedDict()
+
+    def getter(cols):
+        if mapping_rows:
+            return itemgetter(*cols)
+        return itemgetter(*[fields.index(col) for col in cols])
+
+    if not isinstance(by, (list, tuple)):
+        key_of = getter([by])
+    elif len(by) == 1:
+        get_key = getter(by)
+        key_of = lambda row: (get_key(row),)
+    else:
+        key_of = getter(by)
+
+    #Cada coluna agregada é lida (e convertida) uma única vez por linha, mesmo que usada por várias agregações
+    labels = []
+    value_cols = []
+    col_specs = []
+    template = [0]
+    for aggregation in aggregations:
+        if isinstance(aggregation, str):
+            assert aggregation in ('count', 'freq'), "Agregação '{}' precisa de uma coluna".format(aggregation)
+            labels.append((aggregation, aggregation, 0))
+            continue
+
+        kind, col = aggregation
+        assert kind in ('sum', 'mean', 'min', 'max', 'distinct'), "Agregação desconhecida: '{}'".format(kind)
+        if col not in value_cols:
+            value_cols.append(col)
+            col_specs.append([])
+        slot = len(template)
+        template.extend({'sum': [0], 'mean': [0, 0], 'min': [None], 'max': [None], 'distinct': [None]}[kind])
+        col_specs[value_cols.index(col)].append((kind, slot))
+        labels.append(('{}_{}'.format(kind, col), kind, slot))
+
+    getters = [getter([col]) for col in value_cols]
+    distinct_slots = [slot for specs in col_specs for kind, slot in specs if kind == 'distinct']
+
+    converters = [None] * len(value_cols)
+    numeric = [False] * len(value_cols)
+    if convert and value_cols:
+        sample, rows = peek_rows(rows, column_inference_sample_size)
+        for idx, get in enumerate(getters):
+            values = [value for value in map(get, sample) if isinstance(value, str)]
+            kind = infer_column_type(values)
+            if kind != 'string':
+                converters[idx] = column_converters[kind]
+                numeric[idx] = True
+            elif any(spec in ('sum', 'mean', 'min', 'max') for spec, slot in col_specs[idx]):
+                #Colunas numéricas com algumas células de texto ('N/A', '-'...): converte o que for possível
+                converted = [try_implict_convert(value) for value in values if value != '']
+                numeric[idx] = 2 * len([value for value in converted if type(value) in (int, float)]) > len(converted)
+                if numeric[idx] or any(spec in ('sum', 'mean') for spec, slot in col_specs[idx]):
+                    converters[idx] = try_implict_convert
+
+    columns = list(zip(getters, converters, numeric, col_specs))
+    groups = OrderedDict()
+    total = 0
+
+    for row in rows:
+        total += 1
+        key = key_of(row)
+        state = groups.get(key)
+        if state is None:
+            state = groups[key] = list(template)
+            for slot in distinct_slots:
+                state[slot] = set()
+        state[0] += 1
+
+        for get, convert_value, numeric_col, specs in columns:
+            raw = value = get(row)
+            if value is None or value == '':
+                continue
+            if convert_value is not None and isinstance(value, str):
+                value = convert_value(value)
+            #Em colunas numéricas, 'min' e 'max' ignoram as células de texto; nas demais, comparam os valores sem conversão
+            if not numeric_col:
+                ordered = raw
+            else:
+                ordered = value if type(value) in (int, float) else None
+
+            for kind, slot in specs:
+                if kind == 'sum':
+                    if type(value) in (int, float):
+                        state[slot] += value
+                elif kind == 'mean':
+                    if type(value) in (int, float):
+                        state[slot] += value
+                        state[slot + 1] += 1
+                elif kind == 'min':
+                    if ordered is not None and (state[slot] is None or ordered < state[slot]):
+                        state[slot] = ordered
+                elif kind == 'max':
+                    if ordered is not None and (state[slot] is None or ordered > state[slot]):
+                        state[slot] = ordered
+                else:
+                    state[slot].add(value)
+
+    output = OrderedDict()
+    for key, state in groups.items():
+        result = OrderedDict()
+        for label, kind, slot in labels:
+            if kind == 'count':
+                result[label] = state[0]
+            elif kind == 'freq':
+                result[label] = (state[0] / total) * 100
+            elif kind == 'mean':
+                result[label] = state[slot] / state[slot + 1] if state[slot + 1] else None
+            elif kind == 'distinct':
+                result[label] = len(state[slot])
+            else:
+                result[label] = state[slot]
+        output[key] = result
+
+    return output
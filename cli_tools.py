@@ -14,148 +14,620 @@ import tempfile
 import heapq
 import re
 import time
+import codecs
+import io
+import pickle
+import shutil
+import mmap
+import struct
+import hashlib
+import threading
+import asyncio
 
 from colored import fg, attr#, bg
 from subprocess import getoutput
 from random import randrange, randint
 from string import whitespace, punctuation, digits, ascii_letters
-from collections import OrderedDict#, Counter
+from collections import OrderedDict, deque, Counter
+from collections.abc import Mapping, Sequence
+from array import array
+from bisect import bisect_left, bisect_right, insort
 from copy import copy
+from operator import itemgetter
+from concurrent.futures import ProcessPoolExecutor
+from queue import Full, Empty
 
 
 from decorators import clear_screen
+import set_algebra
+
+try:
+	import fcntl
+except ImportError:
+	fcntl = None
 
 tmp_folder = tempfile.gettempdir()
+encoding_sample_size = 64 * 1024
+parallel_min_file_size = 32 * 1024 * 1024
+csv_cache_folder = os.path.join(tmp_folder, 'csv_cache')
+csv_cache_max_size = 512 * 1024 * 1024
+#Alterado sempre que o formato de 'ColumnarTable' muda, invalida os caches gravados antes
+csv_cache_version = 2
+frequency_sidecar_suffix = '.freq'
+frequency_sidecar_trailer = struct.Struct('<qqqQ')
+frequency_sidecar_min_journal = 64 * 1024
 
 class PK_LinkedList(list):
+    """Lista sem elementos repetidos que preserva a ordem de inserção. A pertinência é verificada em O(1) por um conjunto ('_members') mantido junto com a lista, de modo que os elementos devem ser hasheáveis."""
+
+    def __new__(cls, *args, **kwargs):
+        #O pickle da lista (formato antigo) chama 'extend' antes de '__init__', então '_members' tem de existir desde a criação
+        output = super(PK_LinkedList, cls).__new__(cls, *args, **kwargs)
+        output._members = set()
+        return output
+
     def __init__(self, iterator=()):
-        super(PK_LinkedList, self).__init__(iterator)
+        super(PK_LinkedList, self).__init__(OrderedDict.fromkeys(iterator))
+        self._members = set(self)
         self.sorted = False
 
+    def __reduce__(self):
+        #O conjunto '_members' não é gravado, é reconstruído a partir dos elementos em 'restore'
+        state = {key: value for key, value in self.__dict__.items() if key != '_members'}
+        return (self.__class__.restore, (list(self), state))
+
+    @classmethod
+    def restore(cls, elements, state):
+        output = cls.__new__(cls)
+        list.extend(output, elements)
+        output.__dict__.update(state)
+        output._members = set(elements)
+        return output
+
+    def __contains__(self, element):
+        return element in self._members
+
     def __sub__(self, other):
-        for element in other:
-            self.remove(element)
+        removed = self._members.intersection(other)
+        if removed:
+            super(PK_LinkedList, self).__setitem__(slice(None), [element for element in self if element not in removed])
+            self._members -= removed
         return self
 
+    def __setitem__(self, idx, value):
+        if isinstance(idx, slice):
+            replaced = set(self[idx])
+            #Valores repetidos, ou já presentes fora da fatia substituída, são ignorados
+            values = [element for element in OrderedDict.fromkeys(value) if element not in self._members or element in replaced]
+            super(PK_LinkedList, self).__setitem__(idx, values)
+            self._members.difference_update(replaced)
+            self._members.update(values)
+            return
+
+        replaced = self[idx]
+        if value in self._members and value != replaced:
+            print("Item já está na lista...")
+            return
+        super(PK_LinkedList, self).__setitem__(idx, value)
+        self._members.discard(replaced)
+        self._members.add(value)
+
+    def __delitem__(self, idx):
+        removed = self[idx] if isinstance(idx, slice) else [self[idx]]
+        super(PK_LinkedList, self).__delitem__(idx)
+        self._members.difference_update(removed)
+
     def append(self, element):
-        if self.index(element) != None:
+        if element in self._members:
             print("Item já está na lista...")
             return
 
         super(PK_LinkedList, self).append(element)
+        self._members.add(element)
+
+    def extend(self, iterator):
+        for element in iterator:
+            if element not in self._members:
+                super(PK_LinkedList, self).append(element)
+                self._members.add(element)
+
+    def __iadd__(self, iterator):
+        self.extend(iterator)
+        return self
+
+    def insert(self, idx, element):
+        if element in self._members:
+            print("Item já está na lista...")
+            return
+
+        super(PK_LinkedList, self).insert(idx, element)
+        self._members.add(element)
+
+    def remove(self, element):
+        super(PK_LinkedList, self).remove(element)
+        self._members.discard(element)
+
+    def pop(self, idx=-1):
+        element = super(PK_LinkedList, self).pop(idx)
+        self._members.discard(element)
+        return element
+
+    def clear(self):
+        super(PK_LinkedList, self).clear()
+        self._members.clear()
 
     def index(self, element, self_list_nfo=False):
-        check_element = bisect_search_idx(element, self, (0, len(self)))
-        if not isinstance(check_element, bool): return check_element
-        else: return None
+        if element not in self._members: return None
+        return super(PK_LinkedList, self).index(element)
+
+
+class SortedList():
+    """Lista sempre ordenada, guardada em blocos ordenados de até 2 * 'load_factor' elementos. Inserção, remoção e pesquisa custam O(log n) comparações mais o deslocamento dentro de um único bloco.
+
+    Arguments:
+        iterator {iterator} -- elementos iniciais, em qualquer ordem (default: {()})
+
+    Methods:
+        add -- insere um elemento na posição correta
+        update -- insere vários elementos de uma vez
+        remove, discard, pop -- removem elementos
+        index, count -- posição e quantidade de um elemento
+        irange -- percorre os elementos entre dois valores
+    """
+
+    load_factor = 1000
+
+    def __init__(self, iterator=()):
+        self._blocks = []
+        self._maxes = []
+        self._offsets = None
+        self._len = 0
+        self.sorted = True
+        self.update(iterator)
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self._blocks)
+
+    def __reversed__(self):
+        return itertools.chain.from_iterable(reversed(block) for block in reversed(self._blocks))
+
+    def __contains__(self, value):
+        block_idx, idx = self._locate(value)
+        return idx is not None
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return list(self)[idx]
+        if idx < 0:
+            idx += self._len
+        if not 0 <= idx < self._len:
+            raise IndexError("Índice fora dos limites da lista")
+        block_idx = bisect_right(self._block_offsets(), idx)
+        return self._blocks[block_idx][idx - self._block_start(block_idx)]
+
+    def __eq__(self, other):
+        if isinstance(other, (SortedList, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, list(self))
+
+    def _locate(self, value):
+        #Retorna (bloco, posição no bloco) do primeiro elemento igual a 'value'; a posição é None se ele não existir
+        block_idx = bisect_left(self._maxes, value)
+        if block_idx == len(self._maxes):
+            return block_idx, None
+        block = self._blocks[block_idx]
+        idx = bisect_left(block, value)
+        if block[idx] == value:
+            return block_idx, idx
+        return block_idx, None
+
+    def _block_offsets(self):
+        #Posição final acumulada de cada bloco, recalculada apenas depois de alterações
+        if self._offsets is None:
+            self._offsets = list(itertools.accumulate(len(block) for block in self._blocks))
+        return self._offsets
+
+    def _block_start(self, block_idx):
+        return self._block_offsets()[block_idx - 1] if block_idx else 0
+
+    def _rebuild(self, sorted_values):
+        load = self.load_factor
+        self._blocks = [sorted_values[idx:idx + load] for idx in range(0, len(sorted_values), load)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._offsets = None
+        self._len = len(sorted_values)
+
+    def _delete(self, block_idx, idx):
+        block = self._blocks[block_idx]
+        del block[idx]
+        if block:
+            self._maxes[block_idx] = block[-1]
+        else:
+            del self._blocks[block_idx]
+            del self._maxes[block_idx]
+        self._offsets = None
+        self._len -= 1
+
+    def add(self, value):
+        if not self._blocks:
+            self._blocks.append([value])
+            self._maxes.append(value)
+        else:
+            block_idx = bisect_right(self._maxes, value)
+            if block_idx == len(self._maxes):
+                block_idx -= 1
+                self._blocks[block_idx].append(value)
+                self._maxes[block_idx] = value
+            else:
+                insort(self._blocks[block_idx], value)
+
+            block = self._blocks[block_idx]
+            if len(block) > 2 * self.load_factor:
+                self._blocks.insert(block_idx + 1, block[self.load_factor:])
+                del block[self.load_factor:]
+                self._maxes.insert(block_idx, block[-1])
+
+        self._offsets = None
+        self._len += 1
+
+    def update(self, iterator):
+        values = sorted(iterator)
+        if not values:
+            return
+        #Muitos elementos novos: uma única ordenação (duas sequências já ordenadas) e reconstrução dos blocos
+        if len(values) * 8 > self._len:
+            values.extend(self)
+            values.sort()
+            self._rebuild(values)
+        else:
+            for value in values:
+                self.add(value)
+
+    def extend(self, iterator):
+        self.update(iterator)
+
+    def remove(self, value):
+        block_idx, idx = self._locate(value)
+        if idx is None:
+            raise ValueError("{!r} não está na lista".format(value))
+        self._delete(block_idx, idx)
+
+    def discard(self, value):
+        block_idx, idx = self._locate(value)
+        if idx is not None:
+            self._delete(block_idx, idx)
+
+    def pop(self, idx=-1):
+        if not self._len:
+            raise IndexError("A lista está vazia")
+        if idx < 0:
+            idx += self._len
+        if not 0 <= idx < self._len:
+            raise IndexError("Índice fora dos limites da lista")
+        block_idx = bisect_right(self._block_offsets(), idx)
+        idx -= self._block_start(block_idx)
+        value = self._blocks[block_idx][idx]
+        self._delete(block_idx, idx)
+        return value
+
+    def clear(self):
+        self._rebuild([])
+
+    def index(self, value):
+        block_idx, idx = self._locate(value)
+        if idx is None:
+            raise ValueError("{!r} não está na lista".format(value))
+        return self._block_start(block_idx) + idx
+
+    def count(self, value):
+        return sum(1 for element in self.irange(value, value))
+
+    def irange(self, minimum=None, maximum=None, inclusive=(True, True)):
+        """Percorre, em ordem, os elementos entre 'minimum' e 'maximum'
+
+        Keyword Arguments:
+            minimum {any} -- limite inferior, None para começar do primeiro elemento (default: {None})
+            maximum {any} -- limite superior, None para ir até o último elemento (default: {None})
+            inclusive {tuple} -- indica se cada limite faz parte do intervalo (default: {(True, True)})
+
+        Yields:
+            {any} -- os elementos do intervalo
+        """
+
+        if minimum is None:
+            block_idx, idx = 0, 0
+        else:
+            find = bisect_left if inclusive[0] else bisect_right
+            block_idx = find(self._maxes, minimum)
+            idx = find(self._blocks[block_idx], minimum) if block_idx < len(self._blocks) else 0
+
+        for block in itertools.islice(self._blocks, block_idx, None):
+            for value in itertools.islice(block, idx, None):
+                if maximum is not None and (value > maximum or (value == maximum and not inclusive[1])):
+                    return
+                yield value
+            idx = 0
+
+
+Sequence.register(SortedList)
 
 
 class PK_OrderedLinkedList(list):
+    """Lista ordenada sem elementos repetidos. Os elementos ficam no próprio armazenamento da lista, sempre em ordem crescente, de modo que ela continua sendo uma 'list' (pickle, json e 'isinstance'); pesquisas usam bisect e custam O(log n)
+
+    Observations:
+        Cada inserção fora do final desloca os elementos seguintes (memmove, O(n) mas sem comparações). Para milhões de inserções em ordem aleatória use 'update' em lote, ou 'SortedList', cujas inserções são O(log n).
+    """
+
     def __init__(self, iterator=()):
-        super(PK_OrderedLinkedList, self).__init__(iterator)
-        self.sorted = False
+        super(PK_OrderedLinkedList, self).__init__()
+        self.sorted = True
+        self.update(iterator)
+
+    def _find(self, element):
+        idx = bisect_left(self, element)
+        if idx < len(self) and self[idx] == element:
+            return idx
+        return None
+
+    def __contains__(self, element):
+        return self._find(element) is not None
 
     def __sub__(self, other):
         for element in other:
-            self.remove(element)
+            self.discard(element)
         return self
 
-    def append(self, element):
-        if self.index(element) != None:
+    def __setitem__(self, idx, value):
+        #A posição é definida pela ordem: os elementos substituídos saem e os novos entram nos seus lugares
+        del self[idx]
+        if isinstance(idx, slice):
+            self.update(value)
+        else:
+            self.add(value)
+
+    def add(self, element):
+        idx = bisect_left(self, element)
+        if idx < len(self) and self[idx] == element:
             print("Item já está na lista...")
             return
+        super(PK_OrderedLinkedList, self).insert(idx, element)
 
-        try:
-            if element > self[-1]:
-                self.sorted = True
-            else:
-                self.sorted = False
-        except IndexError:
-            self.sorted = True
-        
-        super(PK_OrderedLinkedList, self).append(element)
+    def append(self, element):
+        self.add(element)
+
+    def insert(self, idx, element):
+        #A lista é sempre ordenada: o elemento vai para a sua posição, independente de 'idx'
+        self.add(element)
+
+    def update(self, iterator):
+        values = [value for value, group in itertools.groupby(sorted(iterator)) if value not in self]
+        if not values:
+            return
+        #Muitos elementos novos: uma única ordenação (duas sequências já ordenadas) no lugar de várias inserções
+        if len(values) * 8 > len(self):
+            values.extend(self)
+            values.sort()
+            super(PK_OrderedLinkedList, self).__setitem__(slice(None), values)
+        else:
+            for value in values:
+                super(PK_OrderedLinkedList, self).insert(bisect_left(self, value), value)
+
+    def extend(self, iterator):
+        self.update(iterator)
+
+    def __iadd__(self, iterator):
+        self.update(iterator)
+        return self
 
-        if not self.sorted:
-            self.sort()
+    def remove(self, element):
+        idx = self._find(element)
+        if idx is None:
+            raise ValueError("{!r} não está na lista".format(element))
+        del self[idx]
+
+    def discard(self, element):
+        idx = self._find(element)
+        if idx is not None:
+            del self[idx]
+
+    def sort(self, key=None, reverse=False):
+        assert key is None and not reverse, "A lista é mantida sempre em ordem crescente"
+
+    def copy(self):
+        return self.__class__(self)
 
     def index(self, element, self_list_nfo=False):
-        check_element = bisect_search_idx(element, self, (0, len(self)))
-        if not isinstance(check_element, bool): return check_element
-        else: return None
-            
-            
+        return self._find(element)
+
+    def count(self, element):
+        return int(element in self)
+
+    def irange(self, minimum=None, maximum=None, inclusive=(True, True)):
+        """Percorre, em ordem, os elementos entre 'minimum' e 'maximum', ver 'SortedList.irange'
+
+        Keyword Arguments:
+            minimum {any} -- limite inferior, None para começar do primeiro elemento (default: {None})
+            maximum {any} -- limite superior, None para ir até o último elemento (default: {None})
+            inclusive {tuple} -- indica se cada limite faz parte do intervalo (default: {(True, True)})
+
+        Yields:
+            {any} -- os elementos do intervalo
+        """
+
+        start = 0 if minimum is None else (bisect_left if inclusive[0] else bisect_right)(self, minimum)
+        stop = len(self) if maximum is None else (bisect_right if inclusive[1] else bisect_left)(self, maximum)
+        for idx in range(start, stop):
+            yield self[idx]
+
 
 class ColisionDict(OrderedDict):
+    """Dicionário em que cada chave aponta para a lista de todos os valores inseridos com ela. Os valores são sempre listas: um valor que não é lista, atribuído por '__init__', 'update' ou 'd[chave] = valor', é guardado como lista de um único elemento, de modo que a leitura não precisa verificar o tipo."""
+
+    def __setitem__(self, key, value):
+        if not isinstance(value, list):
+            value = [value]
+        super(ColisionDict, self).__setitem__(key, value)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
     def __add__(self, other):
-        if len(self) > len(other):
-            iterated_dict = other.items()
-            copied_dict = self.copy()
-        else:
-            iterated_dict = self.items()
-            copied_dict = other.copy()
-
-        for item in iterated_dict:
-            if copied_dict.get(item[0]):
-                if type(copied_dict[item[0]]) == list:
-                    copied_dict[item[0]].append(item[1])
-                else:
-                    copied_dict[item[0]] = [copied_dict[item[0]], item[1]]
+        output = self.__class__()
+        output.merge_from(self)
+        output.merge_from(other)
+        return output
+
+    def __iadd__(self, other):
+        return self.merge_from(other)
+
+    def merge_from(self, other):
+        """Incorpora as chaves e valores de 'other' no próprio dicionário, sem copiá-lo; valores de chaves repetidas são acrescentados ao final da lista
+        
+        Arguments:
+            other {ColisionDict} -- dicionário de origem
+        
+        Returns:
+            {ColisionDict} -- o próprio dicionário
+        """
+
+        for key, values in other.items():
+            current = self.get(key)
+            if current is None:
+                self[key] = list(values)
             else:
-                copied_dict[item[0]] = item[1]
-        return copied_dict
-    
+                current.extend(values)
+        return self
+
     def append(self, key, value):
-        if not self.get(key):
+        current = self.get(key)
+        if current is None:
             self[key] = [value]
         else:
-            self[key].append(value)
+            current.append(value)
+
+
+
+class ChainedColisionDict(Mapping):
+    """Visão somente leitura de vários 'ColisionDict' como um único dicionário, sem copiá-los: a lista de uma chave é a concatenação das listas de cada dicionário, na ordem em que foram passados.
+
+    Arguments:
+        dicts {ColisionDict} -- dicionários que compõem a visão
+
+    Methods:
+        iter_values -- percorre os valores de uma chave sem montar a lista
+        to_colision_dict -- materializa a visão em um novo ColisionDict
+    """
+
+    def __init__(self, *dicts):
+        self.maps = list(dicts)
+
+    def __getitem__(self, key):
+        output = list(self.iter_values(key))
+        if not output and key not in self:
+            raise KeyError(key)
+        return output
+
+    def __contains__(self, key):
+        return any(key in colision_dict for colision_dict in self.maps)
+
+    def __iter__(self):
+        seen = set()
+        for colision_dict in self.maps:
+            for key in colision_dict:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+
+    def __len__(self):
+        return len(set().union(*self.maps))
+
+    def __repr__(self):
+        return "ChainedColisionDict({} dicionários)".format(len(self.maps))
+
+    def iter_values(self, key):
+        for colision_dict in self.maps:
+            yield from colision_dict.get(key, ())
+
+    def to_colision_dict(self):
+        output = ColisionDict()
+        for colision_dict in self.maps:
+            output.merge_from(colision_dict)
+        return output
 
 
 
 
 class Stack():
-	def __init__(self, list_of_elements):
-		assert isinstance(list_of_elements, list)
-		self.stack = []
-		self._stack_size = self.size() - 1
-		self._index = 0
+	"""Pilha LIFO. Com 'typecode' os elementos são guardados em um 'array.array' (números em formato binário compacto).
 
-	def __iter__(self):
-		for element in self.stack:
-			yield self.__next__()
+	Arguments:
+		list_of_elements {iterator} -- elementos iniciais, o último é o topo da pilha (default: {()})
+
+	Keyword Arguments:
+		typecode {char} -- código de tipo de 'array.array' ('i', 'q', 'd'...), None para uma lista de objetos (default: {None})
 
-	def __next__(self):
-		if self._stack_size > -1:
-			result = self.stack[self._stack_size]
-			self._stack_size -=1
-			return result
-		self._stack_size = self.size() - 1
+	Methods:
+		push, push_many -- empilham um ou vários elementos
+		pull, pop_many -- desempilham um ou vários elementos
+		peek -- retorna o topo sem retirá-lo
+		size -- quantidade de elementos
+	"""
+
+	__slots__ = ('stack', 'typecode')
+
+	def __init__(self, list_of_elements=(), typecode=None):
+		self.typecode = typecode
+		self.stack = [] if typecode is None else array(typecode)
+		self.stack.extend(list_of_elements)
+
+	def __iter__(self):
+		#Do topo para a base, sem alterar a pilha
+		return reversed(self.stack)
 
 	def __len__(self):
 		return len(self.stack)
 
 	def __repr__(self):
-		self._stack_size = self.size() - 1
-		output = "top »» ["
-		while self._stack_size > -1:
-			if self._stack_size == 0:
-				output += '"' + str(self.stack[self._stack_size]) + '"]'
-			else:
-				output += '"' + str(self.stack[self._stack_size]) + '", '
-			self._stack_size -=1
-		self._stack_size = self.size() - 1
-		return output
+		return "top »» [" + ", ".join('"' + str(element) + '"' for element in self) + "]"
 
 	def push(self, item):
 		self.stack.append(item)
-		self._stack_size = self.size() - 1
+
+	def push_many(self, iterator):
+		self.stack.extend(iterator)
 
 	def pull(self):
-		if self.size() != 0:
+		if self.stack:
 			return self.stack.pop()
 
+	def pop_many(self, num_of_elements):
+		"""Desempilha até 'num_of_elements' elementos
+		
+		Arguments:
+			num_of_elements {int} -- quantidade de elementos a desempilhar
+		
+		Returns:
+			{list} -- os elementos retirados, do topo para a base
+		"""
+
+		if num_of_elements <= 0:
+			return []
+		output = self.stack[-num_of_elements:].tolist() if self.typecode else self.stack[-num_of_elements:]
+		del self.stack[-num_of_elements:]
+		output.reverse()
+		return output
+
 	def peek(self):
-		if self.size() != 0:
+		if self.stack:
 			return self.stack[-1]
 
 	def size(self):
@@ -164,37 +636,46 @@ class Stack():
 
 
 class Queue():
-	def __init__(self, list_of_elements):
-		assert isinstance(list_of_elements, list)
-		self.queue = list_of_elements
-		self._queue_size = self.size() - 1
-		self._index = 0
+	"""Fila FIFO sobre 'collections.deque': inserção e remoção em O(1)
 
-	def __iter__(self):
-		for element in self.queue:
-			yield self.__next__()
+	Arguments:
+		list_of_elements {iterator} -- elementos iniciais, o primeiro é o início da fila (default: {()})
 
-	def __next__(self):
-		if self._index < self._queue_size:
-			result = self.queue[self._index]
-			self._index += 1
-			return result
-		self._index = 0
+	Keyword Arguments:
+		maxsize {int} -- capacidade máxima, 0 para fila sem limite (default: {0})
+
+	Methods:
+		enqueue -- insere no final da fila, levanta 'queue.Full' se a fila estiver cheia
+		dequeue -- retira e retorna o início da fila, ou None se ela estiver vazia
+		peek -- retorna o início da fila sem retirá-lo
+		size -- quantidade de elementos
+	"""
+
+	def __init__(self, list_of_elements=(), maxsize=0):
+		assert isinstance(maxsize, int) and maxsize >= 0, "O argumento 'maxsize' deve ser um inteiro não negativo"
+		self.queue = deque(list_of_elements)
+		self.maxsize = maxsize
+		if maxsize and len(self.queue) > maxsize:
+			raise Full("A fila tem mais elementos que 'maxsize'")
+
+	def __iter__(self):
+		return iter(list(self.queue))
 
 	def __len__(self):
 		return len(self.queue)
 
-
 	def __repr__(self):
-		output = str(self.queue).replace('[', 'init «« ').replace(']', ' «« end')
+		output = str(list(self.queue)).replace('[', 'init «« ').replace(']', ' «« end')
 		return output
 
 	def enqueue(self, item):
+		if self.full():
+			raise Full("A fila atingiu a capacidade máxima de {} elementos".format(self.maxsize))
 		self.queue.append(item)
 
 	def dequeue(self):
 		if self.size() != 0:
-			return self.queue.pop(0)
+			return self.queue.popleft()
 
 	def peek(self):
 		if self.size() != 0:		
@@ -203,186 +684,814 @@ class Queue():
 	def size(self):
 		return len(self.queue)
 
+	def empty(self):
+		return not self.queue
 
-class Heap():
-	def __init__(self, list_of_elements):
-		assert isinstance(list_of_elements, list)
-		self.heap = []
-		for element in list_of_elements:
-			self.push(element)
+	def full(self):
+		return 0 < self.maxsize <= len(self.queue)
 
-	def push(self, element):
-		return heapq.heappush(self.heap, element)
 
-	def pull(self):
-		if self.size() != 0:
-			return heapq.heappop(self.heap)
 
-	def peek(self):
-		if self.size() != 0:		
-			return self.heap[0]
+class BlockingQueue(Queue):
+	"""Fila segura para uso entre threads. 'put' aguarda espaço livre e 'get' aguarda um elemento, com tempo máximo opcional; 'enqueue' e 'dequeue' mantêm o comportamento de 'Queue', sem espera.
 
-	def size(self):
-		return len(self.heap)
-	
+	Methods:
+		put -- insere no final da fila, levanta 'queue.Full' se o tempo de espera se esgotar
+		get -- retira o início da fila, levanta 'queue.Empty' se o tempo de espera se esgotar
+	"""
+
+	def __init__(self, list_of_elements=(), maxsize=0):
+		super(BlockingQueue, self).__init__(list_of_elements, maxsize=maxsize)
+		self.mutex = threading.Lock()
+		self.not_empty = threading.Condition(self.mutex)
+		self.not_full = threading.Condition(self.mutex)
+
+	def put(self, item, block=True, timeout=None):
+		with self.not_full:
+			if not block or not self.maxsize:
+				super(BlockingQueue, self).enqueue(item)
+			elif not self.not_full.wait_for(lambda: not self.full(), timeout):
+				raise Full("Tempo esgotado aguardando espaço na fila")
+			else:
+				self.queue.append(item)
+			self.not_empty.notify()
 
+	def get(self, block=True, timeout=None):
+		with self.not_empty:
+			if not self.queue and (not block or not self.not_empty.wait_for(lambda: self.queue, timeout)):
+				raise Empty("A fila está vazia")
+			item = self.queue.popleft()
+			self.not_full.notify()
+			return item
 
-def branco(string):
-	return "{}{}{}".format(attr(0), string, attr(0))
+	def enqueue(self, item):
+		self.put(item, block=False)
 
+	def dequeue(self):
+		try: return self.get(block=False)
+		except Empty: return None
 
+	def peek(self):
+		with self.mutex:
+			return super(BlockingQueue, self).peek()
 
-def vermelho(string):
-	return "{}{}{}".format(fg(1), string, attr(0))
 
 
+class AsyncQueue(Queue):
+	"""Fila para corrotinas 'asyncio'. 'put' e 'get' aguardam sem bloquear o laço de eventos; 'enqueue' e 'dequeue' mantêm o comportamento de 'Queue', sem espera, e acordam as corrotinas que aguardam.
 
-def azul_claro(string):
-	return "{}{}{}".format(fg(12), string, attr(0))
+	Methods:
+		put -- corrotina, insere no final da fila, levanta 'queue.Full' se o tempo de espera se esgotar
+		get -- corrotina, retira o início da fila, levanta 'queue.Empty' se o tempo de espera se esgotar
+	"""
 
+	def __init__(self, list_of_elements=(), maxsize=0):
+		super(AsyncQueue, self).__init__(list_of_elements, maxsize=maxsize)
+		self.getters = deque()
+		self.putters = deque()
+
+	def wake_up(self, waiters):
+		while waiters:
+			waiter = waiters.popleft()
+			if not waiter.done():
+				waiter.set_result(None)
+				return
+
+	async def wait(self, waiters, is_ready, timeout):
+		loop = asyncio.get_running_loop()
+		deadline = None if timeout is None else loop.time() + timeout
+		while not is_ready():
+			waiter = loop.create_future()
+			waiters.append(waiter)
+			try:
+				await asyncio.wait_for(waiter, None if deadline is None else max(deadline - loop.time(), 0))
+			except asyncio.TimeoutError:
+				return False
+			except BaseException:
+				#Um aviso recebido por uma corrotina cancelada é repassado à próxima da fila de espera
+				if waiter.done() and not waiter.cancelled():
+					self.wake_up(waiters)
+				raise
+		return True
 
+	async def put(self, item, timeout=None):
+		if not await self.wait(self.putters, lambda: not self.full(), timeout):
+			raise Full("Tempo esgotado aguardando espaço na fila")
+		self.enqueue(item)
 
-def verde(string):
-	return "{}{}{}".format(fg(2), string, attr(0))
+	async def get(self, timeout=None):
+		if not await self.wait(self.getters, lambda: self.queue, timeout):
+			raise Empty("A fila está vazia")
+		return self.dequeue()
 
+	def enqueue(self, item):
+		super(AsyncQueue, self).enqueue(item)
+		self.wake_up(self.getters)
 
+	def dequeue(self):
+		item = super(AsyncQueue, self).dequeue()
+		self.wake_up(self.putters)
+		return item
 
-def verde_limao(string):
-	return "{}{}{}".format(fg(41), string, attr(0))
 
 
+heap_handles = itertools.count()
 
-def verde_florescente(string):
-	return "{}{}{}".format(fg(10), string, attr(0))
+class Heap():
+	"""Fila de prioridade (heap mínimo) indexada. Cada elemento recebe um identificador ('handle') que permite alterar sua prioridade ou removê-lo.
 
+	Arguments:
+		list_of_elements {iterator} -- elementos iniciais, que são também as suas prioridades; a construção usa 'heapq.heapify', em O(n) (default: {()})
 
+	Methods:
+		push -- insere um elemento e retorna o seu identificador
+		pull -- retira e retorna o elemento de menor prioridade
+		peek -- retorna o elemento de menor prioridade sem retirá-lo
+		update -- altera a prioridade de um elemento a partir do identificador
+		remove -- remove um elemento a partir do identificador
+		merge -- incorpora os elementos de outro Heap
+		size -- quantidade de elementos
 
-def verde_mar(string):
-	return "{}{}{}".format(fg(35), string, attr(0))
+	Observations:
+		Alterações e remoções são preguiçosas: a entrada antiga permanece no heap marcada como inválida e é descartada ao chegar ao topo. Quando as entradas inválidas superam as válidas, o heap é reconstruído.
+	"""
 
+	def __init__(self, list_of_elements=()):
+		elements = list(list_of_elements)
+		handles = list(itertools.islice(heap_handles, len(elements)))
+		self.heap = list(zip(elements, handles, elements))
+		self.entries = dict(zip(handles, self.heap))
+		heapq.heapify(self.heap)
 
+	def __len__(self):
+		return len(self.entries)
 
-def verde_agua(string):
-	return "{}{}{}".format(fg(37), string, attr(0))
+	def __repr__(self):
+		return "Heap({})".format([entry[2] for entry in sorted(self.entries.values())])
 
+	def __contains__(self, handle):
+		return handle in self.entries
 
+	def is_valid(self, entry):
+		return self.entries.get(entry[1]) is entry
 
-def amarelo(string):
-	return "{}{}{}".format(fg(11), string, attr(0))
+	def discard_invalid_top(self):
+		while self.heap and not self.is_valid(self.heap[0]):
+			heapq.heappop(self.heap)
+
+	def compact(self):
+		if len(self.heap) > 2 * len(self.entries):
+			self.heap = list(self.entries.values())
+			heapq.heapify(self.heap)
 
+	def push(self, element, priority=None):
+		"""Insere um elemento no heap
+		
+		Arguments:
+			element {any} -- elemento a ser inserido
+		
+		Keyword Arguments:
+			priority {any} -- prioridade do elemento, se None o próprio elemento é a prioridade (default: {None})
+		
+		Returns:
+			{int} -- identificador do elemento, usado em 'update' e 'remove'
+		"""
 
+		entry = (element if priority is None else priority, next(heap_handles), element)
+		self.entries[entry[1]] = entry
+		heapq.heappush(self.heap, entry)
+		return entry[1]
 
-def rosa(string):
-	return "{}{}{}".format(fg(5), string, attr(0))
+	def pull(self):
+		self.discard_invalid_top()
+		if self.heap:
+			priority, handle, element = heapq.heappop(self.heap)
+			del self.entries[handle]
+			return element
 
+	def peek(self):
+		self.discard_invalid_top()
+		if self.heap:
+			return self.heap[0][2]
 
+	def update(self, handle, priority):
+		"""Altera a prioridade do elemento identificado por 'handle' (aumento ou redução da prioridade)"""
 
-def cinza(string):
-	return "{}{}{}".format(fg(8), string, attr(0))
+		element = self.entries[handle][2]
+		entry = (priority, handle, element)
+		self.entries[handle] = entry
+		heapq.heappush(self.heap, entry)
+		self.compact()
 
+	def remove(self, handle):
+		"""Remove e retorna o elemento identificado por 'handle'"""
 
+		element = self.entries.pop(handle)[2]
+		self.compact()
+		return element
 
-def salmao(string):
-	return "{}{}{}".format(fg(9), string, attr(0))
+	def merge(self, other):
+		"""Incorpora os elementos de 'other', que mantêm os seus identificadores; 'other' fica vazio
+		
+		Arguments:
+			other {Heap} -- heap a ser incorporado
+		
+		Returns:
+			{Heap} -- o próprio heap
+		"""
+
+		self.entries.update(other.entries)
+		self.heap = list(self.entries.values())
+		heapq.heapify(self.heap)
+		other.heap = []
+		other.entries = {}
+		return self
+
+	def size(self):
+		return len(self.entries)
 
 
 
-def create_lockfile(filename):
-	"""Cria um arquivo vazio na pasta temporária para servir como trava
+def top_k(iterator, k, key=None, largest=True):
+	"""Retorna os 'k' maiores (ou menores) elementos de um iterador, percorrendo-o uma única vez e mantendo apenas 'k' elementos na memória
 	
 	Arguments:
-		filename {string} -- o nome do arquivo vazio
+		iterator {iterator} -- elementos, por exemplo as linhas de 'load_csv'
+		k {int} -- quantidade de elementos a retornar
+	
+	Keyword Arguments:
+		key {function} -- função que extrai o critério de comparação de cada elemento (default: {None})
+		largest {bool} -- True para os maiores elementos, False para os menores (default: {True})
+	
+	Returns:
+		{list} -- os elementos selecionados, do primeiro ao k-ésimo colocado
 	"""
 
-	f = open(tmp_folder+os.sep+filename,'w')
-	f.close()
+	if largest:
+		return heapq.nlargest(k, iterator, key=key)
+	return heapq.nsmallest(k, iterator, key=key)
 
 
 
-def remove_lockfile(filename):
-	"""Remove o arquivo alvo da pasta temporária
-	
-	Arguments:
-		filename {string} -- the name of the file
+class CSVRow(tuple):
+	"""Linha de tabela com esquema compartilhado. Os valores ficam em uma tupla e os nomes das colunas são atributos da classe, criada uma única vez por arquivo com 'csv_row_type'.
+
+	Permite acesso por posição (row[0]) ou por nome de coluna (row['nome']), como um dicionário somente leitura.
 	"""
+	__slots__ = ()
+	_fields = ()
+	_fields_index = {}
 
-	os.remove(tmp_folder+os.sep+filename)
+	def __getitem__(self, key):
+		if isinstance(key, str):
+			return tuple.__getitem__(self, self._fields_index[key])
+		return tuple.__getitem__(self, key)
 
+	def __repr__(self):
+		return "CSVRow({})".format(", ".join("{}={!r}".format(field, value) for field, value in zip(self._fields, self)))
 
+	def get(self, key, default=None):
+		try: return self[key]
+		except (KeyError, IndexError): return default
 
-def lockfile_name(path_to_file):
-	"""Adciona um prefixo padrão a um arquivo alvo para criar um nome ao arquivo de trava
-	
-	Arguments:
-		path_to_file {string} -- o caminho até o arquivo alvo/fonte
-	
-	Returns:
-		{string} -- retorna o nome para o arquivo de trava
-	"""
+	def keys(self):
+		return list(self._fields)
 
-	lkf_name = path_to_file.split(os.sep)[-1]
-	file_name = '~lock_'+str(lkf_name)
-	return file_name
+	def values(self):
+		return list(self)
+
+	def items(self):
+		return list(zip(self._fields, self))
+
+	def as_dict(self):
+		return OrderedDict(zip(self._fields, self))
 
 
-def list_folder(folder):
-	"""Lista o conteúdo da pasta alvo
+
+def csv_row_type(fields):
+	"""Cria uma subclasse de 'CSVRow' para o cabeçalho informado
 
 	Arguments:
-		folder {string} -- caminho para a pasta a ser listada
+		fields {list} -- nomes das colunas, na ordem do arquivo
 
 	Returns:
-		{list} -- lista com os nomes dos arquivos presentes na pasta
+		{type} -- classe cujas instâncias são criadas a partir de uma lista de valores
 	"""
-	return os.listdir(os.getcwd()+os.sep+folder)
 
+	fields_index = {}
+	for idx, field in enumerate(fields):
+		fields_index.setdefault(field, idx)
 
+	return type('CSVRow', (CSVRow,), {'__slots__': (), '_fields': tuple(fields), '_fields_index': fields_index})
 
-def list_col_responses(iterator, col_num=0, delimiter='\t'):
-	"""Retorna os valores de uma tabela, linha à linha, para a coluna selecionada
-	
-	Arguments:
-		iterator {table} -- é uma tabela NxN ou uma lista ou tupla com strings e um caractere delimiter
-	
-	Keyword Arguments:
-		col_num {int} -- o numero correspondente à coluna desejada (default: {0})
-		delimiter {str} -- o caractere/substring que demarca a separação das colunas (default: {'\t'})
-	
-	Yields:
-		{string} -- each cell will be returned separatedly
+
+csv_row_formats = ('dict', 'row', 'tuple')
+
+
+
+class DictEncodedColumn():
+	"""Coluna codificada por dicionário: cada valor distinto é guardado uma única vez em 'values' e as células guardam apenas o código (4 bytes) em 'codes'
 	"""
+	__slots__ = ('codes', 'values', 'index')
 
-	for item in iterator:
-		yield item.split(delimiter)[col_num]
+	def __init__(self, iterator=()):
+		self.codes = array('I')
+		self.values = []
+		self.index = {}
+		self.extend(iterator)
 
+	def __getstate__(self):
+		return self.codes, self.values
 
-def concat_dict_values(dictionary, key, value):
-	"""Verifica se um dicionário possui uma chave. Se possuir, cria uma lista no lado dos valores para preservar valores antigos
+	def __setstate__(self, state):
+		self.codes, self.values = state
+		self.index = {value: code for code, value in enumerate(self.values)}
+
+	def __len__(self):
+		return len(self.codes)
+
+	def __iter__(self):
+		return map(self.values.__getitem__, self.codes)
+
+	def __getitem__(self, idx):
+		if isinstance(idx, slice):
+			return self.take(range(len(self.codes))[idx])
+		return self.values[self.codes[idx]]
+
+	def __repr__(self):
+		return "DictEncodedColumn({})".format(list(self))
+
+	def append(self, value):
+		code = self.index.get(value)
+		if code is None:
+			code = len(self.values)
+			self.index[value] = code
+			self.values.append(value)
+		self.codes.append(code)
+
+	def extend(self, iterator):
+		for value in iterator:
+			self.append(value)
+
+	def take(self, positions):
+		"""Retorna uma nova coluna com as células das posições indicadas, compartilhando o dicionário de valores"""
+
+		output = DictEncodedColumn()
+		output.values = self.values
+		output.index = self.index
+		output.codes = array('I', map(self.codes.__getitem__, positions))
+		return output
+
+
+
+def append_to_column(column, value):
+	"""Adiciona um valor a uma coluna de 'ColumnarTable', promovendo o tipo de armazenamento quando necessário: array('q') » array('d') » DictEncodedColumn
 	
 	Arguments:
-		dictionary {dict} -- dicionário onde o par key-value deverá ser inserido
-		key {any} -- qualquer chave de dicionário válida
-		value {any} -- qualquer valor de dicionário válido
+		column {array|DictEncodedColumn|NoneType} -- coluna atual, None para uma coluna ainda vazia
+		value {int|float|string} -- valor a ser adicionado
 	
 	Returns:
-		{dict} -- retorna o dicionário modificado
+		{array|DictEncodedColumn} -- a coluna que passou a conter o valor (pode ser um novo objeto)
 	"""
 
-	nested_list = False
-	if dictionary.get(key):
-		if isinstance(dictionary[key], list):
-			if isinstance(dictionary[key][0], list):
-				nested_list = True
+	value_type = type(value)
 
-		old_value = dictionary[key]
-		dictionary[key] = [value]
+	if column is None:
+		if value_type is int: column = array('q')
+		elif value_type is float: column = array('d')
+		else: column = DictEncodedColumn()
 
-		if nested_list:
-			old_value.reverse()
-			for sub_list in old_value:
-				dictionary[key].insert(0, sub_list)
-		else:
-			dictionary[key].insert(0, old_value)
+	if isinstance(column, DictEncodedColumn):
+		column.append(value)
+		return column
+
+	if value_type is int or value_type is float:
+		if column.typecode == 'q' and value_type is float:
+			column = array('d', column)
+		try:
+			column.append(value)
+			return column
+		except OverflowError:
+			pass
+
+	column = DictEncodedColumn(column)
+	column.append(value)
+	return column
+
+
+
+class ColumnarTable():
+	"""Tabela em memória organizada por colunas. Colunas numéricas usam 'array.array' (8 bytes por célula) e as demais 'DictEncodedColumn'.
+
+	Atributos:
+		fields {list} -- nomes das colunas, nomes repetidos são mantidos
+		columns {list} -- colunas na mesma ordem de 'fields'
+		fields_index {dict} -- posição de cada nome em 'columns'; com nomes repetidos, o acesso pelo nome retorna a primeira coluna
+
+	Methods:
+		from_rows -- cria a tabela a partir de linhas (listas/tuplas)
+		sort_by -- ordena a tabela a partir de uma coluna
+		iter_rows -- percorre as linhas em um dos formatos de 'csv_row_formats'
+		to_list -- converte a tabela em uma lista de listas
+	"""
+
+	def __init__(self, fields, columns):
+		self.fields = list(fields)
+		self.columns = list(columns)
+		assert len(self.fields) == len(self.columns), "A quantidade de colunas difere da quantidade de nomes em 'fields'"
+		self.fields_index = {}
+		for idx, field in enumerate(self.fields):
+			self.fields_index.setdefault(field, idx)
+
+	@classmethod
+	def from_rows(cls, fields, rows, implict_convert=True):
+		columns = [None] * len(fields)
+		col_idx_list = range(len(fields))
+		if implict_convert:
+			rows = convert_rows(rows)
+		for row in rows:
+			for col_idx in col_idx_list:
+				columns[col_idx] = append_to_column(columns[col_idx], row[col_idx])
+		columns = [DictEncodedColumn() if column is None else column for column in columns]
+		return cls(fields, columns)
+
+	def __len__(self):
+		if not self.columns:
+			return 0
+		return len(self.columns[0])
+
+	def __iter__(self):
+		for row in zip(*self.columns):
+			yield list(row)
+
+	def __getitem__(self, key):
+		if isinstance(key, str):
+			return self.column(key)
+		elif isinstance(key, (list, tuple)):
+			return ColumnarTable(key, [self.column(col) for col in key])
+		elif isinstance(key, slice):
+			return ColumnarTable(self.fields, [column[key] for column in self.columns])
+		return [column[key] for column in self.columns]
+
+	def __repr__(self):
+		return "ColumnarTable(fields={}, rows={})".format(self.fields, len(self))
+
+	def column(self, name):
+		return self.columns[self.fields_index[name]]
+
+	def sort_by(self, col, reverse=False):
+		"""Ordena as linhas da tabela conforme os valores da coluna 'col'
+		
+		Arguments:
+			col {string} -- nome da coluna de referência
+		
+		Keyword Arguments:
+			reverse {bool} -- se True, a ordem será invertida (default: {False})
+		
+		Returns:
+			{ColumnarTable} -- a própria tabela, ordenada
+		"""
+
+		reference = self.column(col)
+		#'reverse=True' mantém a ordem original entre valores iguais, como 'list.sort'
+		positions = sorted(range(len(reference)), key=reference.__getitem__, reverse=reverse)
+		
+		for idx, column in enumerate(self.columns):
+			if isinstance(column, DictEncodedColumn):
+				self.columns[idx] = column.take(positions)
+			else:
+				self.columns[idx] = array(column.typecode, map(column.__getitem__, positions))
+		return self
+
+	def iter_rows(self, row_format='tuple'):
+		"""Percorre as linhas da tabela no formato solicitado, sem a validação de tamanho feita por 'format_csv_rows'
+		
+		Keyword Arguments:
+			row_format {string} -- formato das linhas: 'dict'|'row'|'tuple' (default: {'tuple'})
+		
+		Returns:
+			{iterator} -- linhas como OrderedDict, CSVRow ou tuple
+		"""
+
+		assert row_format in csv_row_formats, "Os únicos valores válidos para 'row_format' são: {}".format(", ".join(csv_row_formats))
+
+		rows = zip(*self.columns)
+		if row_format == 'dict':
+			fields = self.fields
+			return (OrderedDict(zip(fields, row)) for row in rows)
+		elif row_format == 'row':
+			return map(csv_row_type(self.fields), rows)
+		return rows
+
+	def to_list(self):
+		return list(self)
+
+
+def branco(string):
+	return "{}{}{}".format(attr(0), string, attr(0))
+
+
+
+def vermelho(string):
+	return "{}{}{}".format(fg(1), string, attr(0))
+
+
+
+def azul_claro(string):
+	return "{}{}{}".format(fg(12), string, attr(0))
+
+
+
+def verde(string):
+	return "{}{}{}".format(fg(2), string, attr(0))
+
+
+
+def verde_limao(string):
+	return "{}{}{}".format(fg(41), string, attr(0))
+
+
+
+def verde_florescente(string):
+	return "{}{}{}".format(fg(10), string, attr(0))
+
+
+
+def verde_mar(string):
+	return "{}{}{}".format(fg(35), string, attr(0))
+
+
+
+def verde_agua(string):
+	return "{}{}{}".format(fg(37), string, attr(0))
+
+
+
+def amarelo(string):
+	return "{}{}{}".format(fg(11), string, attr(0))
+
+
+
+def rosa(string):
+	return "{}{}{}".format(fg(5), string, attr(0))
+
+
+
+def cinza(string):
+	return "{}{}{}".format(fg(8), string, attr(0))
+
+
+
+def salmao(string):
+	return "{}{}{}".format(fg(9), string, attr(0))
+
+
+
+class FileLock():
+	"""Trava consultiva entre processos sobre um arquivo da pasta temporária, com 'fcntl.flock'. A trava é liberada pelo sistema operacional se o processo terminar.
+
+	Arguments:
+		filename {string} -- nome do arquivo de trava, ver 'lockfile_name'
+
+	Keyword Arguments:
+		shared {bool} -- trava compartilhada (leitores) ou exclusiva (escritores) (default: {False})
+		timeout {int|float} -- tempo máximo de espera em segundos, None espera indefinidamente (default: {None})
+		lock_folder {string} -- pasta onde o arquivo de trava é criado (default: {tmp_folder})
+		reentrant {bool} -- se a thread atual já detém uma trava sobre o mesmo arquivo, 'acquire' não aguarda e a trava externa continua valendo (default: {False})
+
+	Methods:
+		acquire -- obtém a trava, levanta TimeoutError se 'timeout' for excedido
+		release -- libera a trava e remove o arquivo se nenhum outro processo o estiver usando
+
+	Observations:
+		Sem o módulo 'fcntl' (Windows) a trava é feita pela criação exclusiva do arquivo (os.O_EXCL) e toda trava é tratada como exclusiva.
+		Sem 'reentrant' a thread que já detém a trava exclusiva aguarda a si mesma; uma trava compartilhada não pode ser promovida a exclusiva nem com 'reentrant'.
+	"""
+
+	#Travas obtidas neste processo: (arquivo de trava, thread) » lista com 'shared' de cada trava
+	held = {}
+
+	def __init__(self, filename, shared=False, timeout=None, lock_folder=tmp_folder, reentrant=False):
+		self.path = os.path.join(lock_folder, filename)
+		self.shared = shared if fcntl else False
+		self.timeout = timeout
+		self.reentrant = reentrant
+		self.fd = None
+		self.nested = False
+		self.held_key = None
+
+	def __enter__(self):
+		self.acquire()
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.release()
+
+	def __repr__(self):
+		return "FileLock({!r}, shared={}, locked={})".format(self.path, self.shared, self.locked())
+
+	def locked(self):
+		return self.fd is not None or self.nested
+
+	def acquire(self):
+		assert not self.locked(), "A trava '{}' já foi obtida".format(self.path)
+
+		held_key = (self.path, threading.get_ident())
+		if self.reentrant and self.held.get(held_key):
+			assert self.shared or False in self.held[held_key], "A trava compartilhada '{}' não pode ser promovida a exclusiva".format(self.path)
+			self.nested = True
+			return self
+
+		deadline = None if self.timeout is None else time.monotonic() + self.timeout
+		delay = 0.001
+		while True:
+			fd = self.try_acquire(blocking=deadline is None)
+			if fd is not None:
+				self.fd = fd
+				self.held_key = held_key
+				self.held.setdefault(held_key, []).append(self.shared)
+				return self
+			if deadline is not None and time.monotonic() >= deadline:
+				raise TimeoutError("Tempo esgotado aguardando a trava '{}'".format(self.path))
+			time.sleep(delay)
+			delay = min(delay * 2, 0.05)
+
+	def try_acquire(self, blocking=False):
+		"""Tenta obter a trava uma vez, retorna o descritor do arquivo de trava ou None"""
+
+		if fcntl is None:
+			try:
+				return os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o666)
+			except FileExistsError:
+				return None
+
+		fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+		operation = fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX
+		try:
+			fcntl.flock(fd, operation if blocking else operation | fcntl.LOCK_NB)
+		except BlockingIOError:
+			os.close(fd)
+			return None
+
+		#Um escritor pode ter removido o arquivo entre o 'os.open' e o 'flock'; nesse caso a trava obtida não vale mais
+		try:
+			same_file = os.fstat(fd).st_ino == os.stat(self.path).st_ino
+		except FileNotFoundError:
+			same_file = False
+		if not same_file:
+			os.close(fd)
+			return self.try_acquire(blocking=blocking)
+		return fd
+
+	def release(self):
+		if self.nested:
+			self.nested = False
+			return
+		if self.fd is None:
+			return
+
+		held = self.held[self.held_key]
+		held.remove(self.shared)
+		if not held:
+			del self.held[self.held_key]
+		self.held_key = None
+
+		#Só quem detém a trava exclusiva remove o arquivo; um leitor tenta promovê-la para saber se é o último
+		exclusive = not self.shared
+		if self.shared:
+			try:
+				fcntl.flock(self.fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+				exclusive = True
+			except BlockingIOError:
+				pass
+		if exclusive:
+			try: os.remove(self.path)
+			except FileNotFoundError: pass
+
+		if fcntl is not None:
+			fcntl.flock(self.fd, fcntl.LOCK_UN)
+		os.close(self.fd)
+		self.fd = None
+
+
+
+held_lockfiles = {}
+
+def create_lockfile(filename, shared=False, timeout=None):
+	"""Obtém uma trava 'FileLock' na pasta temporária, aguardando caso outro processo a detenha
+	
+	Arguments:
+		filename {string} -- o nome do arquivo de trava
+	
+	Keyword Arguments:
+		shared {bool} -- trava compartilhada (leitores) ou exclusiva (escritores) (default: {False})
+		timeout {int|float} -- tempo máximo de espera em segundos, None espera indefinidamente (default: {None})
+	
+	Returns:
+		{FileLock} -- a trava obtida, liberada por 'remove_lockfile'
+	"""
+
+	lock = FileLock(filename, shared=shared, timeout=timeout).acquire()
+	held_lockfiles[filename] = lock
+	return lock
+
+
+
+def remove_lockfile(filename):
+	"""Libera a trava obtida por 'create_lockfile' e remove o arquivo alvo da pasta temporária
+	
+	Arguments:
+		filename {string} -- the name of the file
+	"""
+
+	lock = held_lockfiles.pop(filename, None)
+	if lock is not None:
+		lock.release()
+	else:
+		os.remove(tmp_folder+os.sep+filename)
+
+
+
+def lockfile_name(path_to_file, file_folder=None):
+	"""Adciona um prefixo padrão a um arquivo alvo para criar um nome ao arquivo de trava
+	
+	Arguments:
+		path_to_file {string} -- o caminho até o arquivo alvo/fonte
+	
+	Keyword Arguments:
+		file_folder {string} -- pasta do arquivo alvo; se informada, o nome inclui um hash do caminho absoluto, de modo que arquivos com o mesmo nome em pastas diferentes não compartilham a trava (default: {None})
+	
+	Returns:
+		{string} -- retorna o nome para o arquivo de trava
+	"""
+
+	lkf_name = path_to_file.split(os.sep)[-1]
+	file_name = '~lock_'+str(lkf_name)
+	if file_folder is not None:
+		path_hash = hashlib.sha1(os.path.abspath(os.path.join(file_folder, path_to_file)).encode('utf8')).hexdigest()
+		file_name += '_' + path_hash[:16]
+	return file_name
+
+
+def list_folder(folder):
+	"""Lista o conteúdo da pasta alvo
+
+	Arguments:
+		folder {string} -- caminho para a pasta a ser listada
+
+	Returns:
+		{list} -- lista com os nomes dos arquivos presentes na pasta
+	"""
+	return os.listdir(os.getcwd()+os.sep+folder)
+
+
+
+def list_col_responses(iterator, col_num=0, delimiter='\t'):
+	"""Retorna os valores de uma tabela, linha à linha, para a coluna selecionada
+	
+	Arguments:
+		iterator {table} -- é uma tabela NxN ou uma lista ou tupla com strings e um caractere delimiter
+	
+	Keyword Arguments:
+		col_num {int} -- o numero correspondente à coluna desejada (default: {0})
+		delimiter {str} -- o caractere/substring que demarca a separação das colunas (default: {'\t'})
+	
+	Yields:
+		{string} -- each cell will be returned separatedly
+	"""
+
+	for item in iterator:
+		yield item.split(delimiter)[col_num]
+
+
+def concat_dict_values(dictionary, key, value):
+	"""Verifica se um dicionário possui uma chave. Se possuir, cria uma lista no lado dos valores para preservar valores antigos
+	
+	Arguments:
+		dictionary {dict} -- dicionário onde o par key-value deverá ser inserido
+		key {any} -- qualquer chave de dicionário válida
+		value {any} -- qualquer valor de dicionário válido
+	
+	Returns:
+		{dict} -- retorna o dicionário modificado
+	"""
+
+	nested_list = False
+	if dictionary.get(key):
+		if isinstance(dictionary[key], list):
+			if isinstance(dictionary[key][0], list):
+				nested_list = True
+
+		old_value = dictionary[key]
+		dictionary[key] = [value]
+
+		if nested_list:
+			old_value.reverse()
+			for sub_list in old_value:
+				dictionary[key].insert(0, sub_list)
+		else:
+			dictionary[key].insert(0, old_value)
 	return dictionary
 
 
@@ -894,7 +2003,7 @@ def print_text_table_file(text_table_filename, count_lines=True, delimiter='\t',
 
 
 
-def append_to_text_table_file(new_line, filename, file_folder=os.curdir, delimiter='\t', constrain_cols=True):
+def append_to_text_table_file(new_line, filename, file_folder=os.curdir, delimiter='\t', constrain_cols=True, tmp_folder=tmp_folder):
 	"""Adiciona linha no final de uma tabela em texto
 	
 	Arguments:
@@ -904,6 +2013,7 @@ def append_to_text_table_file(new_line, filename, file_folder=os.curdir, delimit
 	Keyword Arguments:
 		delimiter {str} -- caractere ou substring que delimita os campos (default: {'\t'})
 		constrain_cols {bool} -- ativa/desativa validação de colunas e posição (default: {True})
+		tmp_folder {string} -- pasta do arquivo de trava, a mesma de 'save_csv' (default: {tmp_folder})
 	"""
 
 	assert isinstance(filename, str)
@@ -912,7 +2022,7 @@ def append_to_text_table_file(new_line, filename, file_folder=os.curdir, delimit
 
 	if constrain_cols:
 		assert isinstance(new_line, dict), "Para verificação das colunas é necessário passar os valores em um 'dict'"
-		with open(filename) as f:
+		with open(file_folder+os.sep+filename) as f:
 			fields = split_and_strip(next(f), delimiter=delimiter)
 		assert len(fields) == len(new_line), "A quantidade de colunas no dicionário não corresponde à do arquivo"
 		for key in new_line:
@@ -920,17 +2030,27 @@ def append_to_text_table_file(new_line, filename, file_folder=os.curdir, delimit
 
 	else:
 		assert isinstance(new_line, (tuple, list)), "O argumento 'new_line' deve ser uma 'list' ou 'tuple'"
-		new_line = delimiter.join(new_line) + os.linesep
-	
-	with open(file_folder+os.sep+filename, 'a') as f:
-		if constrain_cols:
-			new_line_ordered_info = []
-			for field in fields:
-				new_line_ordered_info.append(new_line[field])
-			new_line = delimiter.join(new_line_ordered_info) + os.linesep
-			f.write(new_line)
-		else:
-			f.write(new_line)
+
+	with FileLock(lockfile_name(filename, file_folder=file_folder), lock_folder=tmp_folder):
+		#Contagens de frequência mantidas em arquivo auxiliar são atualizadas com a nova linha
+		sidecar = open_frequency_sidecar(filename, file_folder=file_folder)
+		if sidecar is not None:
+			list(count_appended_rows(sidecar, [new_line], fields=fields if constrain_cols else None))
+
+		with open(file_folder+os.sep+filename, 'a') as f:
+			start = f.tell()
+			if constrain_cols:
+				new_line_ordered_info = []
+				for field in fields:
+					new_line_ordered_info.append(new_line[field])
+				new_line = delimiter.join(new_line_ordered_info) + os.linesep
+				f.write(new_line)
+			else:
+				f.write(delimiter.join(new_line) + os.linesep)
+			end = f.tell()
+
+		if sidecar is not None:
+			append_frequency_sidecar(sidecar, (start, end), filename, file_folder=file_folder)
 	
 
 def return_bisect_lists(input_list):
@@ -974,22 +2094,11 @@ def bisect_search(search_value, input_list):
 	assert isinstance(search_value, (str, int, float))
 	assert isinstance(input_list, list)
 
-	input_size = len(input_list) 
-
-	if input_list == []:
+	try:
+		idx = bisect_left(input_list, search_value)
+		return idx < len(input_list) and input_list[idx] == search_value
+	except TypeError:
 		return False
-	elif input_size == 1:
-		middle_element = return_bisect_lists(input_list)
-		if search_value == middle_element: return True
-		else:return False
-	else:
-		left_side, middle_element, right_side = return_bisect_lists(input_list)
-		try:
-			if search_value == middle_element: return True
-			elif search_value < middle_element: return bisect_search(search_value, left_side)
-			else: return bisect_search(search_value, right_side)	
-		except TypeError:
-			return False
 
 
 def return_bisect_lists_idx(input_list, slice_ref, current_mid_idx=0):
@@ -1013,10 +2122,10 @@ def return_bisect_lists_idx(input_list, slice_ref, current_mid_idx=0):
 	assert isinstance(current_mid_idx, int)
 	
 	init_idx, end_idx = slice_ref
-	sliced_list = input_list[init_idx:end_idx]
 	new_mid_idx = (init_idx + end_idx)//2 
 
-	input_size = len(sliced_list) 
+	#Tamanho da fatia sem copiá-la
+	input_size = len(range(len(input_list))[init_idx:end_idx])
 	
 	if input_size == 1:	return new_mid_idx 
 	elif input_size == 0: return None
@@ -1051,26 +2160,45 @@ def bisect_search_idx(search_value, input_list, slice_ref, current_mid_idx=0):
 	assert isinstance(current_mid_idx, int), "O argumento 'current_mid_idx' deve ser um número inteiro"
 
 	init_idx, end_idx = slice_ref
-	sliced_list = input_list[init_idx:end_idx]
-	sliced_list_size = len(sliced_list)
-
-	if sliced_list == []:
+	init_idx, end_idx, step = slice(init_idx, end_idx).indices(len(input_list))
+	if init_idx >= end_idx:
 		return False
-	elif sliced_list_size == 1:
-		new_mid_idx = return_bisect_lists_idx(input_list, slice_ref=slice_ref, current_mid_idx=current_mid_idx)
-		if search_value == input_list[new_mid_idx]: return new_mid_idx
-		else: return False
-	else:
-		left_side_slice_idx, new_mid_idx, right_side_slice_idx = return_bisect_lists_idx(input_list, slice_ref, current_mid_idx)
-		try:
-			if search_value == input_list[new_mid_idx]: 
-				return new_mid_idx
-			elif search_value < input_list[new_mid_idx]:
-				return bisect_search_idx(search_value, input_list, slice_ref=left_side_slice_idx, current_mid_idx=new_mid_idx)
-			else:
-				return bisect_search_idx(search_value, input_list, slice_ref=right_side_slice_idx, current_mid_idx=new_mid_idx)	
-		except TypeError:
-			return False
+
+	try:
+		idx = bisect_left(input_list, search_value, init_idx, end_idx)
+		if idx < end_idx and input_list[idx] == search_value:
+			return idx
+	except TypeError:
+		pass
+	return False
+
+
+
+def bisect_many(values, sorted_list):
+	"""Pesquisa vários valores em uma lista ordenada em uma única passagem pela lista
+	
+	Arguments:
+		values {iterator} -- valores a serem pesquisados, em qualquer ordem
+		sorted_list {list} -- lista ordenada de elementos de um mesmo tipo
+	
+	Returns:
+		{list} -- para cada valor de 'values', na mesma ordem, a posição do valor em 'sorted_list' ou False se ele não existir
+
+	Observations:
+		Os valores são pesquisados em ordem crescente e cada busca binária parte da posição encontrada pela anterior, de modo que a lista é percorrida da esquerda para a direita uma única vez, como em uma intercalação.
+	"""
+
+	values = list(values)
+	output = [False] * len(values)
+	list_size = len(sorted_list)
+
+	lo = 0
+	for position in sorted(range(len(values)), key=values.__getitem__):
+		value = values[position]
+		lo = bisect_left(sorted_list, value, lo)
+		if lo < list_size and sorted_list[lo] == value:
+			output[position] = lo
+	return output
 
 
 def load_json(filename, file_folder=os.curdir):
@@ -1104,19 +2232,9 @@ def save_json(info, filename, file_folder=os.curdir, tmp_folder=tmp_folder):
 		file_folder {string} -- pasta onde o arquivo está localizado (default: {os.curdir})
 		tmp_folder {string} -- pasta temporária do sistema (default: {tmp_folder})
 	"""
-	lockf = lockfile_name(filename)
-
-	while True:
-		if os.path.isfile(tmp_folder + os.sep + lockf):
-			time.sleep(0.1)
-		else:
-			create_lockfile(lockf)
-			break
-
-	with open(file_folder + os.sep + filename, 'w') as f:
-		f.write(json.dumps(info, ensure_ascii=False, indent=4))
-
-	remove_lockfile(lockf)
+	with FileLock(lockfile_name(filename, file_folder=file_folder), lock_folder=tmp_folder):
+		with open(file_folder + os.sep + filename, 'w') as f:
+			f.write(json.dumps(info, ensure_ascii=False, indent=4))
 
 
 
@@ -1153,7 +2271,7 @@ def save_csv(list_of_dicts, filename, file_folder=os.curdir, header=[], file_met
 	"""Função de criação de arquivos CSV, grava informações de matrizes NxN ou lista de dicionários
 	
 	Arguments:
-		list_of_dicts {tables} -- lista ou tupla contendo dicionários ou outras listas/tuplas
+		list_of_dicts {tables} -- lista, tupla ou iterador contendo dicionários ou outras listas/tuplas
 		filename {string} -- nome do arquivo CSV onde informações serão gravadas
 	
 	Keyword Arguments:
@@ -1167,17 +2285,24 @@ def save_csv(list_of_dicts, filename, file_folder=os.curdir, header=[], file_met
 		TypeError: formatos de dados inadequados implicarão erro
 	"""
 
-	if isinstance(list_of_dicts[0], (dict, OrderedDict)):
-		fields = list_of_dicts[0].keys()
-		write_method='dict'
+	if not isinstance(list_of_dicts, (list, tuple)):
+		#Geradores e outros iteradores: a primeira linha é lida sem ser perdida
+		sample, list_of_dicts = peek_rows(list_of_dicts, 1)
+		first_line = sample[0]
+	else:
+		first_line = list_of_dicts[0]
+
+	if isinstance(first_line, (dict, OrderedDict)):
+		fields = first_line.keys()
+		write_method='dict'
 
-	elif isinstance(list_of_dicts[0], (list, tuple)):
+	elif isinstance(first_line, (list, tuple)):
 		if not header:
-			num_of_cols = len(list_of_dicts[0])
+			num_of_cols = len(first_line)
 			idx = itertools.count()
 			fields = []
 			while num_of_cols:
-				print(list_of_dicts[0][next(idx)])
+				print(first_line[next(idx)])
 				label = read_input(input_label="Qual o rótulo deste campo?")
 				fields.append(label)
 				num_of_cols -= 1
@@ -1191,42 +2316,178 @@ def save_csv(list_of_dicts, filename, file_folder=os.curdir, header=[], file_met
 	else:
 		raise TypeError("O objeto passado não corresponde ao aceito pela função")
 	
-	lockf = lockfile_name(filename)
-
-	while True:
-		if os.path.isfile(tmp_folder + os.sep + lockf):
-			time.sleep(0.1)
+	with FileLock(lockfile_name(filename, file_folder=file_folder), lock_folder=tmp_folder):
+		if file_method:
+			if not os.path.isfile(file_folder + os.sep + filename):
+				file_method_to_use = 'w'
+			else:
+				file_method_to_use = file_method
 		else:
-			create_lockfile(lockf)
-			break
-	
-	if file_method:
-		if not os.path.isfile(file_folder + os.sep + filename):
 			file_method_to_use = 'w'
-		else:
-			file_method_to_use = file_method
-	else:
-		file_method_to_use = 'w'
 
-	with open(file_folder + os.sep + filename, file_method_to_use) as f:
-		if write_method == 'dict':
-			w = csv.DictWriter(f, fields, delimiter=delimiter, lineterminator=lineterminator)
-			if file_method_to_use != 'a':
-				w.writeheader()
-			w.writerows(list_of_dicts)
-		
-		elif write_method == 'list':
-			w = csv.writer(f, delimiter=delimiter, quotechar='"', quoting=csv.QUOTE_MINIMAL)
-			if file_method_to_use != 'a':
-				w.writerow(fields)
-			for line in list_of_dicts:
-				w.writerow(line)
+		#Contagens de frequência mantidas em arquivo auxiliar são atualizadas com as linhas acrescentadas
+		sidecar = open_frequency_sidecar(filename, file_folder=file_folder) if file_method_to_use == 'a' else None
+		if sidecar is not None:
+			list_of_dicts = count_appended_rows(sidecar, list_of_dicts, fields=fields if write_method == 'dict' else None)
+
+		with open(file_folder + os.sep + filename, file_method_to_use) as f:
+			start = f.tell()
+			if write_method == 'dict':
+				w = csv.DictWriter(f, fields, delimiter=delimiter, lineterminator=lineterminator)
+				if file_method_to_use != 'a':
+					w.writeheader()
+				w.writerows(list_of_dicts)
+
+			elif write_method == 'list':
+				w = csv.writer(f, delimiter=delimiter, quotechar='"', quoting=csv.QUOTE_MINIMAL)
+				if file_method_to_use != 'a':
+					w.writerow(fields)
+				for line in list_of_dicts:
+					w.writerow(line)
+			end = f.tell()
+
+		if sidecar is not None:
+			append_frequency_sidecar(sidecar, (start, end), filename, file_folder=file_folder)
+
+
+
+def cp1252_fallback(error):
+	"""Tratador de erros de decodificação: os bytes inválidos são lidos como cp1252 (ou latin-1, para os bytes que o cp1252 não define)
+	
+	Arguments:
+		error {UnicodeDecodeError} -- erro recebido do decodificador
+	
+	Returns:
+		{tuple} -- texto substituto e posição onde a decodificação continua
+	"""
+
+	output = ''
+	for byte in error.object[error.start:error.end]:
+		try: output += bytes((byte,)).decode('cp1252')
+		except UnicodeDecodeError: output += chr(byte)
+	return output, error.end
+
+
+codecs.register_error('cp1252_fallback', cp1252_fallback)
+
+
+
+def detect_file_encoding(filename, file_folder=os.curdir, sample_size=encoding_sample_size):
+	"""Identifica a codificação de um arquivo de texto a partir de uma amostra limitada de bytes do seu início
 	
-	remove_lockfile(lockf)
+	Arguments:
+		filename {string} -- nome do arquivo
+	
+	Keyword Arguments:
+		file_folder {string} -- local onde o arquivo se encontra (default: {os.curdir})
+		sample_size {int} -- quantidade máxima de bytes lidos (default: {encoding_sample_size})
+	
+	Returns:
+		{string} -- 'utf-8-sig', 'utf8' ou 'cp1252'
+	"""
 
+	with open(os.path.join(file_folder, filename), 'rb') as f:
+		sample = f.read(sample_size)
 
+	if sample.startswith(codecs.BOM_UTF8):
+		return 'utf-8-sig'
 
-def load_csv(filename, file_folder=os.curdir, delimiter='\t', lineterminator='\n'):
+	try:
+		#final=False tolera um caractere multibyte cortado no fim da amostra
+		codecs.getincrementaldecoder('utf8')().decode(sample, final=False)
+	except UnicodeDecodeError:
+		return 'cp1252'
+	
+	return 'utf8'
+
+
+
+def open_text_file(filename, file_folder=os.curdir, encoding=None):
+	"""Abre um arquivo de texto para leitura com a codificação detectada em 'detect_file_encoding'
+	
+	Arguments:
+		filename {string} -- nome do arquivo
+	
+	Keyword Arguments:
+		file_folder {string} -- local onde o arquivo se encontra (default: {os.curdir})
+		encoding {string} -- codificação a ser usada, se None será detectada (default: {None})
+	
+	Returns:
+		{file} -- arquivo aberto em modo texto
+
+	Observations:
+		Bytes inválidos encontrados depois da amostra são decodificados por 'cp1252_fallback', assim o arquivo é lido uma única vez e nunca interrompe a leitura com UnicodeDecodeError.
+	"""
+
+	if not encoding:
+		encoding = detect_file_encoding(filename, file_folder=file_folder)
+	return open(os.path.join(file_folder, filename), encoding=encoding, errors='cp1252_fallback')
+
+
+
+def read_csv_rows(f, delimiter='\t', lineterminator='\n', row_format='dict'):
+	"""Lê o cabeçalho e as linhas de um arquivo CSV já aberto em uma única passagem
+	
+	Arguments:
+		f {file} -- objeto de arquivo aberto em modo texto
+	
+	Keyword Arguments:
+		delimiter {char} -- caractere delimitador (default: {'\t'})
+		lineterminator {char} -- caractere de final de linha (default: {'\n'})
+		row_format {string} -- formato das linhas: 'dict'|'row'|'tuple' (default: {'dict'})
+	
+	Yields:
+		{OrderedDict|CSVRow|tuple} -- as linhas no formato solicitado
+
+	Observations:
+		Linhas vazias são ignoradas, linhas incompletas são preenchidas com None e colunas excedentes descartadas, como em 'csv.DictReader'.
+	"""
+
+	rd = csv.reader(f, delimiter=delimiter, lineterminator=lineterminator)
+	fields = next(rd, None)
+	if fields is None:
+		return
+
+	for row in format_csv_rows(fields, rd, row_format=row_format):
+		yield row
+
+
+
+def format_csv_rows(fields, rows, row_format='dict'):
+	"""Converte as linhas lidas por 'csv.reader' no formato de linha solicitado
+	
+	Arguments:
+		fields {list} -- nomes das colunas
+		rows {iterator} -- linhas em formato de lista
+	
+	Keyword Arguments:
+		row_format {string} -- formato das linhas: 'dict'|'row'|'tuple' (default: {'dict'})
+	
+	Yields:
+		{OrderedDict|CSVRow|tuple} -- as linhas no formato solicitado
+	"""
+
+	assert row_format in csv_row_formats, "Os únicos valores válidos para 'row_format' são: {}".format(", ".join(csv_row_formats))
+
+	num_of_fields = len(fields)
+
+	if row_format == 'dict':
+		make_row = lambda row: OrderedDict(zip(fields, row))
+	elif row_format == 'row':
+		make_row = csv_row_type(fields)
+	else:
+		make_row = tuple
+
+	for row in rows:
+		if not row:
+			continue
+		if len(row) != num_of_fields:
+			row = (row + [None] * num_of_fields)[:num_of_fields]
+		yield make_row(row)
+
+
+
+def load_csv(filename, file_folder=os.curdir, delimiter='\t', lineterminator='\n', row_format='dict', encoding=None):
 	"""Função de leitura de arquivos CSV, retorna um gerador que apresenta as informações linha à linha.
 	
 	Arguments:
@@ -1235,71 +2496,570 @@ def load_csv(filename, file_folder=os.curdir, delimiter='\t', lineterminator='\n
 	Keyword Arguments:
 		delimiter {char} -- caractere delimitador (default: {'\t'})
 		lineterminator {char} -- caractere de final de linha (default: {'\n'})
+		row_format {string} -- 'dict' para dicionários ordenados, 'row' para linhas 'CSVRow' com esquema compartilhado ou 'tuple' (default: {'dict'})
+		encoding {string} -- codificação do arquivo, se None será detectada por 'detect_file_encoding' (default: {None})
 	
 	Yields:
 		{OrderedDict} -- as linhas são retornadas como dicionário ordenado
+		{CSVRow|tuple} -- conforme 'row_format', linhas leves que não copiam o cabeçalho
 	"""
 
-	fields = load_csv_head(filename, file_folder=file_folder, delimiter=delimiter, lineterminator=lineterminator)
+	with open_text_file(filename, file_folder=file_folder, encoding=encoding) as f:
+		for row in read_csv_rows(f, delimiter=delimiter, lineterminator=lineterminator, row_format=row_format):
+			yield row
 
-	try:
-		with open(os.path.join(file_folder, filename), encoding="utf8") as f:
-			rd = csv.DictReader(f, delimiter=delimiter, lineterminator=lineterminator)
-			for row in rd:
-				ordered_row = OrderedDict()
-				for col in fields:
-					ordered_row[col] = row[col]
-				yield ordered_row
 
-	except UnicodeDecodeError:
-		with open(os.path.join(file_folder, filename), encoding="cp1252") as f:
-			rd = csv.DictReader(f, delimiter=delimiter, lineterminator=lineterminator)
-			for row in rd:
-				ordered_row = OrderedDict()
-				for col in fields:
-					ordered_row[col] = row[col]
-				yield ordered_row
 
+def load_full_csv(filename, file_folder=os.curdir, delimiter='\t', lineterminator='\n', row_format='dict', encoding=None, workers=1, cache=False, cache_folder=csv_cache_folder):
+	"""Função de leitura de arquivos CSV, retorna todo o conteúdo do arquivo de uma vez.
+	
+	Arguments:
+		filename {string} -- nome do arquivo CSV
+	
+	Keyword Arguments:
+		file_folder {string} -- local onde o arquivo se encontra (default: {os.curdir})
+		delimiter {char} -- caractere delimitador de campo (default: {'\t'})
+		lineterminator {char} -- caractere delimitador de linha (default: {'\n'})
+		row_format {string} -- 'dict' para dicionários ordenados, 'row' para linhas 'CSVRow' com esquema compartilhado ou 'tuple' (default: {'dict'})
+		encoding {string} -- codificação do arquivo, se None será detectada por 'detect_file_encoding' (default: {None})
+		workers {int} -- quantidade de processos para leitura em paralelo, None usa 'os.cpu_count()' (default: {1})
+		cache {bool} -- se True, guarda o conteúdo lido em um arquivo binário em 'cache_folder' e o reutiliza enquanto o arquivo CSV não mudar (default: {False})
+		cache_folder {string} -- pasta dos arquivos de cache (default: {csv_cache_folder})
+	
+	Returns:
+		{list} -- returna uma lista de dicionários ordenados ou de linhas no formato definido em 'row_format'
+
+	Observations:
+		Arquivos menores que 'parallel_min_file_size' são sempre lidos em série, ver 'load_full_csv_parallel'.
+		O cache é identificado pelo caminho do arquivo e pelas opções de leitura e invalidado quando o tamanho ou a data de modificação do arquivo mudam, ver 'read_csv_cache'.
+	"""
 
+	if cache:
+		options = {'delimiter': delimiter, 'lineterminator': lineterminator, 'encoding': encoding}
+		source_stat = os.stat(os.path.join(file_folder, filename))
+		table = read_csv_cache(filename, file_folder=file_folder, cache_folder=cache_folder, **options)
+		if table is None:
+			table = load_csv_table(filename, file_folder=file_folder, delimiter=delimiter, lineterminator=lineterminator, encoding=encoding)
+			write_csv_cache(table, source_stat, filename, file_folder=file_folder, cache_folder=cache_folder, **options)
+		return list(table.iter_rows(row_format))
 
-def load_full_csv(filename, file_folder=os.curdir, delimiter='\t', lineterminator='\n'):
-	"""Função de leitura de arquivos CSV, retorna todo o conteúdo do arquivo de uma vez.
+	if workers != 1 and os.path.getsize(os.path.join(file_folder, filename)) >= parallel_min_file_size:
+		return load_full_csv_parallel(filename, file_folder=file_folder, delimiter=delimiter, lineterminator=lineterminator, row_format=row_format, encoding=encoding, workers=workers)
+
+	#Trava compartilhada: a leitura aguarda escritas em andamento de 'save_csv', que reescreve o arquivo no mesmo lugar; dentro de uma escrita da própria thread (um gerador passado a 'save_csv', por exemplo) a trava dela é reaproveitada
+	with FileLock(lockfile_name(filename, file_folder=file_folder), shared=True, reentrant=True), open_text_file(filename, file_folder=file_folder, encoding=encoding) as f:
+		full_csv_info = list(read_csv_rows(f, delimiter=delimiter, lineterminator=lineterminator, row_format=row_format))
+	
+	return full_csv_info
+
+
+
+
+def find_csv_chunk_boundaries(filename, num_of_chunks, file_folder=os.curdir, delimiter='\t', quotechar='"'):
+	"""Divide um arquivo CSV em faixas de bytes que terminam em quebras de linha fora de campos entre aspas
 	
 	Arguments:
 		filename {string} -- nome do arquivo CSV
+		num_of_chunks {int} -- quantidade desejada de faixas
 	
 	Keyword Arguments:
 		file_folder {string} -- local onde o arquivo se encontra (default: {os.curdir})
 		delimiter {char} -- caractere delimitador de campo (default: {'\t'})
+		quotechar {char} -- caractere de aspas do arquivo (default: {'"'})
+	
+	Returns:
+		{tuple} -- (posição do fim do cabeçalho, lista de tuplas (início, fim) com as faixas das linhas de dados)
+
+	Observations:
+		As aspas são interpretadas como no 'csv.reader': só abrem um campo entre aspas no início do campo (depois do delimitador ou de uma quebra de linha);
+		no meio de um campo (ex.: '12" de altura') são um caractere comum, e dentro de um campo entre aspas '""' é uma aspa escapada.
+		O arquivo é percorrido uma única vez; trechos sem aspas são pulados por expressões regulares, sem laços em Python por linha.
+	"""
+
+	path = os.path.join(file_folder, filename)
+	file_size = os.path.getsize(path)
+	if not file_size:
+		return 0, []
+
+	quote = quotechar.encode('ascii')
+	field_start_bytes = delimiter.encode('ascii') + b'\n\r'
+	quote_pattern = re.compile(re.escape(quote))
+	quote_or_line_end = re.compile(re.escape(quote) + b'|\n')
+	closing_quote = re.compile(re.escape(quote) + re.escape(quote) + b'?')
+
+	with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+
+		def opens_field(position):
+			#Aspas só abrem um campo entre aspas no início do arquivo ou depois do delimitador ou de uma quebra de linha
+			return position == 0 or data[position - 1] in field_start_bytes
+
+		def skip_quoted_field(position):
+			#Retorna a posição seguinte à aspa que fecha o campo, ignorando aspas escapadas ('""')
+			while True:
+				match = closing_quote.search(data, position)
+				if match is None:
+					return file_size
+				position = match.end()
+				if match.end() - match.start() == 1:
+					return position
+
+		def advance(position, target):
+			#Percorre o arquivo até 'target'; se 'target' estiver dentro de um campo entre aspas, retorna a posição seguinte ao fim do campo
+			while True:
+				match = quote_pattern.search(data, position, target)
+				if match is None:
+					return target
+				position = match.end()
+				if opens_field(match.start()):
+					position = skip_quoted_field(position)
+					if position > target:
+						return position
+
+		def next_line_end(position):
+			#Posição seguinte à próxima quebra de linha fora de aspas, a partir de um ponto fora de aspas
+			while True:
+				match = quote_or_line_end.search(data, position)
+				if match is None:
+					return file_size
+				position = match.end()
+				if data[match.start()] != quote[0]:
+					return position
+				if opens_field(match.start()):
+					position = skip_quoted_field(position)
+
+		header_end = next_line_end(0)
+		boundaries = [header_end]
+		data_size = file_size - header_end
+
+		for n in range(1, num_of_chunks):
+			target = header_end + data_size * n // num_of_chunks
+			if target <= boundaries[-1]:
+				continue
+			boundary = next_line_end(advance(boundaries[-1], target))
+			if boundary >= file_size:
+				break
+			boundaries.append(boundary)
+
+	boundaries.append(file_size)
+	chunks = [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+	return header_end, chunks
+
+
+
+def parse_csv_byte_range(path, start, end, encoding='utf8', delimiter='\t', lineterminator='\n'):
+	"""Lê as linhas contidas em uma faixa de bytes de um arquivo CSV. Função executada pelos processos de 'load_full_csv_parallel'
+	
+	Arguments:
+		path {string} -- caminho até o arquivo CSV
+		start {int} -- posição inicial da faixa
+		end {int} -- posição final da faixa
+	
+	Keyword Arguments:
+		encoding {string} -- codificação do arquivo (default: {'utf8'})
+		delimiter {char} -- caractere delimitador de campo (default: {'\t'})
 		lineterminator {char} -- caractere delimitador de linha (default: {'\n'})
 	
 	Returns:
-		{list} -- returna uma lista de dicionários ordenados
+		{list} -- lista com as linhas da faixa, cada linha como lista de strings
 	"""
 
-	full_csv_info = []
+	with open(path, 'rb') as f:
+		f.seek(start)
+		data = f.read(end - start)
+
+	#newline=None reproduz a conversão de quebras de linha feita por 'open' em modo texto
+	text = io.StringIO(data.decode(encoding, errors='cp1252_fallback'), newline=None)
+	return list(csv.reader(text, delimiter=delimiter, lineterminator=lineterminator))
+
+
+
+def load_full_csv_parallel(filename, file_folder=os.curdir, delimiter='\t', lineterminator='\n', row_format='dict', encoding=None, workers=None):
+	"""Lê um arquivo CSV completo dividindo-o em faixas de bytes processadas em paralelo por um 'ProcessPoolExecutor'
 	
-	fields = load_csv_head(filename, file_folder=file_folder, delimiter=delimiter, lineterminator=lineterminator)
+	Arguments:
+		filename {string} -- nome do arquivo CSV
 	
+	Keyword Arguments:
+		file_folder {string} -- local onde o arquivo se encontra (default: {os.curdir})
+		delimiter {char} -- caractere delimitador de campo (default: {'\t'})
+		lineterminator {char} -- caractere delimitador de linha (default: {'\n'})
+		row_format {string} -- 'dict', 'row' ou 'tuple', como em 'load_full_csv' (default: {'dict'})
+		encoding {string} -- codificação do arquivo, se None será detectada por 'detect_file_encoding' (default: {None})
+		workers {int} -- quantidade de processos, se None usa 'os.cpu_count()' (default: {None})
+	
+	Returns:
+		{list} -- as linhas do arquivo, na ordem original
+	"""
+
+	path = os.path.join(file_folder, filename)
+	workers = workers or os.cpu_count() or 1
+
+	if not encoding:
+		encoding = detect_file_encoding(filename, file_folder=file_folder)
+
+	header_end, chunks = find_csv_chunk_boundaries(filename, workers * 4, file_folder=file_folder, delimiter=delimiter)
+
+	with open(path, 'rb') as f:
+		header = f.read(header_end).decode(encoding, errors='cp1252_fallback')
+	fields = next(csv.reader(io.StringIO(header, newline=None), delimiter=delimiter, lineterminator=lineterminator), None)
+	if fields is None:
+		return []
+
+	num_of_chunks = len(chunks)
+	with ProcessPoolExecutor(max_workers=workers) as executor:
+		parsed_chunks = executor.map(parse_csv_byte_range,
+			[path] * num_of_chunks,
+			[chunk[0] for chunk in chunks],
+			[chunk[1] for chunk in chunks],
+			[encoding] * num_of_chunks,
+			[delimiter] * num_of_chunks,
+			[lineterminator] * num_of_chunks)
+		rows = itertools.chain.from_iterable(parsed_chunks)
+		return list(format_csv_rows(fields, rows, row_format=row_format))
+
+
+
+
+def load_csv_table(filename, file_folder=os.curdir, delimiter='\t', lineterminator='\n', encoding=None):
+	"""Lê um arquivo CSV para uma 'ColumnarTable' sem conversão de tipos, forma usada pelo cache de 'load_full_csv'
+	
+	Arguments:
+		filename {string} -- nome do arquivo CSV
+	
+	Keyword Arguments:
+		file_folder {string} -- local onde o arquivo se encontra (default: {os.curdir})
+		delimiter {char} -- caractere delimitador de campo (default: {'\t'})
+		lineterminator {char} -- caractere delimitador de linha (default: {'\n'})
+		encoding {string} -- codificação do arquivo, se None será detectada (default: {None})
+	
+	Returns:
+		{ColumnarTable} -- tabela com todas as colunas codificadas por dicionário
+	"""
+
+	with open_text_file(filename, file_folder=file_folder, encoding=encoding) as f:
+		rd = csv.reader(f, delimiter=delimiter, lineterminator=lineterminator)
+		fields = next(rd, None) or []
+		return ColumnarTable.from_rows(fields, format_csv_rows(fields, rd, row_format='tuple'), implict_convert=False)
+
+
+
+def csv_cache_filename(filename, file_folder=os.curdir, **options):
+	"""Retorna o nome do arquivo de cache correspondente ao arquivo CSV e às opções de leitura"""
+
+	key = repr((os.path.abspath(os.path.join(file_folder, filename)), sorted(options.items())))
+	return hashlib.sha1(key.encode('utf8')).hexdigest() + '.pickle'
+
+
+
+def read_csv_cache(filename, file_folder=os.curdir, cache_folder=csv_cache_folder, **options):
+	"""Carrega a tabela guardada em cache para o arquivo CSV, se o cache ainda corresponder ao arquivo
+	
+	Arguments:
+		filename {string} -- nome do arquivo CSV
+	
+	Keyword Arguments:
+		file_folder {string} -- local onde o arquivo se encontra (default: {os.curdir})
+		cache_folder {string} -- pasta dos arquivos de cache (default: {csv_cache_folder})
+		options {dict} -- opções de leitura que compõem a chave do cache
+	
+	Returns:
+		{ColumnarTable} -- a tabela guardada em cache
+		{NoneType} -- retorna None se não houver cache ou se o arquivo de origem tiver mudado (tamanho ou data de modificação) ou o cache for de uma versão anterior
+	"""
+
+	source_stat = os.stat(os.path.join(file_folder, filename))
+	cache_path = os.path.join(cache_folder, csv_cache_filename(filename, file_folder=file_folder, **options))
+
 	try:
-		with open(os.path.join(file_folder, filename), encoding="utf8") as f:
-			rd = csv.DictReader(f, delimiter=delimiter, lineterminator=lineterminator)
-			for row in rd:
-				ordered_row = OrderedDict()
-				for col in fields:
-					ordered_row[col] = row[col]
-				full_csv_info.append(ordered_row)
+		with open(cache_path, 'rb') as f:
+			entry = pickle.load(f)
+	except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+		return None
+
+	if (entry.get('version'), entry['size'], entry['mtime']) != (csv_cache_version, source_stat.st_size, source_stat.st_mtime_ns):
+		return None
+
+	#Atualiza a data do arquivo de cache, usada como critério de descarte em 'evict_csv_cache'
+	os.utime(cache_path)
+	return entry['table']
+
+
+
+def write_csv_cache(table, source_stat, filename, file_folder=os.curdir, cache_folder=csv_cache_folder, max_size=csv_cache_max_size, **options):
+	"""Grava a tabela de um arquivo CSV na pasta de cache
 	
-	except UnicodeDecodeError:
-		with open(os.path.join(file_folder, filename), encoding="cp1252") as f:
-			rd = csv.DictReader(f, delimiter=delimiter, lineterminator=lineterminator)
-			for row in rd:
-				ordered_row = OrderedDict()
-				for col in fields:
-					ordered_row[col] = row[col]
-				full_csv_info.append(ordered_row)
+	Arguments:
+		table {ColumnarTable} -- tabela lida do arquivo
+		source_stat {os.stat_result} -- 'os.stat' do arquivo CSV obtido antes da leitura
+		filename {string} -- nome do arquivo CSV
 	
-	return full_csv_info
+	Keyword Arguments:
+		file_folder {string} -- local onde o arquivo se encontra (default: {os.curdir})
+		cache_folder {string} -- pasta dos arquivos de cache (default: {csv_cache_folder})
+		max_size {int} -- tamanho máximo da pasta de cache, em bytes (default: {csv_cache_max_size})
+		options {dict} -- opções de leitura que compõem a chave do cache
+	"""
+
+	os.makedirs(cache_folder, exist_ok=True)
+	cache_path = os.path.join(cache_folder, csv_cache_filename(filename, file_folder=file_folder, **options))
+	entry = {'version': csv_cache_version, 'size': source_stat.st_size, 'mtime': source_stat.st_mtime_ns, 'table': table}
+
+	fd, tmp_path = tempfile.mkstemp(dir=cache_folder, suffix='.tmp')
+	try:
+		with os.fdopen(fd, 'wb') as f:
+			pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+		os.replace(tmp_path, cache_path)
+	except BaseException:
+		os.remove(tmp_path)
+		raise
+
+	evict_csv_cache(cache_folder=cache_folder, max_size=max_size)
+
+
+
+def evict_csv_cache(cache_folder=csv_cache_folder, max_size=csv_cache_max_size):
+	"""Remove os arquivos de cache usados há mais tempo até que a pasta de cache não exceda 'max_size' bytes
+	
+	Keyword Arguments:
+		cache_folder {string} -- pasta dos arquivos de cache (default: {csv_cache_folder})
+		max_size {int} -- tamanho máximo da pasta, em bytes (default: {csv_cache_max_size})
+	"""
+
+	entries = []
+	for entry in os.scandir(cache_folder):
+		if entry.name.endswith('.pickle'):
+			entry_stat = entry.stat()
+			entries.append((entry_stat.st_mtime, entry_stat.st_size, entry.path))
+
+	total_size = 0
+	for mtime, size, path in entries:
+		total_size += size
+	
+	entries.sort()
+	for mtime, size, path in entries:
+		if total_size <= max_size:
+			break
+		try: os.remove(path)
+		except FileNotFoundError: pass
+		total_size -= size
+
+
+
+def frequency_sidecar_path(filename, file_folder=os.curdir):
+	"""Retorna o caminho do arquivo auxiliar de contagens ('<arquivo>.freq') de um arquivo CSV, ver 'FrequencyTable' em 'calculation_handler'"""
+
+	return os.path.join(file_folder, filename + frequency_sidecar_suffix)
+
+
+
+def read_frequency_trailer(f):
+	"""Lê o último registro de controle de um arquivo auxiliar aberto em modo binário
+	
+	Arguments:
+		f {file} -- arquivo auxiliar
+	
+	Returns:
+		{tuple} -- (tamanho do CSV, data de modificação do CSV em ns, tamanho da base, identificador da base)
+		{NoneType} -- retorna None se o arquivo for menor que um registro de controle
+	"""
+
+	length = f.seek(0, os.SEEK_END)
+	if length < frequency_sidecar_trailer.size:
+		return None
+	f.seek(length - frequency_sidecar_trailer.size)
+	return frequency_sidecar_trailer.unpack(f.read(frequency_sidecar_trailer.size))
+
+
+
+def read_frequency_sidecar(filename, file_folder=os.curdir, position=None):
+	"""Lê as contagens por coluna guardadas no arquivo auxiliar do arquivo CSV, se ainda corresponderem ao arquivo
+	
+	Arguments:
+		filename {string} -- nome do arquivo CSV
+	
+	Keyword Arguments:
+		file_folder {string} -- local onde o arquivo se encontra (default: {os.curdir})
+		position {tuple} -- 'position' de uma leitura anterior; se a base for a mesma, só os registros seguintes são lidos (default: {None})
+	
+	Returns:
+		{dict} -- {'header': {'options', 'fields', 'cols'} (None se a leitura continuou de 'position'), 'records': [{'rows', 'counts'}], 'position': (identificador da base, posição)}
+		{NoneType} -- retorna None se não houver arquivo auxiliar ou se o arquivo CSV tiver mudado (tamanho ou data de modificação)
+
+	Observations:
+		O arquivo auxiliar é um diário: um cabeçalho, as contagens da base e um registro de contagens para cada gravação acrescentada ao CSV.
+		Cada registro de contagens é seguido de um registro de controle com o 'os.stat' do CSV correspondente, ver 'frequency_sidecar_trailer'.
+	"""
+
+	try:
+		source_stat = os.stat(os.path.join(file_folder, filename))
+		with open(frequency_sidecar_path(filename, file_folder=file_folder), 'rb') as f:
+			trailer = read_frequency_trailer(f)
+			if trailer is None or trailer[:2] != (source_stat.st_size, source_stat.st_mtime_ns):
+				return None
+
+			length = f.tell()
+			if position is not None and position[0] == trailer[3]:
+				header = None
+				f.seek(position[1])
+			else:
+				f.seek(0)
+				header = pickle.load(f)
+
+			records = []
+			while f.tell() < length:
+				records.append(pickle.load(f))
+				f.seek(frequency_sidecar_trailer.size, os.SEEK_CUR)
+
+	except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError, KeyError):
+		return None
+
+	return {'header': header, 'records': records, 'position': (trailer[3], length)}
+
+
+
+def write_frequency_sidecar(header, record, filename, file_folder=os.curdir, source_stat=None):
+	"""Grava um novo arquivo auxiliar de contagens para o arquivo CSV, substituindo o anterior
+	
+	Arguments:
+		header {dict} -- {'options': opções de leitura, 'fields': colunas do arquivo, 'cols': colunas contadas}
+		record {dict} -- {'rows': quantidade de linhas, 'counts': {coluna: Counter de valores brutos}}
+		filename {string} -- nome do arquivo CSV
+	
+	Keyword Arguments:
+		file_folder {string} -- local onde o arquivo se encontra (default: {os.curdir})
+		source_stat {os.stat_result} -- 'os.stat' do arquivo CSV que corresponde às contagens, se None é obtido agora (default: {None})
+	
+	Returns:
+		{tuple} -- 'position' do fim do arquivo auxiliar, ver 'read_frequency_sidecar'
+	"""
+
+	source_stat = source_stat or os.stat(os.path.join(file_folder, filename))
+	sidecar_path = frequency_sidecar_path(filename, file_folder=file_folder)
+	data = pickle.dumps(header, protocol=pickle.HIGHEST_PROTOCOL) + pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+	base_length = len(data) + frequency_sidecar_trailer.size
+	base_id = int.from_bytes(os.urandom(8), 'little')
+
+	fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(sidecar_path) or os.curdir, suffix='.tmp')
+	try:
+		with os.fdopen(fd, 'wb') as f:
+			f.write(data + frequency_sidecar_trailer.pack(source_stat.st_size, source_stat.st_mtime_ns, base_length, base_id))
+		os.replace(tmp_path, sidecar_path)
+	except BaseException:
+		os.remove(tmp_path)
+		raise
+
+	return base_id, base_length
+
+
+
+def open_frequency_sidecar(filename, file_folder=os.curdir):
+	"""Prepara a atualização do arquivo auxiliar de contagens antes de acrescentar linhas ao arquivo CSV, lendo só o cabeçalho e o último registro de controle
+	
+	Arguments:
+		filename {string} -- nome do arquivo CSV
+	
+	Keyword Arguments:
+		file_folder {string} -- local onde o arquivo se encontra (default: {os.curdir})
+	
+	Returns:
+		{dict} -- cabeçalho do arquivo auxiliar com contagens vazias ('rows', 'counts') para as linhas acrescentadas, ver 'count_appended_rows'
+		{NoneType} -- retorna None se não houver arquivo auxiliar ou se ele estiver desatualizado
+	"""
+
+	try:
+		source_stat = os.stat(os.path.join(file_folder, filename))
+		with open(frequency_sidecar_path(filename, file_folder=file_folder), 'rb') as f:
+			trailer = read_frequency_trailer(f)
+			if trailer is None or trailer[:2] != (source_stat.st_size, source_stat.st_mtime_ns):
+				return None
+			length = f.tell()
+			f.seek(0)
+			entry = pickle.load(f)
+	except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+		return None
+
+	entry.update({'rows': 0, 'counts': OrderedDict((col, Counter()) for col in entry['cols']), 'trailer': trailer, 'length': length})
+	return entry
+
+
+
+def append_frequency_sidecar(entry, written, filename, file_folder=os.curdir):
+	"""Acrescenta ao arquivo auxiliar as contagens das linhas gravadas no arquivo CSV, ver 'open_frequency_sidecar'
+	
+	Arguments:
+		entry {dict} -- retorno de 'open_frequency_sidecar', com as contagens feitas por 'count_appended_rows'
+		written {tuple} -- posições (início, fim) em bytes do trecho gravado no arquivo CSV
+		filename {string} -- nome do arquivo CSV
+	
+	Keyword Arguments:
+		file_folder {string} -- local onde o arquivo se encontra (default: {os.curdir})
+
+	Observations:
+		Se o trecho gravado não começar no fim registrado no arquivo auxiliar, ou se o arquivo CSV tiver outro tamanho que o fim do trecho, outras linhas
+		foram gravadas por fora das funções de gravação: o arquivo auxiliar não é atualizado e as contagens são refeitas na próxima consulta.
+		Quando os registros acrescentados passam do tamanho da base (e de 'frequency_sidecar_min_journal' bytes), o arquivo auxiliar é compactado em uma nova base.
+	"""
+
+	source_stat = os.stat(os.path.join(file_folder, filename))
+	size, mtime, base_length, base_id = entry['trailer']
+	if (written[0], written[1]) != (size, source_stat.st_size):
+		return
+	record = {'rows': entry['rows'], 'counts': entry['counts']}
+	data = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+	data += frequency_sidecar_trailer.pack(source_stat.st_size, source_stat.st_mtime_ns, base_length, base_id)
+
+	with open(frequency_sidecar_path(filename, file_folder=file_folder), 'ab') as f:
+		f.write(data)
+
+	if entry['length'] + len(data) - base_length > max(base_length, frequency_sidecar_min_journal):
+		sidecar = read_frequency_sidecar(filename, file_folder=file_folder)
+		if sidecar is not None:
+			merged = {'rows': 0, 'counts': OrderedDict((col, Counter()) for col in sidecar['header']['cols'])}
+			for record in sidecar['records']:
+				merged['rows'] += record['rows']
+				for col, counts in record['counts'].items():
+					merged['counts'][col].update(counts)
+			write_frequency_sidecar(sidecar['header'], merged, filename, file_folder=file_folder, source_stat=source_stat)
+
+
+
+def count_appended_rows(entry, rows, fields=None):
+	"""Gerador que repassa as linhas acrescentadas a um arquivo CSV somando os seus valores às contagens do arquivo auxiliar
+	
+	Arguments:
+		entry {dict} -- retorno de 'open_frequency_sidecar'
+		rows {iterator} -- dicionários ou listas/tuplas na ordem das colunas do arquivo
+	
+	Keyword Arguments:
+		fields {list} -- ordem em que os valores das linhas em dicionário são gravados; se None, a das colunas do arquivo (default: {None})
+	
+	Yields:
+		{dict|list|tuple} -- as mesmas linhas, sem alteração
+
+	Observations:
+		Os valores são contados como serão lidos do arquivo: None como '' e os demais como 'str'. Colunas ausentes contam como vazias e linhas vazias não são contadas.
+		Cada valor é contado na coluna do arquivo em que for gravado, mesmo que 'fields' esteja em outra ordem que o cabeçalho.
+	"""
+
+	counted = [(entry['fields'].index(col), counter) for col, counter in entry['counts'].items()]
+	width = len(entry['fields'])
+	fields = list(fields or entry['fields'])
+
+	for row in rows:
+		if hasattr(row, 'keys'):
+			values = [row.get(field) for field in fields] + [None] * (width - len(fields))
+		elif row:
+			values = list(row) + [None] * (width - len(row))
+		else:
+			#Linhas vazias não são lidas de volta pelo 'csv.reader'
+			yield row
+			continue
+
+		for idx, counter in counted:
+			value = values[idx]
+			counter['' if value is None else str(value)] += 1
+		entry['rows'] += 1
+		yield row
 
 
 
@@ -1319,14 +3079,14 @@ def load_csv_head(filename, file_folder=os.curdir, delimiter='\t', lineterminato
 		{list} -- lista contendo os nomes das colunas
 	"""
 
-	with open(os.path.join(file_folder, filename)) as f:
+	with open_text_file(filename, file_folder=file_folder) as f:
 		f_csv_obj = csv.DictReader(f, delimiter=delimiter, lineterminator=lineterminator)
 		header = f_csv_obj.fieldnames
 	return header
 
 
 
-def load_csv_cols(filename, selected_cols=[], file_folder=os.curdir, delimiter='\t', lineterminator='\n', sort_by=False, reverse_sort=False, implict_convert=True):
+def load_csv_cols(filename, selected_cols=[], file_folder=os.curdir, delimiter='\t', lineterminator='\n', sort_by=False, reverse_sort=False, implict_convert=True, columnar=False):
 	"""Retorna colunas selecionadas de um arquivo CSV
 	
 	Arguments:
@@ -1340,79 +3100,215 @@ def load_csv_cols(filename, selected_cols=[], file_folder=os.curdir, delimiter='
 		sort_by {string} -- colona que servirá de referencia para ordenação (default: {False})
 		reverse_sort {bool} -- se True, a ordem será invertida (default: {False})
 		implict_convert {bool} -- tenta converter informações conforme o tipo (default: {True})
+		columnar {bool} -- se True, retorna uma 'ColumnarTable' em vez de uma lista de listas (default: {False})
 	
 	Returns:
 		{table} -- retorna uma matrix NxN com os valores do arquivo CSV
+		{ColumnarTable} -- se 'columnar' for True, retorna a tabela organizada por colunas
 
 	Observations:
 		Para ordenar a lista a partir de um campo numérico, será necessário manter o argumento 'implict_convert' como True.
 	"""
 
 	fields = load_csv_head(filename, file_folder=file_folder, delimiter=delimiter, lineterminator=lineterminator)
-	lines = load_csv(filename, file_folder=file_folder, delimiter=delimiter, lineterminator=lineterminator)
+	lines = load_csv(filename, file_folder=file_folder, delimiter=delimiter, lineterminator=lineterminator, row_format='row')
 
 	if not selected_cols:
 		selected_cols = pick_options(fields, input_label="Selecione as colunas desejadas", max_selection=len(fields))
 	
+	selected_lines = ([line[col] for col in selected_cols] for line in lines)
 
-	output = []
-	for line in lines:
-		output_line = []
-		for col in selected_cols:
-			if implict_convert: output_line.append(try_implict_convert(line[col]))
-			else: output_line.append(line[col])
-		output.append(output_line)
+	if columnar:
+		output = ColumnarTable.from_rows(selected_cols, selected_lines, implict_convert=implict_convert)
+		if sort_by:
+			output.sort_by(sort_by, reverse=reverse_sort)
+		return output
+
+	if implict_convert:
+		output = list(convert_rows(selected_lines))
+	else:
+		output = list(selected_lines)
 
 	if not sort_by:
 		return output
 
-	else:
-		col_idx = selected_cols.index(sort_by)
-		print(col_idx)
-		sort_by_col = lambda l: l[col_idx]
-		output.sort(key=sort_by_col)
-		if reverse_sort:
-			output.reverse()
-		return output
+	else:
+		col_idx = selected_cols.index(sort_by)
+		print(col_idx)
+		sort_by_col = lambda l: l[col_idx]
+		output.sort(key=sort_by_col, reverse=reverse_sort)
+		return output
+
+
+
+def try_implict_convert(value):
+	"""Tenta converter as informações das colunas de um arquivo CSV conforme a máscara/pattern identificado
+	
+	Arguments:
+		value {string} -- valor em formato string a ser convertido
+	
+	Returns:
+		{int|float|string} -- tenta retornar 'int' ou 'float', se não for possível devolve o valor de entrada.
+	"""
+
+	if (value.find(',') != -1) or (value.find('.') != -1):
+		if re.search(r'\d*,\d*', value):
+			try:
+				value = value.replace(',','.')
+				value = float(value)
+			except: pass
+			return value
+
+		elif re.search(r'\d*.\d*', value):
+			try:
+				value = float(value)
+			except: pass
+			return value
+
+		else:
+			return value
+
+
+	elif re.search(r'\d*', value):
+		try: value = int(value)
+		except: pass
+		return value
+
+	else:
+		return value
+
+
+
+int_cell_pattern = re.compile(r'\s*[-+]?\d+\s*$')
+float_cell_pattern = re.compile(r'\s*[-+]?(\d+\.?\d*|\.\d+)\s*$')
+decimal_comma_cell_pattern = re.compile(r'\s*[-+]?(\d+[,.]?\d*|[,.]\d+)\s*$')
+
+column_inference_sample_size = 100
+
+
+
+def convert_int_cell(value):
+	try: return int(value)
+	except ValueError: return try_implict_convert(value)
+
+
+
+def convert_float_cell(value):
+	#Como em 'try_implict_convert', só valores com ',' ou '.' (ou inteiros) viram 'float': 'inf', 'nan' e '1e5' continuam texto
+	if ',' in value or '.' in value or int_cell_pattern.match(value):
+		try: return float(value)
+		except ValueError: pass
+	return try_implict_convert(value)
+
+
+
+def convert_decimal_comma_cell(value):
+	if ',' in value or '.' in value or int_cell_pattern.match(value):
+		try: return float(value.replace(',', '.'))
+		except ValueError: pass
+	return try_implict_convert(value)
+
+
+
+def convert_string_cell(value):
+	return value
+
+
+
+column_converters = {
+	'int': convert_int_cell,
+	'float': convert_float_cell,
+	'decimal_comma': convert_decimal_comma_cell,
+	'string': convert_string_cell,
+}
+
+
+
+def infer_column_type(values):
+	"""Define, a partir de uma amostra de valores de uma coluna, o tipo a ser usado na conversão de todas as células da coluna
+	
+	Arguments:
+		values {list|tuple} -- amostra de valores (strings) da coluna
+	
+	Returns:
+		{string} -- 'int', 'float', 'decimal_comma' ou 'string', chaves de 'column_converters'
+
+	Observations:
+		Células vazias não são consideradas. Colunas com números decimais separados por vírgula aceitam também o ponto, como 'try_implict_convert'.
+	"""
+
+	kind = None
+	for value in values:
+		if not value:
+			continue
+		if int_cell_pattern.match(value):
+			if kind is None: kind = 'int'
+		elif kind in (None, 'int', 'float') and float_cell_pattern.match(value):
+			kind = 'float'
+		elif decimal_comma_cell_pattern.match(value):
+			kind = 'decimal_comma'
+		else:
+			return 'string'
+	
+	return kind or 'string'
+
+
+
+def infer_column_types(sample_rows):
+	"""Aplica 'infer_column_type' a cada coluna de uma amostra de linhas
+	
+	Arguments:
+		sample_rows {list} -- lista de linhas (listas/tuplas de strings)
+	
+	Returns:
+		{list} -- lista com o tipo de cada coluna
+	"""
 
+	if not sample_rows:
+		return []
+	return [infer_column_type(values) for values in zip(*sample_rows)]
 
 
-def try_implict_convert(value):
-	"""Tenta converter as informações das colunas de um arquivo CSV conforme a máscara/pattern identificado
+
+def peek_rows(iterator, num_of_rows):
+	"""Lê as primeiras linhas de um iterador sem perdê-las
 	
 	Arguments:
-		value {string} -- valor em formato string a ser convertido
+		iterator {iterator} -- iterador de entrada
+		num_of_rows {int} -- quantidade de linhas a serem lidas
 	
 	Returns:
-		{int|float|string} -- tenta retornar 'int' ou 'float', se não for possível devolve o valor de entrada.
+		{tuple} -- (lista com as primeiras linhas, iterador equivalente ao original)
 	"""
 
-	if (value.find(',') != -1) or (value.find('.') != -1):
-		if re.search(r'\d*,\d*', value):
-			try:
-				value = value.replace(',','.')
-				value = float(value)
-			except: pass
-			return value
+	iterator = iter(iterator)
+	sample = list(itertools.islice(iterator, num_of_rows))
+	return sample, itertools.chain(sample, iterator)
 
-		elif re.search(r'\d*.\d*', value):
-			try:
-				value = float(value)
-			except: pass
-			return value
 
-		else:
-			return value
 
+def convert_rows(rows, sample_size=column_inference_sample_size):
+	"""Converte as células de uma tabela com um conversor por coluna, definido a partir das primeiras 'sample_size' linhas
+	
+	Arguments:
+		rows {iterator} -- linhas (listas/tuplas de strings)
+	
+	Keyword Arguments:
+		sample_size {int} -- quantidade de linhas usadas na inferência dos tipos (default: {column_inference_sample_size})
+	
+	Yields:
+		{list} -- linha com os valores convertidos
+
+	Observations:
+		Células que não correspondem ao tipo inferido são convertidas por 'try_implict_convert'.
+	"""
 
-	elif re.search(r'\d*', value):
-		try: value = int(value)
-		except: pass
-		return value
+	sample, rows = peek_rows(rows, sample_size)
+	converters = [column_converters[kind] for kind in infer_column_types(sample)]
+
+	for row in rows:
+		yield [convert(value) for convert, value in zip(converters, row)]
 
-	else:
-		return value
-		
 
 
 def seek_for_csv_gaps(filename, file_folder=os.curdir, reference_cols=[], target_col=[], target_col_ops=[], delimiter='\t', lineterminator='\n', print_reference_cols=True, fill_gaps=False):
@@ -1546,7 +3442,7 @@ def print_list(iterator, key=lambda x: x):
 
 
 
-def load_data_file(filename, file_folder=os.curdir, delimiter='\t', lineterminator='\n', filemimetype='csv'):
+def load_data_file(filename, file_folder=os.curdir, delimiter='\t', lineterminator='\n', filemimetype='csv', cache=False):
 	"""Carrega arquivo de dados conforme o tipo do arquivo
 	
 	Arguments:
@@ -1557,6 +3453,7 @@ def load_data_file(filename, file_folder=os.curdir, delimiter='\t', lineterminat
 		delimiter {char} -- caractere delimitador de campo, para arquivos CSV ou de texto (default: '\t')
 		lineterminator {char} -- caractere delimitador de linha (default: {'\n'})
 		filemimetype {string} -- tipo do arquivo de entrada, pode ser 'csv'|'json'|'txt' (default: {'csv'})
+		cache {bool} -- para arquivos CSV, usa o cache binário de 'load_full_csv' (default: {False})
 	
 	Returns:
 		{table} -- retorna o conteúdo do arquivo alvo como uma tabela
@@ -1565,7 +3462,7 @@ def load_data_file(filename, file_folder=os.curdir, delimiter='\t', lineterminat
 	assert filemimetype in ('csv', 'json', 'txt'), "Os únicos valores válidos para 'filemimetype' são: 'csv', 'json' ou 'txt'"
 
 	if filemimetype == 'csv':
-		conteudo = load_full_csv(filename, file_folder=file_folder, delimiter=delimiter, lineterminator=lineterminator)
+		conteudo = load_full_csv(filename, file_folder=file_folder, delimiter=delimiter, lineterminator=lineterminator, cache=cache)
 	elif filemimetype == 'json':
 		conteudo = load_json(filename, file_folder=file_folder)
 	elif filemimetype == 'txt':
@@ -1616,7 +3513,171 @@ def load_data_file_fields(filemimetype):
 
 
 
-def seek_for_lines(filename, col, value, file_folder=os.curdir, filemimetype="csv", delimiter='\t', lineterminator='\n', extract=False, show_data=True):
+def transform_csv(filename, transform=None, output_filename=None, file_folder=os.curdir, fields=None, delimiter='\t', lineterminator='\n', output_delimiter=None, output_lineterminator=None, encoding=None, output_encoding=None, commit=None):
+	"""Reescreve um arquivo CSV linha a linha, aplicando 'transform' a cada linha, sem carregar o arquivo na memória
+	
+	Arguments:
+		filename {string} -- nome do arquivo CSV de origem
+	
+	Keyword Arguments:
+		transform {function} -- recebe cada linha (OrderedDict) e retorna a linha a ser gravada, ou None para descartá-la; se None as linhas são copiadas (default: {None})
+		output_filename {string} -- arquivo de destino, se None o próprio arquivo de origem é substituído (default: {None})
+		file_folder {string} -- local onde os arquivos estão (default: {os.curdir})
+		fields {list|function} -- colunas do arquivo de destino, ou função que as recebe do cabeçalho de origem; se None mantém o cabeçalho de origem (default: {None})
+		delimiter {string} -- delimitador de campo do arquivo de origem (default: {'\t'})
+		lineterminator {string} -- delimitador de linha do arquivo de origem (default: {'\n'})
+		output_delimiter {string} -- delimitador de campo do destino, se None usa 'delimiter' (default: {None})
+		output_lineterminator {string} -- delimitador de linha do destino, se None usa 'lineterminator' (default: {None})
+		encoding {string} -- codificação do arquivo de origem, se None será detectada (default: {None})
+		output_encoding {string} -- codificação do destino, se None usa a mesma do arquivo de origem (default: {None})
+		commit {function} -- chamada sem argumentos ao final da leitura; se retornar False o destino não é alterado (default: {None})
+	
+	Returns:
+		{int} -- quantidade de linhas gravadas, ou None se 'commit' cancelar a gravação
+
+	Observations:
+		As linhas são gravadas em um arquivo temporário na pasta de destino, que só substitui o destino (os.replace) depois de completo; uma falha durante a gravação não deixa o destino truncado.
+		Um arquivo reescrito no lugar mantém a sua codificação (um arquivo cp1252 continua cp1252); valores que ela não representa causam UnicodeEncodeError sem alterar o destino, informe 'output_encoding' para convertê-lo.
+	"""
+
+	if output_filename is None:
+		output_filename = filename
+	if output_delimiter is None:
+		output_delimiter = delimiter
+	if output_lineterminator is None:
+		output_lineterminator = lineterminator
+
+	num_of_rows = 0
+	with FileLock(lockfile_name(output_filename, file_folder=file_folder)), open_text_file(filename, file_folder=file_folder, encoding=encoding) as f:
+		fd, tmp_path = tempfile.mkstemp(dir=file_folder, prefix='.' + output_filename, suffix='.tmp')
+		try:
+			with os.fdopen(fd, 'w', encoding=output_encoding or f.encoding, newline='') as tmp_f:
+				rd = csv.reader(f, delimiter=delimiter, lineterminator=lineterminator)
+				source_fields = next(rd, None) or []
+				if fields is None:
+					output_fields = source_fields
+				elif callable(fields):
+					output_fields = fields(source_fields)
+				else:
+					output_fields = fields
+
+				w = csv.DictWriter(tmp_f, output_fields, delimiter=output_delimiter, lineterminator=output_lineterminator)
+				w.writeheader()
+				for line in format_csv_rows(source_fields, rd, row_format='dict'):
+					if transform is not None:
+						line = transform(line)
+						if line is None:
+							continue
+					w.writerow(line)
+					num_of_rows += 1
+
+			if commit is not None and not commit():
+				os.remove(tmp_path)
+				return None
+			#'mkstemp' cria o arquivo com permissão 0600: o resultado mantém as permissões do destino (ou, se ele ainda não existir, do arquivo de origem)
+			output_path = os.path.join(file_folder, output_filename)
+			shutil.copymode(output_path if os.path.isfile(output_path) else os.path.join(file_folder, filename), tmp_path)
+			os.replace(tmp_path, output_path)
+		except BaseException:
+			if os.path.isfile(tmp_path):
+				os.remove(tmp_path)
+			raise
+
+	return num_of_rows
+
+
+
+def scan_csv_lines(filename, col, value, file_folder=os.curdir, delimiter='\t', lineterminator='\n', row_format='dict', encoding=None):
+	"""Percorre um arquivo CSV e retorna, sob demanda, as linhas em que 'value' existe na coluna 'col'
+	
+	Arguments:
+		filename {string} -- nome do arquivo CSV
+		col {string} -- coluna onde o valor pode ser encontrado
+		value {string} -- valor que deve ser verificado
+	
+	Keyword Arguments:
+		file_folder {string} -- local onde o arquivo está localizado (default: {os.curdir})
+		delimiter {string} -- delimitador de campo (default: {'\t'})
+		lineterminator {string} -- delimitador de fim de linha (default: {'\n'})
+		row_format {string} -- formato das linhas retornadas: 'dict'|'row'|'tuple' (default: {'dict'})
+		encoding {string} -- codificação do arquivo, se None será detectada (default: {None})
+	
+	Yields:
+		{OrderedDict|CSVRow|tuple} -- as linhas encontradas
+
+	Observations:
+		A comparação é feita sobre a lista lida por 'csv.reader', antes da montagem da linha; só as linhas encontradas são convertidas para 'row_format'.
+	"""
+
+	with open_text_file(filename, file_folder=file_folder, encoding=encoding) as f:
+		rd = csv.reader(f, delimiter=delimiter, lineterminator=lineterminator)
+		fields = next(rd, None)
+		if fields is None:
+			return
+		if col not in fields:
+			raise KeyError(col)
+		col_idx = fields.index(col)
+
+		matches = (row for row in rd if len(row) > col_idx and row[col_idx] == value)
+		yield from format_csv_rows(fields, matches, row_format=row_format)
+
+
+
+def split_csv_lines(filename, col, value, kept_filename, removed_filename, file_folder=os.curdir, delimiter='\t', lineterminator='\n', encoding=None):
+	"""Separa, em uma única passagem, as linhas de um arquivo CSV em dois arquivos: as que não têm 'value' na coluna 'col' e as que têm
+	
+	Arguments:
+		filename {string} -- nome do arquivo CSV de origem
+		col {string} -- coluna onde o valor pode ser encontrado
+		value {string} -- valor que deve ser verificado
+		kept_filename {string} -- arquivo que recebe as linhas mantidas
+		removed_filename {string} -- arquivo que recebe as linhas encontradas
+	
+	Keyword Arguments:
+		file_folder {string} -- local onde os arquivos estão localizados (default: {os.curdir})
+		delimiter {string} -- delimitador de campo (default: {'\t'})
+		lineterminator {string} -- delimitador de fim de linha (default: {'\n'})
+		encoding {string} -- codificação do arquivo de origem, se None será detectada (default: {None})
+	
+	Returns:
+		{tuple} -- quantidade de linhas mantidas e de linhas removidas
+	"""
+
+	num_kept = 0
+	num_removed = 0
+
+	with open_text_file(filename, file_folder=file_folder, encoding=encoding) as f, \
+		open(os.path.join(file_folder, kept_filename), 'w', encoding='utf8', newline='') as kept_f, \
+		open(os.path.join(file_folder, removed_filename), 'w', encoding='utf8', newline='') as removed_f:
+
+		rd = csv.reader(f, delimiter=delimiter, lineterminator=lineterminator)
+		kept_w = csv.writer(kept_f, delimiter=delimiter, lineterminator=lineterminator)
+		removed_w = csv.writer(removed_f, delimiter=delimiter, lineterminator=lineterminator)
+
+		fields = next(rd, None)
+		if fields is None:
+			return num_kept, num_removed
+		if col not in fields:
+			raise KeyError(col)
+		col_idx = fields.index(col)
+		kept_w.writerow(fields)
+		removed_w.writerow(fields)
+
+		for row in rd:
+			if not row:
+				continue
+			if len(row) > col_idx and row[col_idx] == value:
+				removed_w.writerow(row)
+				num_removed += 1
+			else:
+				kept_w.writerow(row)
+				num_kept += 1
+
+	return num_kept, num_removed
+
+
+
+def seek_for_lines(filename, col, value, file_folder=os.curdir, filemimetype="csv", delimiter='\t', lineterminator='\n', extract=False, show_data=True, stream=False):
 	"""Retorna ou exclui as linhas de um arquivo em que o 'valor' existe na coluna 'col'.
 	
 	Arguments:
@@ -1631,14 +3692,44 @@ def seek_for_lines(filename, col, value, file_folder=os.curdir, filemimetype="cs
 		lineterminator {string} -- delimitador de fim de linha, para arquivos CSV (default: {'\n'})
 		extract {bool} -- indica se as informações devem ser extraídas do arquivo original (default: {False})
 		show_data {bool} -- indica se as informações encontradas devem ser retornadas ou não (default: {True})
+		stream {bool} -- lê o arquivo CSV linha a linha, sem carregá-lo na memória, ver 'scan_csv_lines' e 'split_csv_lines' (default: {False})
 	
 	Returns:
 		{list} -- retorna uma lista de dicionários que pode ser manipulada ou salva como CSV ou JSON
+		{iterator} -- com 'stream=True', retorna um gerador das linhas encontradas, que não são exibidas
+
+	Observations:
+		Com 'stream=True' e 'extract=True' o arquivo é lido uma única vez: as linhas mantidas vão para um arquivo temporário na mesma pasta, que substitui o original ao final, e as encontradas vão direto para o arquivo de linhas removidas. O gerador retornado lê este último arquivo.
 	"""
 	
 	assert all([isinstance(filename, str), isinstance(col, str)]), "Os argumentos 'filename' e 'col' devem ser do tipo 'str'"
 	assert isinstance(value, (str, int, float)), "O argumento 'valor' deve ser de em dos tipos: 'str', 'int' ou 'float'"
-	assert all([isinstance(extract, bool), isinstance(show_data, bool)]), "Os argumentos 'extract' e 'show_data' devem ser boleanos"
+	assert all([isinstance(extract, bool), isinstance(show_data, bool), isinstance(stream, bool)]), "Os argumentos 'extract', 'show_data' e 'stream' devem ser boleanos"
+
+	if stream:
+		assert filemimetype == 'csv', "A leitura com 'stream=True' só está disponível para arquivos CSV"
+
+		if not extract:
+			if show_data:
+				return scan_csv_lines(filename, col, value, file_folder=file_folder, delimiter=delimiter, lineterminator=lineterminator)
+			return None
+
+		new_filename = time.ctime().replace(' ','_') + "removed_lines_from_" + filename
+		with FileLock(lockfile_name(filename, file_folder=file_folder)):
+			fd, tmp_path = tempfile.mkstemp(dir=file_folder, prefix='.' + filename, suffix='.tmp')
+			os.close(fd)
+			try:
+				split_csv_lines(filename, col, value, os.path.basename(tmp_path), new_filename, file_folder=file_folder, delimiter=delimiter, lineterminator=lineterminator)
+				#'mkstemp' cria o arquivo com permissão 0600: o arquivo reescrito mantém as permissões do original
+				shutil.copymode(os.path.join(file_folder, filename), tmp_path)
+				os.replace(tmp_path, os.path.join(file_folder, filename))
+			except BaseException:
+				os.remove(tmp_path)
+				raise
+
+		if show_data:
+			return load_csv(new_filename, file_folder=file_folder, delimiter=delimiter, lineterminator=lineterminator)
+		return None
 
 	conteudo = load_data_file(filename, file_folder=file_folder, delimiter=delimiter, lineterminator=lineterminator, filemimetype=filemimetype)
 
@@ -1677,29 +3768,26 @@ def copy_col(filename, source_col, destination_col, file_folder=os.curdir, filem
 		preserve_existent_value {bool} -- indica se o valor no destino deve ser mantido ou substituído (default: {True})
 	"""
 
-	"Copia o conteúdo de uma coluna alvo para uma coluna de destino se a célula do destino ainda não estiver preechida"
+	changed = False
 
-	conteudo = load_data_file(filename, file_folder=file_folder, delimiter=delimiter, lineterminator=lineterminator)
+	def copy_value(line):
+		nonlocal changed
+		if line.get(destination_col) is None:
+			line[destination_col] = ''
+		if line[source_col] != '' and (line[destination_col] == '' or not preserve_existent_value):
+			changed = changed or line[destination_col] != line[source_col]
+			line[destination_col] = line[source_col]
+		return line
 
-	#Sunstituir por 'load_data_file_fields', quando implementado
-	cols = load_csv_head(filename)
+	def add_destination_col(fields):
+		if destination_col in fields:
+			return fields
+		return fields + [destination_col]
 
-	save_file = False
-	if destination_col in cols:
-		for line in conteudo:
-			if line[source_col] != '' and line[destination_col] == '':
-				save_file = True
-				line[destination_col] = line[source_col]
-	else:
-		for line in conteudo:
-			line[destination_col] = ''
-			if line[source_col] != '' and line[destination_col] == '':
-				save_file = True
-				line[destination_col] = line[source_col]		
-	
-	if save_file:
-		print("Cópia efetuada... Gravando informações no arquivo...")
-		save_data_file(conteudo, filename, file_folder=file_folder, delimiter=delimiter, lineterminator=lineterminator, filemimetype=filemimetype)
+	saved = transform_csv(filename, copy_value, file_folder=file_folder, fields=add_destination_col, delimiter=delimiter, lineterminator=lineterminator, commit=lambda: changed)
+
+	if saved is not None:
+		print("Cópia efetuada... Informações gravadas no arquivo...")
 	else:
 		print("Não há o que alterar...")
 
@@ -1748,12 +3836,12 @@ def convert_csv_type(filename, old_delimiter, new_delimiter, file_folder=os.curd
 		new_delimiter {string} -- novo delimitador de campo
 	
 	Keyword Arguments:
+		file_folder {string} -- local onde o arquivo está (default: {os.curdir})
 		old_lineterminator {string} -- antigo delimitador de linha (default: {os.linesep})
 		new_lineterminator {string} -- novo delimitador de linha (default: {os.linesep})
 	"""
-		
-	conteudo = load_csv(filename, delimiter=old_delimiter, lineterminator=old_lineterminator)
-	save_csv(conteudo, filename, delimiter=new_delimiter, lineterminator=new_lineterminator)
+
+	transform_csv(filename, file_folder=file_folder, delimiter=old_delimiter, lineterminator=old_lineterminator, output_delimiter=new_delimiter, output_lineterminator=new_lineterminator)
 
 
 
@@ -1859,7 +3947,183 @@ def print_table_line_by_line(iterator, initial_index=0, delimiter=False, select=
 
 
 
-def table_junction(table1, table2, junction_col, select=False, delimiter=False):
+def join_rows(left_row, right_row, left_fields, right_fields, fill_value=''):
+	"""Combina uma linha da esquerda e uma da direita em um novo dicionário, usado por 'hash_join' e 'merge_join'
+	
+	Arguments:
+		left_row {dict|None} -- linha da esquerda, ou None se não houver correspondência
+		right_row {dict|None} -- linha da direita, ou None se não houver correspondência
+		left_fields {list} -- colunas da esquerda, preenchidas com 'fill_value' quando 'left_row' for None
+		right_fields {list} -- colunas da direita, preenchidas com 'fill_value' quando 'right_row' for None
+	
+	Keyword Arguments:
+		fill_value {object} -- valor das colunas do lado sem correspondência (default: {''})
+	
+	Returns:
+		{dict} -- colunas da esquerda seguidas das colunas da direita; em colunas de mesmo nome prevalece o valor da direita
+	"""
+
+	if left_row is not None:
+		joined = dict(left_row)
+	else:
+		joined = dict.fromkeys(left_fields, fill_value)
+	if right_row is not None:
+		joined.update(right_row)
+	else:
+		for field in right_fields:
+			joined.setdefault(field, fill_value)
+	return joined
+
+
+
+def hash_join(left, right, on, how='inner', fill_value=''):
+	"""Junta as linhas de duas tabelas cujos valores da(s) coluna(s) 'on' coincidam, gerando as linhas combinadas uma a uma
+	
+	Arguments:
+		left {iterator} -- linhas (dicionários ou 'CSVRow') da tabela da esquerda
+		right {iterator} -- linhas (dicionários ou 'CSVRow') da tabela da direita
+		on {string|list} -- coluna de junção, ou lista de colunas para chaves compostas
+	
+	Keyword Arguments:
+		how {string} -- 'inner' (só as linhas com correspondência), 'left', 'right' ou 'full' (mantém também as linhas sem correspondência da esquerda, da direita ou de ambas) (default: {'inner'})
+		fill_value {object} -- valor das colunas do lado sem correspondência (default: {''})
+	
+	Yields:
+		{dict} -- colunas da esquerda seguidas das colunas da direita; em colunas de mesmo nome prevalece o valor da direita
+
+	Observations:
+		Um índice em memória é criado com o menor lado (se os dois tiverem tamanho conhecido) ou com o lado que não for um gerador; o outro lado é lido uma única vez, linha a linha, e pode ser um gerador como 'load_csv'.
+		Chaves repetidas geram uma linha para cada combinação. As linhas sem correspondência do lado indexado são geradas ao final.
+		As linhas de entrada não são alteradas.
+	"""
+
+	assert how in ('inner', 'left', 'right', 'full')
+
+	key_of = itemgetter(*on) if isinstance(on, (list, tuple)) else itemgetter(on)
+
+	try:
+		build_left = len(left) <= len(right)
+	except TypeError:
+		build_left = hasattr(left, '__len__') and not hasattr(right, '__len__')
+
+	if build_left:
+		build_rows, probe_rows = left, right
+		keep_build, keep_probe = how in ('left', 'full'), how in ('right', 'full')
+	else:
+		build_rows, probe_rows = right, left
+		keep_build, keep_probe = how in ('right', 'full'), how in ('left', 'full')
+
+	index = {}
+	build_fields = []
+	for row in build_rows:
+		if not build_fields:
+			build_fields = list(row.keys())
+		key = key_of(row)
+		if key in index:
+			index[key].append(row)
+		else:
+			index[key] = [row]
+
+	probe_fields = []
+	matched = set()
+
+	def combine(build_row, probe_row):
+		if build_left:
+			return join_rows(build_row, probe_row, build_fields, probe_fields, fill_value)
+		return join_rows(probe_row, build_row, probe_fields, build_fields, fill_value)
+
+	for row in probe_rows:
+		if not probe_fields:
+			probe_fields = list(row.keys())
+		key = key_of(row)
+		matches = index.get(key)
+		if matches:
+			if keep_build:
+				matched.add(key)
+			for build_row in matches:
+				yield combine(build_row, row)
+		elif keep_probe:
+			yield combine(None, row)
+
+	if keep_build:
+		for key, rows in index.items():
+			if key not in matched:
+				for build_row in rows:
+					yield combine(build_row, None)
+
+
+
+def merge_join(left, right, on, how='inner', fill_value=''):
+	"""Versão de 'hash_join' para tabelas já ordenadas pela(s) coluna(s) 'on': as duas tabelas são lidas uma única vez, em intercalação, sem criar índices
+	
+	Arguments:
+		left {iterator} -- linhas (dicionários ou 'CSVRow') da tabela da esquerda, em ordem crescente de chave
+		right {iterator} -- linhas (dicionários ou 'CSVRow') da tabela da direita, em ordem crescente de chave
+		on {string|list} -- coluna de junção, ou lista de colunas para chaves compostas
+	
+	Keyword Arguments:
+		how {string} -- 'inner', 'left', 'right' ou 'full', ver 'hash_join' (default: {'inner'})
+		fill_value {object} -- valor das colunas do lado sem correspondência (default: {''})
+	
+	Yields:
+		{dict} -- linhas combinadas, em ordem crescente de chave
+
+	Observations:
+		Só as linhas de uma mesma chave ficam em memória. Uma tabela fora de ordem interrompe a junção com AssertionError.
+	"""
+
+	assert how in ('inner', 'left', 'right', 'full')
+
+	key_of = itemgetter(*on) if isinstance(on, (list, tuple)) else itemgetter(on)
+	keep_left, keep_right = how in ('left', 'full'), how in ('right', 'full')
+
+	def key_groups(rows, side):
+		previous = None
+		for key, group in itertools.groupby(rows, key_of):
+			assert previous is None or previous < key, "A tabela da {} não está ordenada pela chave: {!r} depois de {!r}".format(side, key, previous)
+			previous = key
+			yield key, list(group)
+
+	left_groups = key_groups(left, 'esquerda')
+	right_groups = key_groups(right, 'direita')
+	left_group = next(left_groups, None)
+	right_group = next(right_groups, None)
+	left_fields = list(left_group[1][0].keys()) if left_group is not None else []
+	right_fields = list(right_group[1][0].keys()) if right_group is not None else []
+
+	while left_group is not None and right_group is not None:
+		if left_group[0] < right_group[0]:
+			if keep_left:
+				for row in left_group[1]:
+					yield join_rows(row, None, left_fields, right_fields, fill_value)
+			left_group = next(left_groups, None)
+
+		elif right_group[0] < left_group[0]:
+			if keep_right:
+				for row in right_group[1]:
+					yield join_rows(None, row, left_fields, right_fields, fill_value)
+			right_group = next(right_groups, None)
+
+		else:
+			for left_row in left_group[1]:
+				for right_row in right_group[1]:
+					yield join_rows(left_row, right_row, left_fields, right_fields, fill_value)
+			left_group = next(left_groups, None)
+			right_group = next(right_groups, None)
+
+	while keep_left and left_group is not None:
+		for row in left_group[1]:
+			yield join_rows(row, None, left_fields, right_fields, fill_value)
+		left_group = next(left_groups, None)
+
+	while keep_right and right_group is not None:
+		for row in right_group[1]:
+			yield join_rows(None, row, left_fields, right_fields, fill_value)
+		right_group = next(right_groups, None)
+
+
+
+def table_junction(table1, table2, junction_col, select=False, delimiter=False, how='inner'):
 	"""Cria uma tabela a partir da união duas tabelas em que respostas da coluna selecionada coincidam
 	
 	Arguments:
@@ -1870,124 +4134,54 @@ def table_junction(table1, table2, junction_col, select=False, delimiter=False):
 	Keyword Arguments:
 		select {bool} -- esta opção permite selecionar as colunas a serem cruzadas (default: {False})
 		delimiter {bool} -- opção necessária quando as lihas da tabela forem strings de texto com delimitadores (default: {False})
+		how {string} -- tipo de junção: 'inner', 'left', 'right' ou 'full', ver 'hash_join' (default: {'inner'})
 	
 	Returns:
 		{list_of_dicts} -- lista de dicionários para fácil conversão em CSV ou JSON
 	"""
 	
-	table1_data, table1_line_type, table1_selected_cols, table1_fields_index_map = check_table_atributes(table1, select=select, delimiter=delimiter)
-	table2_data, table2_line_type, table2_selected_cols, table2_fields_index_map = check_table_atributes(table2, select=select, delimiter=delimiter)
+	def table_rows(table):
+		table_data, line_type, selected_cols, fields_index_map = check_table_atributes(table, select=select, delimiter=delimiter)
+		if junction_col not in selected_cols:
+			selected_cols = [junction_col] + list(selected_cols)
+		col_indexes = [fields_index_map[col] for col in selected_cols]
 
-	output = []
-	tmpdict = {}
+		if line_type == 'dict':
+			if not select:
+				return table_data
+			return [{col: line[col] for col in selected_cols} for line in table_data]
 
-	for idx in range(0, len(table1_data)):
-		if table1_line_type == 'dict':
-			tmpdict[table1_data[idx][junction_col]] = table1_data[idx]
+		if line_type == 'str':
+			#Cada linha é dividida uma única vez
+			table_data = (line.split(delimiter) for line in table_data)
+		return [dict(zip(selected_cols, [values[idx] for idx in col_indexes])) for values in table_data]
 
-		elif table1_line_type == 'str':
-			converted_line = {}
-			for col in table1_selected_cols:
-				converted_line[col] = table1_data[idx].split(delimiter)[table1_fields_index_map[col]]
-			tmpdict[converted_line[junction_col]] = converted_line
-			
-		elif table1_line_type == 'list/tuple':
-			converted_line = {}
-			for col in table1_selected_cols:
-				converted_line[col] = table1_data[idx][table1_fields_index_map[col]]
-			tmpdict[converted_line[junction_col]] = converted_line
-
-
-	for idx in range(0, len(table2_data)):
-		if table2_line_type == 'dict':
-			if table2_data[idx][junction_col] in tmpdict:
-				joined_line = tmpdict[table2_data[idx][junction_col]]
-				for col in table2_selected_cols:
-					if col != junction_col:
-						joined_line[col] = table2_data[idx][col]
-				output.append(joined_line)
-
-		elif table2_line_type == 'str':
-			converted_line = {}
-			for col in table2_selected_cols:
-				converted_line[col] = table2_data[idx].split(delimiter)[table2_fields_index_map[col]]
-			
-			if converted_line[junction_col] in tmpdict:
-				joined_line = tmpdict[converted_line[junction_col]]
-				for col in table2_selected_cols:
-					if col != junction_col:
-						joined_line[col] = converted_line[col]
-				output.append(joined_line)
-
-		elif table2_line_type == 'list/tuple':
-			converted_line = {}
-			for col in table2_selected_cols:
-				converted_line[col] = table2_data[idx][table2_fields_index_map[col]]
-			
-			if converted_line[junction_col] in tmpdict:
-				joined_line = tmpdict[converted_line[junction_col]]
-				for col in table2_selected_cols:
-					if col != junction_col:
-						joined_line[col] = converted_line[col]
-				output.append(joined_line)
-			
-	return output
+	return list(hash_join(table_rows(table1), table_rows(table2), junction_col, how=how))
 
 
 
-def table_merge(list_of_dicts1, list_of_dicts2, joint_key):
-	'''
-	Realiza a junção de dois dicionários distintos que compartilhem uma mesma chave/col.
-	Retorna as linhas em que os valores da chave selecionada correspondem nos dois dicionários.
-	'''
+def table_merge(list_of_dicts1, list_of_dicts2, joint_key, presorted=False, stream=False):
+	"""Realiza a junção completa (full outer join) de duas tabelas que compartilhem uma mesma chave/col
+	
+	Arguments:
+		list_of_dicts1 {iterator} -- linhas da primeira tabela
+		list_of_dicts2 {iterator} -- linhas da segunda tabela
+		joint_key {string|list} -- coluna (ou colunas) de junção
+	
+	Keyword Arguments:
+		presorted {bool} -- indica que as duas tabelas já estão em ordem crescente de chave; usa 'merge_join' em vez de 'hash_join' (default: {False})
+		stream {bool} -- retorna um gerador em vez de uma lista (default: {False})
+	
+	Returns:
+		{list_of_dicts|generator} -- as linhas com correspondência, combinadas, e as linhas sem correspondência das duas tabelas, com as colunas da outra tabela vazias
+	"""
+
+	join = merge_join if presorted else hash_join
+	rows = join(list_of_dicts1, list_of_dicts2, joint_key, how='full')
 
-	output = []
-	tmpdict = {}
-	list_of_dicts1_cols = list_of_dicts1[0].keys()
-	list_of_dicts2_cols = list_of_dicts2[0].keys()
-	for row in list_of_dicts1:
-		tmpdict[row[joint_key]] = row
-	new_row_col = merge_lists(list_of_dicts1_cols,list_of_dicts2_cols)
-	new_row_skell = OrderedDict()
-	for col_name in new_row_col:
-		new_row_skell[col_name]=""
-	
-	key_2_skip = []
-	for other_row in list_of_dicts2:
-		if other_row[joint_key] in tmpdict:
-			key_2_skip.append(other_row[joint_key])
-			joined_row = tmpdict[other_row[joint_key]]
-			for colz in list_of_dicts2_cols:
-				if colz != joint_key:
-					joined_row[colz] = other_row[colz]
-			output.append(joined_row)
-		
-	linhas_n_comuns = len(list_of_dicts1) + len(list_of_dicts1) - len(key_2_skip)
-	tabela_linhas_n_comuns = []
-	while linhas_n_comuns != 0:
-		linha_inteira = copy(new_row_skell)
-		tabela_linhas_n_comuns.append(linha_inteira)
-		linhas_n_comuns -= 1
-	
-	tabela_linhas_n_comuns=[]
-	
-	for linha in list_of_dicts1:
-		linha_inteira = copy(new_row_skell)
-		if not linha[joint_key] in key_2_skip:
-			for colz in list_of_dicts1_cols:
-				try: linha_inteira[colz] = linha[colz]
-				except: pass
-			tabela_linhas_n_comuns.append(linha_inteira)
-
-	for linha in list_of_dicts2:
-		linha_inteira = copy(new_row_skell)
-		if not linha[joint_key] in key_2_skip:
-			for colz in list_of_dicts2_cols:
-					linha_inteira[colz] = linha[colz]
-			tabela_linhas_n_comuns.append(linha_inteira)
-		
-	final_output = merge_lists(tabela_linhas_n_comuns, output)
-	return final_output
+	if stream:
+		return rows
+	return list(rows)
 
 
 
@@ -2013,20 +4207,18 @@ def cross_table_values(filename, overwrite_file=False, file_folder=os.curdir, de
 	else:
 		output_filename = filename
 
-	table = load_full_csv(filename, file_folder=file_folder, delimiter=delimiter, lineterminator=lineterminator)
+	fields = load_csv_head(filename, file_folder=file_folder, delimiter=delimiter, lineterminator=lineterminator)
+	selected_cols = pick_options(fields, input_label="Selecione colunas que devem ser cruzadas", number_of_cols=1, max_selection=len(fields))
+	new_col_name = read_input(input_label="Nome da nova coluna a ser criada")
 
-	if isinstance(table[0], dict):
-		fields = list(table[0].keys())
-		selected_cols = pick_options(fields, input_label="Selecione colunas que devem ser cruzadas", number_of_cols=1, max_selection=len(fields))
-		new_col_name = read_input(input_label="Nome da nova coluna a ser criada")
-		for line in table:
-			combined_data = []
-			for col in selected_cols:
-				combined_data.append(line[col])
-			combined_data = lexical_list_join(combined_data)
-			line[new_col_name] = combined_data
+	def combine_cols(line):
+		line[new_col_name] = lexical_list_join([line[col] for col in selected_cols])
+		return line
 
-	save_csv(table, filename=output_filename, file_folder=file_folder)
+	if new_col_name not in fields:
+		fields = fields + [new_col_name]
+
+	transform_csv(filename, combine_cols, output_filename=output_filename, file_folder=file_folder, fields=fields, delimiter=delimiter, lineterminator=lineterminator)
 
 
 
@@ -2044,10 +4236,9 @@ def simplify_table_values(filename, overwrite_file=False, file_folder=os.curdir,
 	"""
 
 	def map_values(selected_col):
-		mapped_values = {}
-		for line in table:
-			if not mapped_values.get(line[selected_col]):
-				mapped_values[line[selected_col]] = True
+		mapped_values = OrderedDict()
+		for line in load_csv(filename, file_folder=file_folder, delimiter=delimiter, lineterminator=lineterminator, row_format='row'):
+			mapped_values[line[selected_col]] = True
 		return list(mapped_values.keys())
 
 
@@ -2075,19 +4266,20 @@ def simplify_table_values(filename, overwrite_file=False, file_folder=os.curdir,
 	else:
 		output_filename = filename
 
-	table = load_full_csv(filename, file_folder=file_folder, delimiter=delimiter, lineterminator=lineterminator)
+	fields = load_csv_head(filename, file_folder=file_folder, delimiter=delimiter, lineterminator=lineterminator)
+	selected_col = pick_options(fields, input_label="Selecione a colunas que devem ter os valores simplificados", number_of_cols=1, max_selection=1)
+	mapped_values = map_values(selected_col)
+	conversion_dict = conversion_rule(mapped_values)
+	new_col_name = read_input(input_label="Nome da nova coluna a ser criada")
 
-	if isinstance(table[0], dict):
-		fields = list(table[0].keys())
-		selected_col = pick_options(fields, input_label="Selecione a colunas que devem ter os valores simplificados", number_of_cols=1, max_selection=1)
-		mapped_values = map_values(selected_col)
-		conversion_dict = conversion_rule(mapped_values)
-		new_col_name = read_input(input_label="Nome da nova coluna a ser criada")
+	def simplify_value(line):
+		line[new_col_name] = conversion_dict[line[selected_col]]
+		return line
 
-		for line in table:
-			line[new_col_name] = conversion_dict[line[selected_col]]
+	if new_col_name not in fields:
+		fields = fields + [new_col_name]
 
-	save_csv(table, filename=output_filename, file_folder=file_folder)
+	transform_csv(filename, simplify_value, output_filename=output_filename, file_folder=file_folder, fields=fields, delimiter=delimiter, lineterminator=lineterminator)
 
 
 
@@ -2125,30 +4317,27 @@ def return_longest_then_shortest_list(first_list, second_list):
 	return longuest, shortest
 
 
-def diff_lists(first_list, second_list):
+def diff_lists(first_list, second_list, multiset=False, presorted=False):
 	"""Retorna os itens da lista "a" que não estão em "b".
 	
 	Arguments:
 		first_list {list|tuple} -- primeiro iterador 
 		second_list {list|tuple} -- segundo iterador 
+
+	Keyword Arguments:
+		multiset {bool} -- se True, cada ocorrência em "b" remove apenas uma ocorrência de "a" (default: {False})
+		presorted {bool} -- indica que as duas listas já estão em ordem crescente (default: {False})
 	
 	Returns:
-		{list} -- retorna uma lista com os elementos existentes apenas na primeira lista
+		{list} -- retorna uma lista com os elementos existentes apenas na primeira lista, na ordem original
 	"""
 
-	second_list_sorted = second_list.copy()
-	second_list_sorted.sort()
-
-	output = []
-	for item in first_list:
-		if not bisect_search(item, second_list_sorted):
-			output.append(item)
-	return output
+	return set_algebra.difference(first_list, second_list, multiset=multiset, presorted=presorted)
 
 
 
 
-def compare_lists(first_list, second_list, historical_analisis=False, first_list_dict_label='First', second_list_dict_label='Second'):
+def compare_lists(first_list, second_list, historical_analisis=False, first_list_dict_label='First', second_list_dict_label='Second', multiset=False, presorted=False):
 	"""Compara duas listas e retorna um dicionário que agrupa itens exclusivos e compartilhados.
 	
 	Arguments:
@@ -2157,27 +4346,25 @@ def compare_lists(first_list, second_list, historical_analisis=False, first_list
 	
 	Keyword Arguments:
 		historical_analisis {bool} -- apresenta uma única lista mostrando o que mudou na lista [b] em relação a [a] (default: {False})
-		first_list_dict_label {str} -- [description] (default: {'First'})
-		second_list_dict_label {str} -- [description] (default: {'Second'})
+		first_list_dict_label {str} -- nome usado na chave dos itens exclusivos da primeira lista (default: {'First'})
+		second_list_dict_label {str} -- nome usado na chave dos itens exclusivos da segunda lista (default: {'Second'})
+		multiset {bool} -- conta as repetições de cada item (default: {False})
+		presorted {bool} -- indica que as duas listas já estão em ordem crescente (default: {False})
 	
 	Returns:
-		[type] -- [description]
+		{dict} -- {'mudou': [...]} se historical_analisis, senão {'onlyOnFirst': [...], 'onlyOnSecond': [...], 'shared': [...]}
 	"""
-	'''
-	
-	Se historical_analisis=True, apresenta uma única lista mostrando o que mudou na lista [b] em relação a [a].
-	Os argumentos first_list_dict_label e second_list_dict_label permitem usar nomes específicos para as listas.
-	'''
+
 	output = {}
 
 	if historical_analisis == True:
 		#A segunda lista deve ser a mais nova para que os valores retornados sejam os mais atuais...
-		output[u'mudou'] = diff_lists(second_list, first_list)
+		output[u'mudou'] = diff_lists(second_list, first_list, multiset=multiset, presorted=presorted)
 
 	else:
-		output[u'onlyOn%s' % first_list_dict_label] = diff_lists(first_list, second_list)
-		output[u'onlyOn%s' % second_list_dict_label] = diff_lists(second_list, first_list)
-		output[u'shared'] = intersect_lists(first_list, second_list)
+		output[u'onlyOn%s' % first_list_dict_label] = diff_lists(first_list, second_list, multiset=multiset, presorted=presorted)
+		output[u'onlyOn%s' % second_list_dict_label] = diff_lists(second_list, first_list, multiset=multiset, presorted=presorted)
+		output[u'shared'] = intersect_lists(first_list, second_list, multiset=multiset, presorted=presorted)
 
 	return output
 
@@ -2191,65 +4378,173 @@ def diff_dicts(first_dict, second_dict):
 		second_dict {dict} -- segundo dicionário
 	
 	Returns:
-		{list} -- retorna uma lista com o que mudou
+		{dict} -- {'mudou': [...]} com os pares "chave: valor" do segundo dicionário que não existem no primeiro
+
+	Observations:
+		Compara apenas o primeiro nível; para dicionários aninhados, ver 'deep_diff_dicts'.
 	"""
 
-	l1 = [": ".join(pair) for pair in first_dict.items()]
-	l2 = [": ".join(pair) for pair in second_dict.items()]
+	changed = set_algebra.difference(list(second_dict.items()), list(first_dict.items()))
 
-	output = compare_lists(l1, l2, historical_analisis=True)
+	return {u'mudou': ["{}: {}".format(key, value) for key, value in changed]}
 
-	return output
 
 
 
+safe_leaf_types = (str, bytes, int, float, complex, bool, type(None))
 
-def merge_lists(first_list, second_list):
-	"""Une duas listas assumindo que não devem haver quaisquer itens repetidos nelas
+def subtree_digest(node, digests):
+	"""Calcula o hash de um objeto aninhado a partir do hash de suas partes (árvore de Merkle)
+
+	Arguments:
+		node {object} -- dicionário, lista, tupla, conjunto ou valor simples
+		digests {dict} -- hashes já calculados, por id() de cada dicionário/lista/tupla/conjunto
+
+	Returns:
+		{int|None} -- hash do objeto, ou None se ele contiver valores que o hash não é capaz de comparar
+
+	Observations:
+		Apenas os tipos em 'safe_leaf_types' (e não suas subclasses) têm hash; objetos de outros tipos precisam ser comparados diretamente.
+		A ordem das chaves de um dicionário não altera seu hash; a ordem dos elementos de uma lista ou tupla, sim.
+		Usa a função hash() nativa: os valores só são comparáveis dentro de um mesmo processo, e hashes iguais não garantem objetos iguais.
+	"""
+
+	node_type = type(node)
+	if node_type in safe_leaf_types:
+		return hash((node_type, node))
+
+	node_id = id(node)
+	if node_id in digests:
+		return digests[node_id]
+
+	if isinstance(node, dict) or isinstance(node, Mapping):
+		#Todos os dicionários (dict, OrderedDict, ...) com o mesmo conteúdo têm o mesmo hash
+		node_type = Mapping
+		parts = [(subtree_digest(key, digests), subtree_digest(value, digests)) for key, value in node.items()]
+		safe = None not in itertools.chain.from_iterable(parts)
+		if safe:
+			parts.sort()
+
+	elif isinstance(node, (list, tuple)):
+		parts = [subtree_digest(value, digests) for value in node]
+		safe = None not in parts
+
+	elif isinstance(node, (set, frozenset)):
+		parts = [subtree_digest(value, digests) for value in node]
+		safe = None not in parts
+		if safe:
+			parts.sort()
+
+	else:
+		return None
+
+	digest = hash((node_type, tuple(parts))) if safe else None
+	digests[node_id] = digest
+	return digest
+
+
+
+def deep_diff_dicts(first_dict, second_dict):
+	"""Compara recursivamente dois dicionários (ou listas) aninhados e retorna os caminhos que mudaram do primeiro para o segundo
 	
 	Arguments:
-		first_list {list} -- [description]
-		second_list {list} -- [description]
+		first_dict {dict} -- primeiro dicionário
+		second_dict {dict} -- segundo dicionário
 	
 	Returns:
-		{list} -- lista combinada sem repetição de elementos entre a primeira e a segunda lista
+		{dict} -- {'added': [...], 'removed': [...], 'changed': [...]}, sendo cada caminho uma tupla de chaves/índices (ex.: ('q1', 'alternativas', 0))
+
+	Observations:
+		Cada sub-árvore é resumida por um hash (ver 'subtree_digest'); ramos com o mesmo hash nos dois lados são confirmados com '==' e ignorados sem serem percorridos.
+		Valores cujo hash não pode ser calculado são comparados com '=='.
 	"""
 
-	longuest, shortest = return_longest_then_shortest_list(first_list, second_list)
+	output = {'added': [], 'removed': [], 'changed': []}
+	digests = {}
+
+	def compare(path, first, second):
+		if first is second:
+			return
+		first_digest = subtree_digest(first, digests)
+		second_digest = subtree_digest(second, digests)
+		if first_digest is not None and first_digest == second_digest:
+			#Hashes diferentes provam que os ramos diferem; hashes iguais podem colidir (ex.: hash(-1) == hash(-2)) e são confirmados com '=='
+			try:
+				if bool(first == second):
+					return
+			except Exception:
+				pass
 
-	longuest.sort()
+		if isinstance(first, Mapping) and isinstance(second, Mapping):
+			for key in first:
+				if key not in second:
+					output['removed'].append(path + (key,))
+			for key, value in second.items():
+				if key not in first:
+					output['added'].append(path + (key,))
+				else:
+					compare(path + (key,), first[key], value)
 
-	for item in shortest:
-		if not bisect_search(item, longuest):
-			longuest.append(item)
-	
-	return longuest
+		elif isinstance(first, (list, tuple)) and type(first) == type(second):
+			shared_length = min(len(first), len(second))
+			for idx in range(shared_length):
+				compare(path + (idx,), first[idx], second[idx])
+			output['removed'].extend(path + (idx,) for idx in range(shared_length, len(first)))
+			output['added'].extend(path + (idx,) for idx in range(shared_length, len(second)))
 
+		elif first_digest is not None and second_digest is not None:
+			output['changed'].append(path)
 
+		else:
+			try:
+				equal = type(first) == type(second) and bool(first == second)
+			except Exception:
+				equal = False
+			if not equal:
+				output['changed'].append(path)
 
+	compare((), first_dict, second_dict)
+	return output
 
-def intersect_lists(first_list, second_list):
-	"""Retorna a lista com itens comuns a partir de duas listas de entrada.
+
+
+
+def merge_lists(first_list, second_list, multiset=False, presorted=False):
+	"""Une duas listas assumindo que não devem haver quaisquer itens repetidos nelas
 	
 	Arguments:
-		first_list {list} -- primeira lista de entrada
+		first_list {list} -- primeira lista
 		second_list {list} -- segunda lista
+
+	Keyword Arguments:
+		multiset {bool} -- mantém cada item tantas vezes quanto na lista em que é mais frequente (default: {False})
+		presorted {bool} -- indica que as duas listas já estão em ordem crescente; o resultado também estará (default: {False})
 	
 	Returns:
-		{list} -- retorna uma sublista com elementos comuns
+		{list} -- lista combinada sem repetição de elementos: os itens da primeira lista seguidos dos novos itens da segunda
 	"""
 
-	longuest, shortest = return_longest_then_shortest_list(first_list, second_list)
+	return set_algebra.union(first_list, second_list, multiset=multiset, presorted=presorted)
 
-	longuest.sort()
 
-	output = []
 
-	for item in shortest:
-		if bisect_search(item, longuest):
-			output.append(item)
 
-	return output
+def intersect_lists(first_list, second_list, multiset=False, presorted=False):
+	"""Retorna a lista com itens comuns a partir de duas listas de entrada.
+	
+	Arguments:
+		first_list {list} -- primeira lista de entrada
+		second_list {list} -- segunda lista
+
+	Keyword Arguments:
+		multiset {bool} -- conta as repetições: cada item aparece tantas vezes quanto na lista em que é menos frequente (default: {False})
+		presorted {bool} -- indica que as duas listas já estão em ordem crescente (default: {False})
+	
+	Returns:
+		{list} -- retorna uma sublista com elementos comuns, na ordem da primeira lista
+	"""
+
+	return set_algebra.intersection(first_list, second_list, multiset=multiset, presorted=presorted)
 
 
 
@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# license: AGPL-3.0 
+#
+# Operações de conjunto sobre listas: diferença, interseção e união.
+#
+# Sem 'multiset', as operações filtram a primeira lista: cada elemento é mantido ou descartado (com as suas repetições)
+# conforme exista ou não na segunda lista, e a ordem da primeira lista é preservada. Com 'multiset=True' os elementos
+# são contados: cada ocorrência na segunda lista corresponde a uma única ocorrência na primeira.
+#
+# A pesquisa é feita pela estrutura mais rápida que os elementos permitirem: conjunto/Counter (elementos hasheáveis),
+# lista ordenada com busca binária (elementos comparáveis) ou, em último caso, pesquisa linear. Com 'presorted=True'
+# as duas listas já estão em ordem crescente e são percorridas uma única vez, em intercalação.
+#
+# Para arquivos maiores que a memória, 'diff_files' ordena as linhas de cada arquivo com 'external_sort' (blocos
+# ordenados em memória e gravados em arquivos temporários, depois intercalados) e grava o resultado da comparação em
+# arquivos, no mesmo formato de 'compare_lists'. Também pode ser usado pela linha de comando:
+#
+#	python3 set_algebra.py primeiro.txt segundo.txt [pasta_de_saída] [--historical]
+#
+
+
+import sys
+import os
+import itertools
+import heapq
+import tempfile
+
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+
+
+external_sort_run_size = 500000
+external_sort_merge_width = 64
+
+
+
+def membership_test(items):
+	"""Retorna uma função que verifica se um valor pertence a 'items'
+
+	Arguments:
+		items {iterator} -- elementos de referência
+
+	Returns:
+		{function} -- recebe um valor e retorna True se ele existir em 'items'
+
+	Observations:
+		Usa um conjunto se os elementos forem hasheáveis, uma lista ordenada com busca binária se forem comparáveis ou, por fim, pesquisa linear.
+	"""
+
+	items = list(items)
+
+	try:
+		lookup = set(items)
+	except TypeError:
+		lookup = None
+
+	if lookup is not None:
+		def contains(value):
+			try: return value in lookup
+			except TypeError: return False
+		return contains
+
+	try:
+		ordered = sorted(items)
+	except TypeError:
+		return items.__contains__
+
+	size = len(ordered)
+	def contains(value):
+		try:
+			idx = bisect_left(ordered, value)
+		except TypeError:
+			#Valor não comparável com os elementos (ou lista de um só elemento, que 'sorted' não chega a comparar)
+			return value in items
+		return idx < size and ordered[idx] == value
+	return contains
+
+
+
+def count_items(items):
+	"""Retorna um Counter com as ocorrências de cada elemento, ou None se os elementos não forem hasheáveis"""
+
+	try:
+		return Counter(items)
+	except TypeError:
+		return None
+
+
+
+def select_members(first, second, keep_members):
+	#Filtra 'first' mantendo os elementos que existem (keep_members=True) ou não existem em 'second'
+	try:
+		lookup = set(second)
+	except TypeError:
+		lookup = None
+
+	if lookup is not None:
+		try:
+			if keep_members:
+				return [item for item in first if item in lookup]
+			return [item for item in first if item not in lookup]
+		except TypeError:
+			pass
+
+	contains = membership_test(second)
+	return [item for item in first if contains(item) == keep_members]
+
+
+
+def merge_select(first, second, keep_members):
+	#Versão de 'select_members' para listas em ordem crescente: uma única passagem pelas duas listas
+	output = []
+	idx = 0
+	size = len(second)
+	for item in first:
+		while idx < size and second[idx] < item:
+			idx += 1
+		if (idx < size and second[idx] == item) == keep_members:
+			output.append(item)
+	return output
+
+
+
+def subtract_counts(first, second):
+	#Diferença de multiconjuntos preservando a ordem de 'first'
+	counts = count_items(second)
+	output = []
+
+	if counts is not None:
+		try:
+			for item in first:
+				if counts[item] > 0:
+					counts[item] -= 1
+				else:
+					output.append(item)
+			return output
+		except TypeError:
+			output = []
+
+	remaining = list(second)
+	for item in first:
+		try:
+			remaining.remove(item)
+		except ValueError:
+			output.append(item)
+	return output
+
+
+
+def intersect_counts(first, second):
+	#Interseção de multiconjuntos preservando a ordem de 'first'
+	counts = count_items(second)
+	output = []
+
+	if counts is not None:
+		try:
+			for item in first:
+				if counts[item] > 0:
+					counts[item] -= 1
+					output.append(item)
+			return output
+		except TypeError:
+			output = []
+
+	remaining = list(second)
+	for item in first:
+		try:
+			remaining.remove(item)
+			output.append(item)
+		except ValueError:
+			pass
+	return output
+
+
+
+def merge_counts(first, second, operation):
+	#Operações de multiconjunto sobre listas em ordem crescente, em uma única passagem
+	output = []
+	first_idx = second_idx = 0
+	first_size, second_size = len(first), len(second)
+
+	while first_idx < first_size and second_idx < second_size:
+		first_item, second_item = first[first_idx], second[second_idx]
+		if first_item < second_item:
+			if operation != 'intersection':
+				output.append(first_item)
+			first_idx += 1
+		elif second_item < first_item:
+			if operation == 'union':
+				output.append(second_item)
+			second_idx += 1
+		else:
+			if operation != 'difference':
+				output.append(first_item)
+			first_idx += 1
+			second_idx += 1
+
+	if operation != 'intersection':
+		output.extend(first[first_idx:])
+	if operation == 'union':
+		output.extend(second[second_idx:])
+	return output
+
+
+
+def unique(items):
+	"""Retorna os elementos sem repetição, na ordem em que aparecem pela primeira vez"""
+
+	items = list(items)
+
+	try:
+		return list(dict.fromkeys(items))
+	except TypeError:
+		pass
+
+	output = []
+	for item in items:
+		if item not in output:
+			output.append(item)
+	return output
+
+
+
+def difference(first, second, multiset=False, presorted=False):
+	"""Retorna os elementos de 'first' que não estão em 'second'
+
+	Arguments:
+		first {list|tuple} -- primeira lista
+		second {list|tuple} -- segunda lista
+
+	Keyword Arguments:
+		multiset {bool} -- se True, cada ocorrência em 'second' remove apenas uma ocorrência de 'first' (default: {False})
+		presorted {bool} -- indica que as duas listas já estão em ordem crescente (default: {False})
+
+	Returns:
+		{list} -- elementos de 'first', na ordem original
+	"""
+
+	if presorted:
+		if multiset:
+			return merge_counts(first, second, 'difference')
+		return merge_select(first, second, keep_members=False)
+	if multiset:
+		return subtract_counts(first, second)
+	return select_members(first, second, keep_members=False)
+
+
+
+def intersection(first, second, multiset=False, presorted=False):
+	"""Retorna os elementos de 'first' que também estão em 'second'
+
+	Arguments:
+		first {list|tuple} -- primeira lista
+		second {list|tuple} -- segunda lista
+
+	Keyword Arguments:
+		multiset {bool} -- se True, cada ocorrência em 'second' corresponde a apenas uma ocorrência de 'first' (default: {False})
+		presorted {bool} -- indica que as duas listas já estão em ordem crescente (default: {False})
+
+	Returns:
+		{list} -- elementos comuns, na ordem de 'first'
+	"""
+
+	if presorted:
+		if multiset:
+			return merge_counts(first, second, 'intersection')
+		return merge_select(first, second, keep_members=True)
+	if multiset:
+		return intersect_counts(first, second)
+	return select_members(first, second, keep_members=True)
+
+
+
+def union(first, second, multiset=False, presorted=False):
+	"""Une duas listas
+
+	Arguments:
+		first {list|tuple} -- primeira lista
+		second {list|tuple} -- segunda lista
+
+	Keyword Arguments:
+		multiset {bool} -- se True, cada elemento aparece tantas vezes quanto na lista em que é mais frequente; se False, uma única vez (default: {False})
+		presorted {bool} -- indica que as duas listas já estão em ordem crescente; o resultado também estará (default: {False})
+
+	Returns:
+		{list} -- elementos de 'first' seguidos dos elementos de 'second' que faltam, na ordem em que aparecem
+	"""
+
+	if presorted:
+		output = merge_counts(first, second, 'union')
+		if multiset:
+			return output
+		return [item for item, group in itertools.groupby(output)]
+	if multiset:
+		return list(first) + subtract_counts(second, first)
+	return unique(itertools.chain(first, second))
+
+
+
+def read_lines(filename, encoding='utf-8'):
+	"""Lê as linhas de um arquivo de texto, sem o terminador de linha e ignorando linhas vazias"""
+
+	with open(filename, 'r', encoding=encoding) as file:
+		for line in file:
+			line = line.rstrip('\n')
+			if line:
+				yield line
+
+
+
+def write_run(lines, tmp_folder, encoding='utf-8'):
+	#Grava um bloco já ordenado em um arquivo temporário e retorna o nome do arquivo
+	handle, run_filename = tempfile.mkstemp(prefix='~run_', dir=tmp_folder)
+	with open(handle, 'w', encoding=encoding) as run:
+		for line in lines:
+			run.write(line)
+			run.write('\n')
+	return run_filename
+
+
+
+def merge_runs(run_filenames, encoding='utf-8'):
+	#Intercala arquivos ordenados, apagando-os ao final
+	runs = [open(run_filename, 'r', encoding=encoding) for run_filename in run_filenames]
+	try:
+		#O terminador é removido antes da comparação para manter a mesma ordem da ordenação em memória
+		yield from heapq.merge(*[(line[:-1] for line in run) for run in runs])
+	finally:
+		for run in runs:
+			run.close()
+		for run_filename in run_filenames:
+			os.remove(run_filename)
+
+
+
+def external_sort(lines, run_size=None, merge_width=None, tmp_folder=tempfile.gettempdir(), encoding='utf-8'):
+	"""Ordena um iterador de strings usando memória limitada
+
+	Arguments:
+		lines {iterator} -- strings a ordenar, sem terminador de linha (ex.: 'read_lines(filename)')
+
+	Keyword Arguments:
+		run_size {int} -- número máximo de linhas mantidas em memória (default: {external_sort_run_size})
+		merge_width {int} -- número máximo de arquivos temporários intercalados de uma só vez (default: {external_sort_merge_width})
+		tmp_folder {str} -- pasta dos arquivos temporários (default: {tempfile.gettempdir()})
+		encoding {str} -- codificação dos arquivos temporários (default: {'utf-8'})
+
+	Yields:
+		{str} -- as linhas em ordem crescente
+
+	Observations:
+		Se todas as linhas couberem em um único bloco, nenhum arquivo temporário é criado.
+	"""
+
+	run_size = run_size or external_sort_run_size
+	merge_width = merge_width or external_sort_merge_width
+	assert run_size > 0 and merge_width > 1
+
+	lines = iter(lines)
+	run_filenames = []
+	try:
+		while True:
+			block = list(itertools.islice(lines, run_size))
+			if len(block) < run_size and not run_filenames:
+				#Tudo cabe em memória
+				block.sort()
+				yield from block
+				return
+			if not block:
+				break
+			block.sort()
+			run_filenames.append(write_run(block, tmp_folder, encoding))
+			del block
+
+		#Intercalações intermediárias para não abrir arquivos demais ao mesmo tempo
+		while len(run_filenames) > merge_width:
+			group, run_filenames = run_filenames[:merge_width], run_filenames[merge_width:]
+			run_filenames.append(write_run(merge_runs(group, encoding), tmp_folder, encoding))
+
+		pending, run_filenames = run_filenames, []
+		yield from merge_runs(pending, encoding)
+
+	finally:
+		for run_filename in run_filenames:
+			os.remove(run_filename)
+
+
+
+def compare_sorted(first, second):
+	"""Compara dois iteradores em ordem crescente em uma única passagem
+
+	Arguments:
+		first {iterator} -- primeiro iterador, em ordem crescente
+		second {iterator} -- segundo iterador, em ordem crescente
+
+	Yields:
+		{tuple} -- (origem, elemento), sendo a origem 'first', 'second' ou 'shared'
+
+	Observations:
+		Segue a mesma regra de 'difference' e 'intersection': os elementos repetidos são emitidos tantas vezes quanto aparecem; os compartilhados, tantas vezes quanto aparecem em 'first'.
+	"""
+
+	first_groups = itertools.groupby(first)
+	second_groups = itertools.groupby(second)
+	first_group = next(first_groups, None)
+	second_group = next(second_groups, None)
+
+	while first_group is not None and second_group is not None:
+		first_item, second_item = first_group[0], second_group[0]
+		if first_item < second_item:
+			for item in first_group[1]:
+				yield 'first', item
+			first_group = next(first_groups, None)
+		elif second_item < first_item:
+			for item in second_group[1]:
+				yield 'second', item
+			second_group = next(second_groups, None)
+		else:
+			for item in first_group[1]:
+				yield 'shared', item
+			first_group = next(first_groups, None)
+			second_group = next(second_groups, None)
+
+	while first_group is not None:
+		for item in first_group[1]:
+			yield 'first', item
+		first_group = next(first_groups, None)
+
+	while second_group is not None:
+		for item in second_group[1]:
+			yield 'second', item
+		second_group = next(second_groups, None)
+
+
+
+def diff_files(first_filename, second_filename, output_folder=os.curdir, historical_analisis=False, first_list_dict_label='First', second_list_dict_label='Second', run_size=None, tmp_folder=tempfile.gettempdir(), encoding='utf-8'):
+	"""Versão de 'compare_lists' para arquivos de texto com um item por linha, sem carregá-los inteiros em memória
+
+	Arguments:
+		first_filename {str} -- caminho do primeiro arquivo
+		second_filename {str} -- caminho do segundo arquivo
+
+	Keyword Arguments:
+		output_folder {str} -- pasta onde os resultados serão gravados, um arquivo por chave (ex.: 'onlyOnFirst.txt') (default: {os.curdir})
+		historical_analisis {bool} -- grava apenas o que mudou no segundo arquivo em relação ao primeiro, na chave 'mudou' (default: {False})
+		first_list_dict_label {str} -- nome usado na chave dos itens exclusivos do primeiro arquivo (default: {'First'})
+		second_list_dict_label {str} -- nome usado na chave dos itens exclusivos do segundo arquivo (default: {'Second'})
+		run_size {int} -- número máximo de linhas mantidas em memória pela ordenação (default: {external_sort_run_size})
+		tmp_folder {str} -- pasta dos arquivos temporários (default: {tempfile.gettempdir()})
+		encoding {str} -- codificação dos arquivos (default: {'utf-8'})
+
+	Returns:
+		{dict} -- mesmas chaves de 'compare_lists', com o caminho do arquivo de cada resultado
+
+	Observations:
+		Os resultados são gravados em ordem crescente, um item por linha. Linhas vazias são ignoradas.
+	"""
+
+	if historical_analisis:
+		keys = {'second': u'mudou'}
+	else:
+		keys = OrderedDict([('first', u'onlyOn%s' % first_list_dict_label), ('second', u'onlyOn%s' % second_list_dict_label), ('shared', u'shared')])
+
+	first = external_sort(read_lines(first_filename, encoding), run_size=run_size, tmp_folder=tmp_folder, encoding=encoding)
+	second = external_sort(read_lines(second_filename, encoding), run_size=run_size, tmp_folder=tmp_folder, encoding=encoding)
+
+	output = {}
+	outputs = {}
+	try:
+		for origin, key in keys.items():
+			output[key] = os.path.join(output_folder, key + '.txt')
+			outputs[origin] = open(output[key], 'w', encoding=encoding)
+
+		for origin, item in compare_sorted(first, second):
+			if origin in outputs:
+				outputs[origin].write(item)
+				outputs[origin].write('\n')
+	finally:
+		for output_file in outputs.values():
+			output_file.close()
+		first.close()
+		second.close()
+
+	return output
+
+
+
+if __name__ == '__main__':
+	arguments = [argument for argument in sys.argv[1:] if argument != '--historical']
+	if len(arguments) not in (2, 3):
+		print("Uso: python3 set_algebra.py primeiro.txt segundo.txt [pasta_de_saída] [--historical]")
+		sys.exit(1)
+	output = diff_files(arguments[0], arguments[1], output_folder=(arguments[2:] or [os.curdir])[0], historical_analisis='--historical' in sys.argv[1:])
+	for key, output_filename in output.items():
+		print("{}: {}".format(key, output_filename))
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+
+from calculation_handler import *
+from cli_tools import save_csv, load_csv, append_to_text_table_file
+
+from pytest import raises
+
+test_data_folder = ".test_data/"
+
+pessoas = [
+    {'cidade': 'Brasília', 'sexo': 'F', 'idade': '30', 'renda': '1500,50'},
+    {'cidade': 'Goiânia', 'sexo': 'M', 'idade': '', 'renda': '900'},
+    {'cidade': 'Brasília', 'sexo': 'M', 'idade': '20', 'renda': 'N/A'},
+    {'cidade': 'Brasília', 'sexo': 'F', 'idade': '40', 'renda': '2000'},
+]
+
+
+def test_group_by():
+    output = group_by(pessoas, 'cidade', ['count', 'freq', ('sum', 'idade'), ('mean', 'idade'), ('min', 'idade'), ('max', 'idade'), ('distinct', 'sexo'), ('sum', 'renda')])
+    assert list(output.keys()) == ['Brasília', 'Goiânia']
+    assert output['Brasília'] == {'count': 3, 'freq': 75.0, 'sum_idade': 90, 'mean_idade': 30.0, 'min_idade': 20, 'max_idade': 40, 'distinct_sexo': 2, 'sum_renda': 3500.5}
+    assert output['Goiânia'] == {'count': 1, 'freq': 25.0, 'sum_idade': 0, 'mean_idade': None, 'min_idade': None, 'max_idade': None, 'distinct_sexo': 1, 'sum_renda': 900.0}
+
+    output = group_by(pessoas, ['cidade', 'sexo'], [('max', 'idade')], convert=False)
+    assert output == {('Brasília', 'F'): {'max_idade': '40'}, ('Goiânia', 'M'): {'max_idade': None}, ('Brasília', 'M'): {'max_idade': '20'}}
+    assert list(group_by(pessoas, ['sexo']).keys()) == [('F',), ('M',)]
+
+    #Células de texto em colunas numéricas, dentro ou depois da amostra usada na identificação do tipo
+    output = group_by(pessoas, 'sexo', [('min', 'renda'), ('max', 'renda'), ('min', 'cidade')])
+    assert output['F'] == {'min_renda': 1500.5, 'max_renda': 2000, 'min_cidade': 'Brasília'}
+    assert output['M'] == {'min_renda': 900, 'max_renda': 900, 'min_cidade': 'Brasília'}
+    table = [{'grupo': 'a', 'valor': str(n)} for n in range(150)] + [{'grupo': 'a', 'valor': 'N/A'}]
+    assert group_by(table, 'grupo', [('min', 'valor'), ('max', 'valor'), ('sum', 'valor')])['a'] == {'min_valor': 0, 'max_valor': 149, 'sum_valor': 11175}
+
+    with raises(AssertionError):
+        group_by(pessoas, 'cidade', ['sum'])
+    with raises(AssertionError):
+        group_by(pessoas, 'cidade', [('median', 'idade')])
+
+
+def test_group_by_table_shapes():
+    expected = group_by(pessoas, 'sexo', ['count', ('sum', 'idade')])
+    header = list(pessoas[0].keys())
+    tuples = [tuple(header)] + [tuple(row.values()) for row in pessoas]
+    strings = [';'.join(row) + '\n' for row in tuples]
+    assert group_by(tuples, 'sexo', ['count', ('sum', 'idade')]) == expected
+    assert group_by(iter(tuples[1:]), 'sexo', ['count', ('sum', 'idade')], fields=header) == expected
+    assert group_by(strings, 'sexo', ['count', ('sum', 'idade')], delimiter=';') == expected
+    assert group_by([], 'sexo') == {}
+    with raises(AssertionError):
+        group_by(strings, 'sexo')
+
+    save_csv(pessoas, 'group_by.csv', file_folder=test_data_folder)
+    assert group_by(load_csv('group_by.csv', file_folder=test_data_folder), 'sexo', ['count', ('sum', 'idade')]) == expected
+    os.remove(test_data_folder + 'group_by.csv')
+
+
+def test_map_values():
+    table = [
+        {'nome': 'Ana', 'nota': '7,5', 'idade': '30'},
+        {'nome': 'Bia', 'nota': '7.5', 'idade': '30'},
+        {'nome': 'Ana', 'nota': '9', 'idade': '41'},
+    ]
+    for cache in (True, False):
+        assert map_values(table, cache=cache) == {'nome': ('Ana', 'Bia'), 'nota': (7.5, 9.0), 'idade': (30, 41)}
+        counts = map_values(table, count=True, cache=cache)
+        assert counts['nome'] == Counter({'Ana': 2, 'Bia': 1})
+        assert counts['nota'] == Counter({7.5: 2, 9.0: 1})
+        assert list(counts['idade'].items()) == [(30, 2), (41, 1)]
+
+
+def test_map_values_string_rows(monkeypatch):
+    monkeypatch.setattr('builtins.input', lambda *args, **kwargs: 's')
+    table = ['nome;idade\n', 'Ana;30\n', 'Bia;30\n']
+    assert map_values(table, delimiter=';', count=True) == {'nome': Counter({'Ana': 1, 'Bia': 1}), 'idade': Counter({30: 2})}
+
+
+def test_calculate_file_relative_freq(monkeypatch):
+    rows = [{'cidade': ['Brasília', 'Goiânia', 'Anápolis'][n % 3], 'idade': str(n % 7), 'obs': 'linha "{}"\ncom quebra'.format(n % 2)} for n in range(300)]
+    save_csv(rows, 'relative_freq.csv', file_folder=test_data_folder)
+    expected = calculate_relative_freq(rows)
+    assert expected['idade'][0] == (43, 43 / 300 * 100)
+
+    assert calculate_file_relative_freq('relative_freq.csv', file_folder=test_data_folder, workers=1) == expected
+    assert calculate_relative_freq('relative_freq.csv', file_folder=test_data_folder) == expected
+
+    monkeypatch.setattr('calculation_handler.parallel_min_file_size', 0)
+    parallel = calculate_file_relative_freq('relative_freq.csv', file_folder=test_data_folder, cols=['idade', 'cidade'], workers=2)
+    assert list(parallel.keys()) == ['idade', 'cidade']
+    assert parallel['idade'] == expected['idade'] and parallel['cidade'] == expected['cidade']
+
+    with open(test_data_folder + 'relative_freq.csv', 'w') as f:
+        f.write('cidade\tidade\n')
+    assert calculate_file_relative_freq('relative_freq.csv', file_folder=test_data_folder) == {'cidade': Counter(), 'idade': Counter()}
+    os.remove(test_data_folder + 'relative_freq.csv')
+
+
+def test_frequency_table(monkeypatch):
+    rows = [{'cidade': ['Brasília', 'Goiânia'][n % 2], 'idade': str(n % 3)} for n in range(10)]
+    save_csv(rows, 'frequency_table.csv', file_folder=test_data_folder)
+    table = FrequencyTable('frequency_table.csv', file_folder=test_data_folder)
+    assert len(table) == 10 and table['idade'] == Counter({'0': 4, '1': 3, '2': 3})
+    assert os.path.isfile(test_data_folder + 'frequency_table.csv.freq')
+
+    #Linhas acrescentadas pelas funções de gravação atualizam o arquivo auxiliar sem recontar o arquivo
+    def no_rebuild(*args, **kwargs):
+        raise AssertionError("O arquivo não deveria ser recontado")
+    monkeypatch.setattr('calculation_handler.count_file_values', no_rebuild)
+    save_csv([{'cidade': 'Anápolis', 'idade': 5}], 'frequency_table.csv', file_folder=test_data_folder, file_method='a')
+    save_csv(iter([['Anápolis', None]]), 'frequency_table.csv', file_folder=test_data_folder, header=['cidade', 'idade'], file_method='a')
+    append_to_text_table_file({'idade': '1', 'cidade': 'Goiânia'}, 'frequency_table.csv', file_folder=test_data_folder)
+    append_to_text_table_file(['Goiânia', '0'], 'frequency_table.csv', file_folder=test_data_folder, constrain_cols=False)
+    output = table.relative_freq()
+    assert len(table) == 14
+    assert output['cidade']['Anápolis'] == (2, 2 / 14 * 100)
+    assert table.absolute_freq(convert=False)['idade'] == Counter({'0': 5, '1': 4, '2': 3, '5': 1, '': 1})
+    monkeypatch.undo()
+    assert output == calculate_file_relative_freq('frequency_table.csv', file_folder=test_data_folder)
+
+    #Alterações feitas por outros meios invalidam o arquivo auxiliar e as contagens são refeitas
+    with open(test_data_folder + 'frequency_table.csv', 'a') as f:
+        f.write('Goiânia\t2\n')
+    assert table.relative_freq() == calculate_file_relative_freq('frequency_table.csv', file_folder=test_data_folder)
+    assert len(table) == 15
+
+    #Tabelas com colunas diferentes sobre o mesmo arquivo compartilham o arquivo auxiliar sem recontar o arquivo
+    ages = FrequencyTable('frequency_table.csv', file_folder=test_data_folder, cols=['idade'])
+    monkeypatch.setattr('calculation_handler.count_file_values', no_rebuild)
+    assert list(ages.absolute_freq()) == ['idade'] and list(table.absolute_freq()) == ['cidade', 'idade']
+    save_csv([{'cidade': 'Goiânia', 'idade': '2'}], 'frequency_table.csv', file_folder=test_data_folder, file_method='a')
+    assert ages.relative_freq()['idade'] == table.relative_freq()['idade']
+    monkeypatch.undo()
+    with raises(AssertionError):
+        FrequencyTable('frequency_table.csv', file_folder=test_data_folder, cols=['renda'])
+
+    #Um valor novo pode mudar o tipo inferido da coluna; a compactação do arquivo auxiliar não altera as contagens
+    monkeypatch.setattr('cli_tools.frequency_sidecar_min_journal', 0)
+    assert table.absolute_freq()['idade'][1] == 4
+    append_to_text_table_file(['Goiânia', 'sem idade'], 'frequency_table.csv', file_folder=test_data_folder, constrain_cols=False)
+    save_csv([{'cidade': 'Goiânia', 'idade': '1'}], 'frequency_table.csv', file_folder=test_data_folder, file_method='a')
+    output = table.relative_freq()
+    assert output['idade']['1'] == (5, 5 / 18 * 100) and output['idade']['sem idade'] == (1, 1 / 18 * 100)
+    assert output == calculate_file_relative_freq('frequency_table.csv', file_folder=test_data_folder)
+
+    #Dicionários gravados em outra ordem de colunas são contados na coluna em que os valores ficam no arquivo
+    save_csv([{'idade': '7', 'cidade': 'Formosa'}], 'frequency_table.csv', file_folder=test_data_folder, file_method='a')
+    assert table.relative_freq() == calculate_file_relative_freq('frequency_table.csv', file_folder=test_data_folder)
+    assert table['cidade']['7'] == 1
+
+    #Linhas gravadas por fora das funções de gravação entre a leitura do arquivo auxiliar e a gravação não são dadas como contadas
+    import cli_tools
+    open_sidecar = cli_tools.open_frequency_sidecar
+    def concurrent_append(*args, **kwargs):
+        sidecar = open_sidecar(*args, **kwargs)
+        with open(test_data_folder + 'frequency_table.csv', 'a') as f:
+            f.write('Anápolis\t3\n')
+        return sidecar
+    monkeypatch.setattr('cli_tools.open_frequency_sidecar', concurrent_append)
+    append_to_text_table_file({'cidade': 'Goiânia', 'idade': '3'}, 'frequency_table.csv', file_folder=test_data_folder)
+    save_csv([{'cidade': 'Goiânia', 'idade': '3'}], 'frequency_table.csv', file_folder=test_data_folder, file_method='a')
+    monkeypatch.undo()
+    assert table.relative_freq() == calculate_file_relative_freq('frequency_table.csv', file_folder=test_data_folder)
+    assert table['cidade']['Anápolis'] == 4
+
+    os.remove(test_data_folder + 'frequency_table.csv')
+    os.remove(test_data_folder + 'frequency_table.csv.freq')
@@ -2,6 +2,10 @@
 # -*- coding: utf-8 -*-
 
 import os
+import pickle
+import json
+import asyncio
+import threading
 
 from cli_tools import *
 from py_obj_data_tools import *
@@ -68,8 +72,61 @@ def test_remove_lockfile():
     assert os.path.isfile(tmp_folder+os.sep+'test_lock') == False
 
 
+def test_file_lock():
+    writer = FileLock('test_file_lock').acquire()
+    assert os.path.isfile(tmp_folder + os.sep + 'test_file_lock')
+    with raises(TimeoutError):
+        FileLock('test_file_lock', shared=True, timeout=0.05).acquire()
+    writer.release()
+    assert not os.path.isfile(tmp_folder + os.sep + 'test_file_lock')
+    with FileLock('test_file_lock', shared=True) as reader1, FileLock('test_file_lock', shared=True, timeout=0.05) as reader2:
+        assert reader1.locked() and reader2.locked()
+        with raises(TimeoutError):
+            FileLock('test_file_lock', timeout=0.05).acquire()
+    assert not os.path.isfile(tmp_folder + os.sep + 'test_file_lock')
+    with FileLock('test_file_lock', timeout=0.05):
+        pass
+
+
 def test_lockfile_name():
     assert lockfile_name('/tmp/www/work/test_lock') == '~lock_'+'test_lock'
+    assert lockfile_name('test_lock', file_folder='/tmp/www/work') == lockfile_name('work/test_lock', file_folder='/tmp/www/')
+    assert lockfile_name('test_lock', file_folder='/tmp/www/work').startswith('~lock_test_lock_')
+    assert lockfile_name('test_lock', file_folder='/tmp/www/work') != lockfile_name('test_lock', file_folder='/tmp/www/other')
+
+
+def test_file_lock_reentrant():
+    with FileLock('test_file_lock') as writer:
+        with FileLock('test_file_lock', shared=True, reentrant=True) as reader:
+            assert reader.locked()
+        assert writer.locked() and os.path.isfile(tmp_folder + os.sep + 'test_file_lock')
+    assert not os.path.isfile(tmp_folder + os.sep + 'test_file_lock')
+    with FileLock('test_file_lock', shared=True):
+        with raises(AssertionError):
+            FileLock('test_file_lock', reentrant=True).acquire()
+    #Em outra thread a trava não é reaproveitada
+    with FileLock('test_file_lock'):
+        errors = []
+        def read():
+            try:
+                FileLock('test_file_lock', shared=True, timeout=0.05, reentrant=True).acquire()
+            except TimeoutError as error:
+                errors.append(error)
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join()
+        assert len(errors) == 1
+
+
+def test_load_full_csv_lock():
+    save_csv([['Daniel', '38']], 'locked.csv', file_folder=test_data_folder, header=['nome', 'idade'])
+    #A trava é do caminho absoluto: um arquivo de mesmo nome em outra pasta não bloqueia a leitura
+    with FileLock(lockfile_name('locked.csv', file_folder=tmp_folder)):
+        assert load_full_csv('locked.csv', file_folder=test_data_folder, row_format='tuple') == [('Daniel', '38')]
+    #Uma leitura dentro da escrita da própria thread reaproveita a trava
+    with FileLock(lockfile_name('locked.csv', file_folder=test_data_folder)):
+        assert load_full_csv('locked.csv', file_folder=test_data_folder, row_format='tuple') == [('Daniel', '38')]
+    os.remove(test_data_folder + 'locked.csv')
 
 
 def test_list_col_responses():
@@ -201,6 +258,307 @@ def test_create_column_metainfo_file():
 
 
 
+def test_deep_diff_dicts():
+    hoje = object()
+    first = OrderedDict([('q1', {'respostas': [1, 2, 3], 'obs': None}), ('q2', 'Sim'), ('q3', 1.0), ('data', hoje), ('tags', {'a', 'b'})])
+    second = OrderedDict([('q2', 'Sim'), ('q1', {'respostas': [1, 2], 'obs': 0}), ('q3', 1), ('data', hoje), ('q4', (1, 2)), ('tags', {'b', 'a'})])
+    assert deep_diff_dicts(first, second) == {'added': [('q4',)], 'removed': [('q1', 'respostas', 2)], 'changed': [('q1', 'obs'), ('q3',)]}
+    assert deep_diff_dicts(second, first)['added'] == [('q1', 'respostas', 2)]
+    assert deep_diff_dicts(first, dict(first)) == {'added': [], 'removed': [], 'changed': []}
+    assert deep_diff_dicts({'data': [object()]}, {'data': [object()]})['changed'] == [('data', 0)]
+    assert subtree_digest({'a': 1, 'b': [2]}, {}) == subtree_digest(OrderedDict([('b', [2]), ('a', 1)]), {})
+    assert subtree_digest([1, 2], {}) != subtree_digest((1, 2), {}) != subtree_digest([2, 1], {})
+    assert subtree_digest({'a': object()}, {}) is None
+
+    #Valores com o mesmo hash() nativo continuam diferentes
+    assert deep_diff_dicts({'a': -1}, {'a': -2})['changed'] == [('a',)]
+    assert deep_diff_dicts({'a': {'x': -1}}, {'a': {'x': -2}})['changed'] == [('a', 'x')]
+    assert deep_diff_dicts({'a': [1, 2**61]}, {'a': [1, 1]})['changed'] == [('a', 1)]
+    assert deep_diff_dicts([1, 2**61], [1, 1])['changed'] == [(1,)]
+
+
+def test_hash_join():
+    pessoas = [{'id': '1', 'nome': 'Ana'}, {'id': '2', 'nome': 'Bia'}, {'id': '3', 'nome': 'Caio'}]
+    atendimentos = [{'id': '1', 'atd': 'Entrevista'}, {'id': '1', 'atd': 'Visita'}, {'id': '4', 'atd': 'Estudo'}]
+    original = [dict(row) for row in pessoas + atendimentos]
+
+    inner = list(hash_join(pessoas, iter(atendimentos), 'id'))
+    assert [list(row.values()) for row in inner] == [['1', 'Ana', 'Entrevista'], ['1', 'Ana', 'Visita']]
+    left = list(hash_join(pessoas, atendimentos, 'id', how='left'))
+    assert sorted(tuple(row.values()) for row in left) == [('1', 'Ana', 'Entrevista'), ('1', 'Ana', 'Visita'), ('2', 'Bia', ''), ('3', 'Caio', '')]
+    right = list(hash_join(iter(pessoas), atendimentos, 'id', how='right', fill_value=None))
+    assert sorted(tuple(row.values()) for row in right) == [('1', 'Ana', 'Entrevista'), ('1', 'Ana', 'Visita'), ('4', None, 'Estudo')]
+    full = list(hash_join(pessoas, atendimentos, 'id', how='full'))
+    assert len(full) == 5 and all(list(row.keys()) == ['id', 'nome', 'atd'] for row in full)
+    assert list(hash_join(pessoas, [], 'id', how='full')) == pessoas
+    composite = list(hash_join(pessoas, [{'id': '1', 'nome': 'Ana', 'idade': 30}, {'id': '2', 'nome': 'Ana', 'idade': 40}], ['id', 'nome']))
+    assert composite == [{'id': '1', 'nome': 'Ana', 'idade': 30}]
+    assert [dict(row) for row in pessoas + atendimentos] == original
+    with raises(AssertionError):
+        list(hash_join(pessoas, atendimentos, 'id', how='cross'))
+
+    junction = table_junction(pessoas, atendimentos, 'id', how='left')
+    assert len(junction) == 4 and isinstance(junction, list)
+    assert [dict(row) for row in pessoas + atendimentos] == original
+
+
+def test_merge_join():
+    left = [{'id': 1, 'a': 'x'}, {'id': 2, 'a': 'y'}, {'id': 2, 'a': 'z'}, {'id': 5, 'a': 'w'}]
+    right = [{'id': 2, 'b': 'B'}, {'id': 3, 'b': 'C'}, {'id': 5, 'b': 'E'}, {'id': 6, 'b': 'F'}]
+    for how in ('inner', 'left', 'right', 'full'):
+        expected = sorted(hash_join(left, right, 'id', how=how), key=lambda row: (row['id'], row['a']))
+        assert list(merge_join(iter(left), iter(right), 'id', how=how)) == expected
+    assert [row['id'] for row in merge_join(left, right, 'id', how='full')] == [1, 2, 2, 3, 5, 6]
+    assert list(merge_join([], right, 'id', how='left')) == []
+    with raises(AssertionError):
+        list(merge_join(left[::-1], right, 'id'))
+
+
+def test_table_merge():
+    table1 = [{'id': '1', 'nome': 'Ana'}, {'id': '2', 'nome': 'Bia'}]
+    table2 = [{'id': '2', 'idade': '30'}, {'id': '3', 'idade': '40'}]
+    merged = table_merge(table1, table2, 'id')
+    assert sorted(tuple(row.values()) for row in merged) == [('1', 'Ana', ''), ('2', 'Bia', '30'), ('3', '', '40')]
+    assert all(list(row.keys()) == ['id', 'nome', 'idade'] for row in merged)
+    assert table_merge(table1, table2, 'id', presorted=True) == sorted(merged, key=lambda row: row['id'])
+    assert not isinstance(table_merge(table1, table2, 'id', stream=True), list)
+    assert table1 == [{'id': '1', 'nome': 'Ana'}, {'id': '2', 'nome': 'Bia'}]
+
+
+def test_colision_dict():
+    first = ColisionDict()
+    first.append('a', 1)
+    first.append('a', 2)
+    second = ColisionDict([('a', [3]), ('b', 0)])
+    assert second['b'] == [0]
+    assert first + second == ColisionDict([('a', [1, 2, 3]), ('b', [0])])
+    assert first['a'] == [1, 2]
+    view = ChainedColisionDict(first, second)
+    assert view['a'] == [1, 2, 3] and view['b'] == [0]
+    assert list(view) == ['a', 'b'] and len(view) == 2
+    with raises(KeyError):
+        view['c']
+    merged = view.to_colision_dict()
+    first += second
+    assert first == merged == ColisionDict([('a', [1, 2, 3]), ('b', [0])])
+
+    #Valores que não são listas são guardados como listas de um elemento
+    first['c'] = 4
+    first.update(d=5)
+    first.append('c', 6)
+    assert first['c'] == [4, 6] and first['d'] == [5] and first.setdefault('e', 7) == [7]
+    assert pickle.loads(pickle.dumps(first)) == first
+
+
+def test_stack():
+    pilha = Stack(['a', 'b'])
+    pilha.push('c')
+    assert list(pilha) == ['c', 'b', 'a']
+    assert [list(pilha) for n in range(2)] == [['c', 'b', 'a']] * 2
+    assert repr(pilha) == 'top »» ["c", "b", "a"]'
+    assert pilha.peek() == 'c' and pilha.pull() == 'c' and pilha.size() == 2
+    assert pilha.pop_many(5) == ['b', 'a'] and pilha.pull() == None
+    numbers = Stack(typecode='d')
+    numbers.push_many([1, 2, 3])
+    assert numbers.pop_many(2) == [3.0, 2.0] and len(numbers) == 1
+    with raises(AttributeError):
+        pilha.cursor = 0
+
+
+def test_queue():
+    fila = Queue([1, 2], maxsize=3)
+    fila.enqueue(3)
+    with raises(Full):
+        fila.enqueue(4)
+    assert list(fila) == [1, 2, 3]
+    assert fila.dequeue() == 1 and fila.peek() == 2 and fila.size() == 2
+    assert Queue().dequeue() == None
+
+
+def test_blocking_queue():
+    fila = BlockingQueue(maxsize=2)
+    consumed = []
+
+    def consumer():
+        while True:
+            item = fila.get(timeout=5)
+            if item is None:
+                break
+            consumed.append(item)
+
+    worker = threading.Thread(target=consumer)
+    worker.start()
+    for n in range(100):
+        fila.put(n, timeout=5)
+    fila.put(None, timeout=5)
+    worker.join()
+    assert consumed == list(range(100))
+    with raises(Empty):
+        fila.get(timeout=0.01)
+    fila.enqueue(1)
+    fila.enqueue(2)
+    with raises(Full):
+        fila.put(3, timeout=0.01)
+
+
+def test_async_queue():
+    async def pipeline():
+        fila = AsyncQueue(maxsize=2)
+        consumed = []
+
+        async def consumer():
+            while True:
+                item = await fila.get(timeout=5)
+                if item is None:
+                    return
+                consumed.append(item)
+
+        task = asyncio.ensure_future(consumer())
+        for n in range(100):
+            await fila.put(n, timeout=5)
+        await fila.put(None, timeout=5)
+        await task
+        with raises(Empty):
+            await fila.get(timeout=0.01)
+        return consumed
+
+    assert asyncio.run(pipeline()) == list(range(100))
+
+
+def test_heap():
+    values = [randint(0, 1000) for n in range(500)]
+    heap = Heap(values)
+    assert heap.peek() == min(values)
+    assert [heap.pull() for n in range(len(values))] == sorted(values)
+    assert heap.pull() == None
+    handles = {name: heap.push(name, priority=priority) for name, priority in (('a', 5), ('b', 3), ('c', 9))}
+    heap.update(handles['c'], 1)
+    heap.update(handles['b'], 10)
+    assert heap.remove(handles['a']) == 'a'
+    assert heap.size() == 2 and handles['a'] not in heap
+    other = Heap([2, 0])
+    heap.merge(other)
+    assert other.size() == 0
+    assert [heap.pull() for n in range(heap.size())] == [0, 'c', 2, 'b']
+
+
+def test_top_k():
+    rows = [{'nome': 'Pessoa {}'.format(n), 'idade': n % 90} for n in range(1000)]
+    assert [row['idade'] for row in top_k(iter(rows), 3, key=lambda row: row['idade'])] == [89, 89, 89]
+    assert top_k(range(100), 2, largest=False) == [0, 1]
+
+
+def test_sorted_list():
+    values = [randint(0, 100) for n in range(2000)]
+    sorted_list = SortedList(values[:1000])
+    sorted_list.load_factor = 8
+    for value in values[1000:]:
+        sorted_list.add(value)
+    assert sorted_list == sorted(values)
+    assert [sorted_list[n] for n in range(-3, 3)] == sorted(values)[-3:] + sorted(values)[:3]
+    for value in values[:1500]:
+        sorted_list.remove(value)
+    expected = sorted(values[1500:])
+    assert list(sorted_list) == expected and len(sorted_list) == 500
+    assert list(sorted_list.irange(20, 40)) == [value for value in expected if 20 <= value <= 40]
+    assert list(sorted_list.irange(20, 40, inclusive=(False, False))) == [value for value in expected if 20 < value < 40]
+    assert sorted_list.index(expected[250]) == expected.index(expected[250])
+    assert sorted_list.count(expected[0]) == expected.count(expected[0])
+    with raises(ValueError):
+        sorted_list.remove(101)
+
+
+def test_pk_linked_list():
+    pk_list = PK_LinkedList(['c', 'a', 'c', 'b'])
+    assert pk_list == ['c', 'a', 'b']
+    pk_list.append('a')
+    pk_list.append('0')
+    assert pk_list.index('b') == 2
+    assert pk_list.index('z') == None
+    assert 'z' not in pk_list and '0' in pk_list
+    pk_list - ['a', 'z']
+    assert pk_list == ['c', 'b', '0']
+    pk_list.pop(0)
+    pk_list.append('c')
+    assert pk_list == ['b', '0', 'c']
+    pk_list.filename = 'unic_list'
+    restored = pickle.loads(pickle.dumps(pk_list))
+    assert restored == pk_list and restored.filename == 'unic_list' and 'c' in restored
+
+    #Atribuições não podem criar elementos repetidos
+    pk_list[0] = 'c'
+    assert pk_list == ['b', '0', 'c']
+    pk_list[0] = 'b'
+    pk_list[0] = 'x'
+    assert pk_list == ['x', '0', 'c'] and 'x' in pk_list and 'b' not in pk_list
+    pk_list[1:] = ['y', 'x', 'c', 'y']
+    assert pk_list == ['x', 'y', 'c'] and '0' not in pk_list and 'y' in pk_list
+    del pk_list[:2]
+    assert pk_list == ['c'] and 'x' not in pk_list and 'y' not in pk_list
+
+
+def test_pk_linked_list_old_pickle():
+    #Pickles gravados pela versão anterior da classe, que era uma lista simples sem '_members'
+    old_pickles = [
+        b'\x80\x02ccli_tools\nPK_LinkedList\nq\x00)\x81q\x01(X\x01\x00\x00\x00cq\x02X\x01\x00\x00\x00aq\x03X\x01\x00\x00\x00bq\x04e}q\x05(X\x06\x00\x00\x00sortedq\x06\x89X\x08\x00\x00\x00filenameq\x07X\x04\x00\x00\x00unicq\x08ub.',
+        b'\x80\x04\x95Q\x00\x00\x00\x00\x00\x00\x00\x8c\tcli_tools\x94\x8c\rPK_LinkedList\x94\x93\x94)\x81\x94(\x8c\x01c\x94\x8c\x01a\x94\x8c\x01b\x94e}\x94(\x8c\x06sorted\x94\x89\x8c\x08filename\x94\x8c\x04unic\x94ub.',
+    ]
+    for data in old_pickles:
+        pk_list = pickle.loads(data)
+        assert pk_list == ['c', 'a', 'b'] and pk_list.filename == 'unic' and pk_list.sorted == False
+        assert 'a' in pk_list and 'z' not in pk_list
+        pk_list.append('a')
+        pk_list.append('d')
+        assert pk_list == ['c', 'a', 'b', 'd']
+
+
+def test_pk_ordered_linked_list():
+    pk_list = PK_OrderedLinkedList(['c', 'a', 'b', 'a'])
+    assert pk_list == ['a', 'b', 'c']
+    pk_list.append('b')
+    pk_list.append('0')
+    pk_list.update(['d', 'a', 'e'])
+    assert list(pk_list) == ['0', 'a', 'b', 'c', 'd', 'e']
+    assert pk_list.index('c') == 3
+    assert pk_list.index('z') == None
+    pk_list - ['0', 'e']
+    assert pk_list == ['a', 'b', 'c', 'd']
+
+    #Interface de lista mantida sobre o armazenamento ordenado
+    pk_list.insert(0, 'f')
+    pk_list.sort()
+    assert pk_list[1:3] == ['b', 'c'] and pk_list[::-1] == ['f', 'd', 'c', 'b', 'a'] and pk_list[-1] == 'f'
+    del pk_list[0]
+    del pk_list[1:3]
+    copied = pk_list.copy()
+    copied.append('a')
+    assert pk_list == ['b', 'f'] and copied == ['a', 'b', 'f']
+    assert isinstance(pk_list, list) and 'b' in pk_list and 'a' not in pk_list
+    copied[0] = 'z'
+    assert copied == ['b', 'f', 'z'] and list(copied.irange('c', 'z', inclusive=(True, False))) == ['f']
+    with raises(AssertionError):
+        pk_list.sort(reverse=True)
+
+    restored = PK_OrderedLinkedList(json.loads(json.dumps(copied)))
+    assert json.dumps(copied) == '["b", "f", "z"]' and restored == copied and isinstance(restored, PK_OrderedLinkedList)
+    restored = pickle.loads(pickle.dumps(copied))
+    assert restored == copied and isinstance(restored, PK_OrderedLinkedList)
+
+
+def test_pk_ordered_linked_list_old_pickle():
+    #Pickles gravados pela versão anterior da classe, uma lista simples ordenada a cada 'append'
+    old_pickles = [
+        b'\x80\x02ccli_tools\nPK_OrderedLinkedList\nq\x00)\x81q\x01(X\x01\x00\x00\x00aq\x02X\x01\x00\x00\x00bq\x03X\x01\x00\x00\x00cq\x04e}q\x05X\x06\x00\x00\x00sortedq\x06\x89sb.',
+        b'\x80\x04\x95E\x00\x00\x00\x00\x00\x00\x00\x8c\tcli_tools\x94\x8c\x14PK_OrderedLinkedList\x94\x93\x94)\x81\x94(\x8c\x01a\x94\x8c\x01b\x94\x8c\x01c\x94e}\x94\x8c\x06sorted\x94\x89sb.',
+    ]
+    for data in old_pickles:
+        pk_list = pickle.loads(data)
+        assert pk_list == ['a', 'b', 'c'] and 'b' in pk_list and pk_list.index('c') == 2
+        pk_list.append('0')
+        pk_list.append('b')
+        assert pk_list == ['0', 'a', 'b', 'c']
+
+
 def test_return_bisect_lists():
     assert return_bisect_lists([1,2,3,4,5,6,7,8,9]) == ([1,2,3,4], 5, [6,7,8,9])
     assert return_bisect_lists([1,2,3,4,5,6,7,8]) == ([1,2,3,4], 5, [6,7,8])
@@ -235,6 +593,17 @@ def test_bisect_search_idx():
     assert bisect_search_idx('a', l1, (0,len(l1))) == False
     assert bisect_search_idx(7, l1, (0,len(l1))) == False
     assert bisect_search_idx('z', l1, (0,len(l1))) == False
+    assert bisect_search_idx('B', l1, (2,len(l1))) is False
+    assert bisect_search_idx('E', l1, (2,6)) == 4
+
+
+def test_bisect_many():
+    l1 = list(range(0, 1000, 3))
+    values = [999, 3, 4, 0, 600, 3, 1000, -1]
+    assert bisect_many(values, l1) == [333, 1, False, 0, 200, 1, False, False]
+    assert bisect_many([], l1) == []
+    assert bisect_many([1, 2], []) == [False, False]
+    assert bisect_many(l1, l1) == list(range(len(l1)))
 
 
 def test_load_json():
@@ -266,6 +635,96 @@ def test_load_full_csv():
     assert info[3]['nome'] == 'Vicente'
 
 
+def test_load_csv_row_format():
+    rows = load_full_csv("csv_table.csv", file_folder=test_data_folder, row_format='row')
+    dict_rows = load_full_csv("csv_table.csv", file_folder=test_data_folder)
+    assert rows[0]['nome'] == 'Daniel'
+    assert rows[0][1] == '38'
+    assert rows[0].keys() == ['nome', 'idade', 'altura']
+    assert [row.as_dict() for row in rows] == dict_rows
+    assert type(rows[0]) is type(rows[1])
+    assert next(load_csv("csv_table.csv", file_folder=test_data_folder, row_format='tuple')) == ('Daniel', '38', '1,84')
+    with raises(AssertionError):
+        load_full_csv("csv_table.csv", file_folder=test_data_folder, row_format='list')
+
+
+def test_detect_file_encoding():
+    with open(test_data_folder + 'latin.csv', 'wb') as f:
+        f.write('nome\tcidade\n'.encode('utf8'))
+        f.write('Daniel\tBrasília\n'.encode('utf8') * 5000)
+        f.write('Mariana\tGoiânia\n'.encode('cp1252'))
+    assert detect_file_encoding('latin.csv', file_folder=test_data_folder) == 'utf8'
+    assert detect_file_encoding('latin.csv', file_folder=test_data_folder, sample_size=1024 * 1024) == 'cp1252'
+    info = load_full_csv('latin.csv', file_folder=test_data_folder)
+    assert len(info) == 5001
+    assert info[0]['cidade'] == 'Brasília'
+    assert info[-1]['cidade'] == 'Goiânia'
+    assert load_full_csv('latin.csv', file_folder=test_data_folder, encoding='cp1252')[-1]['cidade'] == 'Goiânia'
+    os.remove(test_data_folder + 'latin.csv')
+
+
+def test_load_full_csv_parallel():
+    rows = [['nome', 'obs']] + [['Pessoa {}'.format(n), 'linha 1\nlinha "2"' if n % 3 == 0 else 'ok'] for n in range(300)]
+    save_csv(rows[1:], 'quoted.csv', file_folder=test_data_folder, header=rows[0])
+    header_end, chunks = find_csv_chunk_boundaries('quoted.csv', 8, file_folder=test_data_folder)
+    assert chunks[0][0] == header_end
+    assert all(previous[1] == following[0] for previous, following in zip(chunks, chunks[1:]))
+    serial = load_full_csv('quoted.csv', file_folder=test_data_folder)
+    parallel = load_full_csv_parallel('quoted.csv', file_folder=test_data_folder, workers=2)
+    assert len(serial) == 300
+    assert parallel == serial
+    assert parallel[0]['obs'] == 'linha 1\nlinha "2"'
+    assert load_full_csv('quoted.csv', file_folder=test_data_folder, workers=2) == serial
+    os.remove(test_data_folder + 'quoted.csv')
+
+
+def test_load_full_csv_parallel_mid_field_quotes(monkeypatch):
+    #Aspas no meio de um campo sem aspas são caracteres comuns para o 'csv.reader' e não podem inverter o estado da divisão
+    with open(test_data_folder + 'mid_quotes.csv', 'w') as f:
+        f.write('nome\taltura\tobs\n')
+        for n in range(4000):
+            obs = '"linha 1\nlinha ""{}"" \tfim"'.format(n) if n % 5 == 0 else 'ok'
+            f.write('Item {}\t{}" de altura\t{}\n'.format(n, n % 13, obs))
+
+    serial = load_full_csv('mid_quotes.csv', file_folder=test_data_folder)
+    assert len(serial) == 4000 and serial[5]['obs'] == 'linha 1\nlinha "5" \tfim' and serial[1]['altura'] == '1" de altura'
+    for num_of_chunks in (2, 7, 64):
+        header_end, chunks = find_csv_chunk_boundaries('mid_quotes.csv', num_of_chunks, file_folder=test_data_folder)
+        rows = [row for start, end in chunks for row in parse_csv_byte_range(test_data_folder + 'mid_quotes.csv', start, end)]
+        assert len(rows) == 4000
+
+    monkeypatch.setattr('cli_tools.parallel_min_file_size', 0)
+    assert load_full_csv('mid_quotes.csv', file_folder=test_data_folder, workers=2) == serial
+    os.remove(test_data_folder + 'mid_quotes.csv')
+
+
+def test_load_full_csv_cache():
+    cache_folder = test_data_folder + 'csv_cache/'
+    rows = [['nome', 'idade'], ['Daniel', '38'], ['Mariana', '36']]
+    save_csv(rows[1:], 'cached.csv', file_folder=test_data_folder, header=rows[0])
+    first = load_full_csv('cached.csv', file_folder=test_data_folder, cache=True, cache_folder=cache_folder)
+    assert len(os.listdir(cache_folder)) == 1
+    assert first == load_full_csv('cached.csv', file_folder=test_data_folder)
+    assert load_full_csv('cached.csv', file_folder=test_data_folder, row_format='tuple', cache=True, cache_folder=cache_folder) == [('Daniel', '38'), ('Mariana', '36')]
+    append_to_text_table_file(['Alice', '6'], 'cached.csv', file_folder=test_data_folder, constrain_cols=False)
+    assert load_full_csv('cached.csv', file_folder=test_data_folder, row_format='tuple', cache=True, cache_folder=cache_folder)[-1] == ('Alice', '6')
+
+    #Colunas com o mesmo nome não podem ser fundidas pelo cache
+    save_csv([['Daniel', '38', '1'], ['Mariana', '36', '2']], 'cached.csv', file_folder=test_data_folder, header=['nome', 'idade', 'nome'])
+    for row_format in ('tuple', 'row', 'dict'):
+        uncached = load_full_csv('cached.csv', file_folder=test_data_folder, row_format=row_format)
+        for n in range(2):
+            assert load_full_csv('cached.csv', file_folder=test_data_folder, row_format=row_format, cache=True, cache_folder=cache_folder) == uncached
+    assert uncached[0] == OrderedDict([('nome', '1'), ('idade', '38')])
+    table = load_csv_table('cached.csv', file_folder=test_data_folder)
+    assert table.fields == ['nome', 'idade', 'nome'] and table[0] == ['Daniel', '38', '1'] and list(table['nome']) == ['Daniel', 'Mariana']
+
+    evict_csv_cache(cache_folder=cache_folder, max_size=0)
+    assert os.listdir(cache_folder) == []
+    os.rmdir(cache_folder)
+    os.remove(test_data_folder + 'cached.csv')
+
+
 def test_load_csv_cols():
     info1 = load_csv_cols("csv_table.csv", file_folder=test_data_folder, selected_cols=['nome'])
     info2 = load_csv_cols("csv_table.csv", file_folder=test_data_folder, selected_cols=['nome', 'idade'], sort_by='nome')
@@ -279,6 +738,44 @@ def test_load_csv_cols():
     assert info5 == [['Daniel', '38'], ['Mariana', '36'], ['Alice', '6'], ['Vicente', '3']]
 
 
+def test_load_csv_cols_columnar():
+    table = load_csv_cols("csv_table.csv", file_folder=test_data_folder, selected_cols=['nome', 'idade', 'altura'], columnar=True)
+    rows = load_csv_cols("csv_table.csv", file_folder=test_data_folder, selected_cols=['nome', 'idade', 'altura'])
+    assert isinstance(table, ColumnarTable)
+    assert list(table) == rows
+    assert table['idade'].typecode == 'q'
+    assert table['altura'].typecode == 'd'
+    assert isinstance(table['nome'], DictEncodedColumn)
+    assert table[['nome']].to_list() == [[row[0]] for row in rows]
+    assert table[1:3].to_list() == rows[1:3]
+    assert table[0] == ['Daniel', 38, 1.84]
+    sorted_table = load_csv_cols("csv_table.csv", file_folder=test_data_folder, selected_cols=['nome', 'idade'], sort_by='idade', reverse_sort=True, columnar=True)
+    assert sorted_table.to_list() == load_csv_cols("csv_table.csv", file_folder=test_data_folder, selected_cols=['nome', 'idade'], sort_by='idade', reverse_sort=True)
+    #Empates mantêm a ordem do arquivo também na ordem inversa ('Mariana' e 'Oliveira' têm altura 1,70)
+    by_height = load_csv_cols("csv_table.csv", file_folder=test_data_folder, selected_cols=['nome', 'altura'], sort_by='altura', reverse_sort=True, columnar=True)
+    assert [row[0] for row in by_height][2:4] == ['Mariana', 'Oliveira']
+    assert by_height.to_list() == load_csv_cols("csv_table.csv", file_folder=test_data_folder, selected_cols=['nome', 'altura'], sort_by='altura', reverse_sort=True)
+    assert list(append_to_column(array('q', [1]), 'a')) == [1, 'a']
+
+
+def test_infer_column_type():
+    assert infer_column_type(['1', '22', '', ' 3 ']) == 'int'
+    assert infer_column_type(['1', '2.5', '.5']) == 'float'
+    assert infer_column_type(['1,84', '1.98', '3']) == 'decimal_comma'
+    assert infer_column_type(['1,84', 'Daniel']) == 'string'
+    assert infer_column_type(['', '']) == 'string'
+    converted = list(convert_rows([['Daniel', '38', '1,84'], ['Alice', '6', '1.2'], ['Vicente', 'NA', '']], sample_size=2))
+    assert converted == [['Daniel', 38, 1.84], ['Alice', 6, 1.2], ['Vicente', 'NA', '']]
+    assert list(convert_rows([['1'], ['2,5']], sample_size=1)) == [[1], [2.5]]
+
+    #Os conversores por tipo devolvem o mesmo que 'try_implict_convert' para células fora do padrão da coluna
+    for kind in ('float', 'decimal_comma'):
+        for value in ('inf', '-inf', 'nan', 'NaN', '1e5', 'Infinity', '1.5e3', '2,5', 'N/A', ' 7 '):
+            assert column_converters[kind](value) == try_implict_convert(value)
+    assert column_converters['float']('inf') == 'inf' and column_converters['decimal_comma']('1e5') == '1e5'
+    assert column_converters['float']('3') == 3.0 and column_converters['float']('2.5') == 2.5
+
+
 def test_save_csv():
     save_csv(table2, "table2.csv", file_folder=test_data_folder, header=['nome', 'idade', 'eml'])
     info1 = load_full_csv("table2.csv", file_folder=test_data_folder)
@@ -306,6 +803,70 @@ def test_seek_for_lines():
     assert len(seek_for_lines("txt_table.txt", "familia", "Silva", file_folder=test_data_folder, delimiter=":")) == 2
 
 
+def test_seek_for_lines_stream():
+    found = seek_for_lines("txt_table.txt", "familia", "Cruz", file_folder=test_data_folder, delimiter=":", stream=True)
+    assert not isinstance(found, list)
+    assert len(list(found)) == 4
+    rows = [['nome', 'familia'], ['Daniel', 'Cruz'], ['Pedro', 'Silva'], ['Alice', 'Cruz']]
+    save_csv(rows[1:], 'stream.csv', file_folder=test_data_folder, header=rows[0])
+    os.chmod(test_data_folder + 'stream.csv', 0o644)
+    removed = list(seek_for_lines('stream.csv', 'familia', 'Cruz', file_folder=test_data_folder, extract=True, stream=True))
+    assert [line['nome'] for line in removed] == ['Daniel', 'Alice']
+    assert load_full_csv('stream.csv', file_folder=test_data_folder, row_format='tuple') == [('Pedro', 'Silva')]
+    assert os.stat(test_data_folder + 'stream.csv').st_mode & 0o777 == 0o644
+    for filename in os.listdir(test_data_folder):
+        if filename.endswith('stream.csv'):
+            os.remove(test_data_folder + filename)
+
+
+def test_transform_csv(monkeypatch):
+    rows = [['nome', 'apelido'], ['Daniel', ''], ['Mariana', 'Mari'], ['Alice', '']]
+    save_csv((line for line in rows[1:]), 'transform.csv', file_folder=test_data_folder, header=rows[0])
+    assert load_full_csv('transform.csv', file_folder=test_data_folder, row_format='tuple') == [tuple(line) for line in rows[1:]]
+    copy_col('transform.csv', 'nome', 'apelido', file_folder=test_data_folder)
+    assert load_full_csv('transform.csv', file_folder=test_data_folder, row_format='tuple') == [('Daniel', 'Daniel'), ('Mariana', 'Mari'), ('Alice', 'Alice')]
+    copy_col('transform.csv', 'nome', 'nome_completo', file_folder=test_data_folder)
+    assert load_csv_head('transform.csv', file_folder=test_data_folder) == ['nome', 'apelido', 'nome_completo']
+    convert_csv_type('transform.csv', '\t', ';', file_folder=test_data_folder, old_lineterminator='\n', new_lineterminator='\n')
+    assert load_full_csv('transform.csv', file_folder=test_data_folder, delimiter=';', row_format='tuple')[1] == ('Mariana', 'Mari', 'Mariana')
+    assert transform_csv('transform.csv', lambda line: line if line['nome'] != 'Alice' else None, output_filename='transformed.csv', file_folder=test_data_folder, delimiter=';') == 2
+    assert len(load_full_csv('transform.csv', file_folder=test_data_folder, delimiter=';')) == 3
+    with raises(KeyError):
+        transform_csv('transform.csv', lambda line: line['sobrenome'], file_folder=test_data_folder, delimiter=';')
+    assert len(load_full_csv('transform.csv', file_folder=test_data_folder, delimiter=';')) == 3
+    assert sorted(filename for filename in os.listdir(test_data_folder) if 'transform' in filename) == ['transform.csv', 'transformed.csv']
+
+    #O arquivo reescrito mantém as permissões do original; um arquivo novo recebe as do arquivo de origem
+    os.chmod(test_data_folder + 'transform.csv', 0o644)
+    copy_col('transform.csv', 'nome', 'apelido', file_folder=test_data_folder, delimiter=';')
+    assert os.stat(test_data_folder + 'transform.csv').st_mode & 0o777 == 0o644
+    os.remove(test_data_folder + 'transformed.csv')
+    transform_csv('transform.csv', output_filename='transformed.csv', file_folder=test_data_folder, delimiter=';')
+    assert os.stat(test_data_folder + 'transformed.csv').st_mode & 0o777 == 0o644
+    os.remove(test_data_folder + 'transformed.csv')
+
+    #A reescrita mantém a codificação do arquivo de origem, a menos que 'output_encoding' seja informado
+    with open(test_data_folder + 'transform.csv', 'wb') as f:
+        f.write('nome\tcidade\nJoão\tSão Paulo\n'.encode('cp1252'))
+    transform_csv('transform.csv', lambda line: OrderedDict((key, value.upper()) for key, value in line.items()), file_folder=test_data_folder)
+    with open(test_data_folder + 'transform.csv', 'rb') as f:
+        assert f.read() == 'nome\tcidade\nJOÃO\tSÃO PAULO\n'.encode('cp1252')
+    transform_csv('transform.csv', output_filename='transformed.csv', file_folder=test_data_folder, output_encoding='utf8')
+    with open(test_data_folder + 'transformed.csv', 'rb') as f:
+        assert f.read() == 'nome\tcidade\nJOÃO\tSÃO PAULO\n'.encode('utf8')
+
+    #Uma falha ao criar o arquivo temporário não deixa a trava presa
+    def failing_mkstemp(*args, **kwargs):
+        raise OSError("Sem espaço em disco")
+    monkeypatch.setattr('cli_tools.tempfile.mkstemp', failing_mkstemp)
+    with raises(OSError):
+        transform_csv('transform.csv', file_folder=test_data_folder)
+    monkeypatch.undo()
+    FileLock(lockfile_name('transform.csv', file_folder=test_data_folder), timeout=0).acquire().release()
+    os.remove(test_data_folder + 'transform.csv')
+    os.remove(test_data_folder + 'transformed.csv')
+
+
 def test_history_table():
     data_hoje = today_date()
     atd = HistoryTable(target_folder='/tmp', filename='atd', fieldnames=['atd', 'mat'], map_fields=['data_registro', 'mat'])
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+
+from set_algebra import *
+from cli_tools import compare_lists, diff_dicts, diff_lists, intersect_lists, merge_lists
+
+
+first = [5, 1, 3, 1, 9, 7]
+second = [9, 2, 1, 8]
+
+
+def test_difference():
+    assert difference(first, second) == [5, 3, 7]
+    assert difference(first, second, multiset=True) == [5, 3, 1, 7]
+    assert difference(sorted(first), sorted(second), presorted=True) == [3, 5, 7]
+    assert difference(sorted(first), sorted(second), multiset=True, presorted=True) == [1, 3, 5, 7]
+    assert difference([], second) == []
+    assert difference(first, []) == first
+
+
+def test_intersection():
+    assert intersection(first, second) == [1, 1, 9]
+    assert intersection(first, second, multiset=True) == [1, 9]
+    assert intersection(sorted(first), sorted(second), presorted=True) == [1, 1, 9]
+    assert intersection(sorted(first), sorted(second), multiset=True, presorted=True) == [1, 9]
+
+
+def test_union():
+    assert union(first, second) == [5, 1, 3, 9, 7, 2, 8]
+    assert union(first, [1, 1, 1, 4], multiset=True) == [5, 1, 3, 1, 9, 7, 1, 4]
+    assert union(sorted(first), sorted(second), presorted=True) == [1, 2, 3, 5, 7, 8, 9]
+    assert union(sorted(first), sorted(second), multiset=True, presorted=True) == [1, 1, 2, 3, 5, 7, 8, 9]
+
+
+def test_unhashable_items():
+    rows = [{'id': 1}, {'id': 2}, {'id': 1}]
+    assert difference(rows, [{'id': 1}]) == [{'id': 2}]
+    assert difference(rows, [{'id': 1}], multiset=True) == [{'id': 2}, {'id': 1}]
+    assert intersection(rows, [{'id': 1}, {'id': 3}]) == [{'id': 1}, {'id': 1}]
+    assert union(rows, [{'id': 3}]) == [{'id': 1}, {'id': 2}, {'id': 3}]
+
+    lists = [[3], [1], [2]]
+    assert difference(lists, [[1]]) == [[3], [2]]
+    assert intersection([1, [1]], [[1], 2]) == [[1]]
+
+    test = membership_test([[2], [1]])
+    assert test([1]) and not test([5]) and not test('a')
+
+
+def test_cli_tools_wrappers():
+    assert diff_lists(first, second) == [5, 3, 7]
+    assert intersect_lists(first, second) == [1, 1, 9]
+    assert merge_lists(['b', 'a'], ['c', 'a']) == ['b', 'a', 'c']
+    assert compare_lists(['a', 'b'], ['b', 'c']) == {'onlyOnFirst': ['a'], 'onlyOnSecond': ['c'], 'shared': ['b']}
+    assert compare_lists(['a', 'b'], ['b', 'c'], historical_analisis=True) == {'mudou': ['c']}
+    assert diff_dicts({'a': '1', 'b': '2'}, {'a': '1', 'b': '3', 'c': 4}) == {'mudou': ['b: 3', 'c: 4']}
+
+
+def test_external_sort(tmp_path):
+    values = ['%05d' % n for n in range(1000, 0, -3)] + ['a\tb', 'a', 'a b']
+    assert list(external_sort(values, run_size=7, merge_width=3, tmp_folder=str(tmp_path))) == sorted(values)
+    assert list(external_sort(values, tmp_folder=str(tmp_path))) == sorted(values)
+    assert list(external_sort([])) == []
+    assert os.listdir(str(tmp_path)) == []
+
+    partial = external_sort(values, run_size=10, tmp_folder=str(tmp_path))
+    next(partial)
+    partial.close()
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_diff_files(tmp_path):
+    first_filename = str(tmp_path / 'ontem.txt')
+    second_filename = str(tmp_path / 'hoje.txt')
+    first_members = ['ana', 'bia', 'caio', 'bia', 'davi', 'eva']
+    second_members = ['eva', 'fabio', 'ana', 'gil', 'davi']
+    with open(first_filename, 'w') as file:
+        file.write('\n'.join(first_members) + '\n\n')
+    with open(second_filename, 'w') as file:
+        file.write('\n'.join(second_members))
+
+    output_folder = tmp_path / 'saida'
+    output_folder.mkdir()
+    output = diff_files(first_filename, second_filename, output_folder=str(output_folder), run_size=2, tmp_folder=str(output_folder))
+    expected = compare_lists(sorted(first_members), sorted(second_members))
+    assert sorted(output) == sorted(expected) == ['onlyOnFirst', 'onlyOnSecond', 'shared']
+    for key, output_filename in output.items():
+        assert list(read_lines(output_filename)) == expected[key]
+    assert sorted(os.listdir(str(output_folder))) == ['onlyOnFirst.txt', 'onlyOnSecond.txt', 'shared.txt']
+
+    output = diff_files(first_filename, second_filename, output_folder=str(output_folder), historical_analisis=True)
+    assert list(output) == ['mudou']
+    assert list(read_lines(output['mudou'])) == ['fabio', 'gil']